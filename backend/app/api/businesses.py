@@ -1,12 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from collections.abc import AsyncIterator
+import io
+import json
+from tempfile import SpooledTemporaryFile
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db_session
-from app.schemas.domain import BusinessCreate, BusinessRead
-from app.service.business_service import create_business, get_business_by_email, get_business_by_id
+from app.core.config import get_settings
+from app.db.session import SessionLocal, get_db_session
+from app.schemas.domain import BusinessCreate, BusinessRead, SupplierDeliverySettingsUpdate
+from app.service.business_service import (
+    create_business,
+    get_business_by_email,
+    get_business_by_id,
+    update_supplier_delivery_settings,
+)
+from app.service.business_import_service import import_businesses, iter_csv_rows, iter_ndjson_rows
 
 router = APIRouter(prefix="/businesses")
 
+# Uploads are spooled to disk beyond this many bytes.
+IMPORT_SPOOL_MEMORY_BYTES = 1_000_000
+
 
 @router.post("", response_model=BusinessRead, status_code=status.HTTP_201_CREATED)
 async def create_business_endpoint(payload: BusinessCreate, db: AsyncSession = Depends(get_db_session)) -> BusinessRead:
@@ -30,6 +46,44 @@ async def create_business_endpoint(payload: BusinessCreate, db: AsyncSession = D
     return BusinessRead.model_validate(business)
 
 
+@router.post("/import", status_code=status.HTTP_200_OK)
+async def import_businesses_endpoint(
+    request: Request,
+    import_format: str | None = Query(default=None, alias="format", pattern="^(csv|ndjson)$"),
+) -> StreamingResponse:
+    """Bulk-create businesses from a CSV (with header) or NDJSON request body.
+
+    Responds with NDJSON: one ``{"row", "status", ...}`` result per input row, then a
+    ``{"summary": {"created", "failed"}}`` line.
+    """
+    content_type = request.headers.get("content-type", "")
+    import_format = import_format or ("ndjson" if "ndjson" in content_type or "jsonl" in content_type else "csv")
+
+    upload = SpooledTemporaryFile(max_size=IMPORT_SPOOL_MEMORY_BYTES)
+    max_bytes = get_settings().business_import_max_bytes
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > max_bytes:
+            upload.close()
+            raise HTTPException(status_code=413, detail=f"Import is larger than {max_bytes} bytes")
+        upload.write(chunk)
+    upload.seek(0)
+
+    async def report() -> AsyncIterator[str]:
+        try:
+            text = io.TextIOWrapper(upload, encoding="utf-8-sig", errors="replace", newline="")
+            rows = iter_ndjson_rows(text) if import_format == "ndjson" else iter_csv_rows(text)
+            # The request's session is closed before a streamed body is sent; use our own.
+            async with SessionLocal() as session:
+                async for result in import_businesses(session, rows):
+                    yield json.dumps(result, default=str) + "\n"
+        finally:
+            upload.close()
+
+    return StreamingResponse(report(), media_type="application/x-ndjson")
+
+
 @router.get("/{business_id}", response_model=BusinessRead)
 async def get_business_endpoint(business_id: str, db: AsyncSession = Depends(get_db_session)) -> BusinessRead:
     business = await get_business_by_id(db, business_id)
@@ -38,6 +92,23 @@ async def get_business_endpoint(business_id: str, db: AsyncSession = Depends(get
     return BusinessRead.model_validate(business)
 
 
+@router.patch("/{business_id}/delivery-settings", response_model=BusinessRead)
+async def update_delivery_settings_endpoint(
+    business_id: str,
+    payload: SupplierDeliverySettingsUpdate,
+    db: AsyncSession = Depends(get_db_session),
+) -> BusinessRead:
+    try:
+        business = await update_supplier_delivery_settings(
+            db,
+            business_id=business_id,
+            truck_unit_capacity=payload.truck_unit_capacity,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return BusinessRead.model_validate(business)
+
+
 @router.get("", response_model=BusinessRead)
 async def get_business_by_email_endpoint(
     email: str = Query(...),
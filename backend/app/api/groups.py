@@ -1,23 +1,119 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+import asyncio
+from collections.abc import AsyncIterator
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_db_session
 from app.schemas.domain import GroupCreate, GroupDetailRead, GroupJoinCreate, GroupRead, SupplierGroupApproveCreate
-from app.service.group_service import create_group, get_group_details, join_group, list_active_groups, supplier_approve_group
+from app.service.change_version_service import (
+    build_etag,
+    etag_matches,
+    get_group_change_version,
+    get_region_change_version,
+)
+from app.service.group_events import group_event_broker
+from app.service.group_service import (
+    create_group,
+    encode_group_cursor,
+    get_group_details,
+    join_group,
+    list_active_groups,
+    supplier_approve_group,
+)
+from app.service.route_geometry import MAX_ZOOM
 
 router = APIRouter(prefix="/groups")
 
+SSE_KEEPALIVE_SECONDS = 15.0
+# Page size when a cursor is passed without a limit; with neither, the full list is returned.
+DEFAULT_GROUP_PAGE_SIZE = 50
+
+
+def _revalidation_headers(etag: str) -> dict[str, str]:
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
 
 @router.get("", response_model=list[GroupRead])
 async def list_groups_endpoint(
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db_session),
     region_id: int | None = Query(default=None),
     business_id: str | None = Query(default=None),
-) -> list[GroupRead]:
-    groups = await list_active_groups(db, region_id=region_id, business_id=business_id)
+    category: str | None = Query(default=None),
+    group_status: str | None = Query(default=None, alias="status"),
+    supplier_business_id: str | None = Query(default=None),
+    min_progress_pct: float | None = Query(default=None, ge=0),
+    cursor: str | None = Query(default=None),
+    limit: int | None = Query(default=None, ge=1, le=200),
+) -> list[GroupRead] | Response:
+    if limit is None and cursor is not None:
+        limit = DEFAULT_GROUP_PAGE_SIZE
+    version = await get_region_change_version(db, region_id)
+    etag = build_etag(
+        "groups",
+        version,
+        region_id,
+        business_id,
+        category,
+        group_status,
+        supplier_business_id,
+        min_progress_pct,
+        cursor,
+        limit,
+    )
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=_revalidation_headers(etag))
+
+    try:
+        groups = await list_active_groups(
+            db,
+            region_id=region_id,
+            business_id=business_id,
+            category=category,
+            status=group_status,
+            supplier_business_id=supplier_business_id,
+            min_progress_pct=min_progress_pct,
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    response.headers.update(_revalidation_headers(etag))
+    # The body stays a plain list; the next page is advertised out of band.
+    if limit is not None and len(groups) == limit:
+        last = groups[-1]
+        response.headers["X-Next-Cursor"] = encode_group_cursor(last["created_at"], str(last["id"]))
     return [GroupRead(**group) for group in groups]
 
 
+@router.get("/stream", summary="Stream live group progress (Server-Sent Events)")
+async def stream_groups_endpoint(
+    request: Request,
+    region_id: int | None = Query(default=None),
+) -> StreamingResponse:
+    async def event_stream() -> AsyncIterator[str]:
+        async with group_event_broker.subscribe(region_id) as queue:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: group_progress\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("", response_model=GroupRead, status_code=status.HTTP_201_CREATED)
 async def create_group_endpoint(payload: GroupCreate, db: AsyncSession = Depends(get_db_session)) -> GroupRead:
     try:
@@ -54,10 +150,21 @@ async def join_group_endpoint(group_id: str, payload: GroupJoinCreate, db: Async
 
 
 @router.get("/{group_id}", response_model=GroupDetailRead)
-async def get_group_endpoint(group_id: str, db: AsyncSession = Depends(get_db_session)) -> GroupDetailRead:
-    details = await get_group_details(db, group_id)
+async def get_group_endpoint(
+    group_id: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db_session),
+    zoom: int | None = Query(default=None, ge=0, le=MAX_ZOOM),
+) -> GroupDetailRead | Response:
+    etag = build_etag("group", await get_group_change_version(db, group_id), group_id, zoom)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=_revalidation_headers(etag))
+
+    details = await get_group_details(db, group_id, include_route=True, route_zoom=zoom)
     if not details:
         raise HTTPException(status_code=404, detail="Group not found")
+    response.headers.update(_revalidation_headers(etag))
     return GroupDetailRead(**details)
 
 
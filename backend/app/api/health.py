@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException
 
+from app.core.cache_metrics import cache_metrics_snapshot
 from app.db.session import check_db_connection
 from app.service.health_service import build_health_payload
 
@@ -17,3 +18,8 @@ async def db_health_check() -> dict[str, str]:
     if ok:
         return {"status": "ok", "db": "connected"}
     raise HTTPException(status_code=503, detail={"status": "error", "db": "disconnected", "reason": detail})
+
+
+@router.get("/caches", summary="Cache hit/miss counters for this worker")
+async def cache_health_check() -> dict[str, object]:
+    return {"status": "ok", "caches": cache_metrics_snapshot()}
@@ -1,30 +1,56 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import get_settings
 from app.db.models.region import Region
 from app.db.session import get_db_session
+from app.service.city_grid import parse_cell_code
+from app.service.region_index import RegionIndex, get_region_index, load_regions
 
 router = APIRouter(prefix="/regions")
 
 
+def _region_payload(region: Region) -> dict[str, object]:
+    parsed = parse_cell_code(region.code)
+    return {
+        "id": region.id,
+        "code": region.code,
+        "name": region.name,
+        "city_code": parsed[0] if parsed else None,
+        "row_index": region.row_index,
+        "col_index": region.col_index,
+        "bounds": {
+            "min_lat": region.min_lat,
+            "max_lat": region.max_lat,
+            "min_lng": region.min_lng,
+            "max_lng": region.max_lng,
+        },
+    }
+
+
 @router.get("")
 async def list_regions(db: AsyncSession = Depends(get_db_session)) -> list[dict[str, object]]:
     result = await db.execute(select(Region).order_by(Region.row_index.asc(), Region.col_index.asc()))
     regions = result.scalars().all()
-    return [
-        {
-            "id": region.id,
-            "code": region.code,
-            "name": region.name,
-            "row_index": region.row_index,
-            "col_index": region.col_index,
-            "bounds": {
-                "min_lat": region.min_lat,
-                "max_lat": region.max_lat,
-                "min_lng": region.min_lng,
-                "max_lng": region.max_lng,
-            },
-        }
-        for region in regions
-    ]
+    return [_region_payload(region) for region in regions]
+
+
+@router.get("/locate")
+async def locate_region(
+    latitude: float = Query(ge=-90, le=90),
+    longitude: float = Query(ge=-180, le=180),
+    radius: int = Query(default=1, ge=0, le=3),
+    db: AsyncSession = Depends(get_db_session),
+) -> dict[str, object]:
+    """Block, sub-cell and neighbouring blocks for a point."""
+    index = await get_region_index(db) or RegionIndex(await load_regions())
+    cell = index.locate(latitude, longitude, get_settings().region_subcell_divisions)
+    if cell is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No region contains this point")
+    return {
+        "region": _region_payload(cell.region),
+        "city_code": cell.city_code,
+        "subcell": {"code": cell.code, "row": cell.sub_row, "col": cell.sub_col},
+        "neighbors": [_region_payload(region) for region in index.neighbors(cell.region, radius)],
+    }
@@ -3,6 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_db_session
 from app.schemas.domain import SupplierConfirmedOrderRead
+from app.service.route_geometry import MAX_ZOOM
 from app.service.supplier_order_service import list_supplier_confirmed_orders
 
 router = APIRouter(prefix="/supplier-orders")
@@ -12,6 +13,13 @@ router = APIRouter(prefix="/supplier-orders")
 async def list_supplier_orders_endpoint(
     db: AsyncSession = Depends(get_db_session),
     supplier_business_id: str | None = Query(default=None),
+    include: str | None = Query(default=None, pattern="^route$"),
+    zoom: int | None = Query(default=None, ge=0, le=MAX_ZOOM),
 ) -> list[SupplierConfirmedOrderRead]:
-    rows = await list_supplier_confirmed_orders(db, supplier_business_id=supplier_business_id)
+    rows = await list_supplier_confirmed_orders(
+        db,
+        supplier_business_id=supplier_business_id,
+        include_route=include == "route",
+        route_zoom=zoom,
+    )
     return [SupplierConfirmedOrderRead(**row) for row in rows]
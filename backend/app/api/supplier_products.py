@@ -4,11 +4,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models.business import Business
 from app.db.session import get_db_session
-from app.schemas.domain import SupplierProductCreate, SupplierProductRead
+from app.schemas.domain import SupplierProductCreate, SupplierProductInventoryUpdate, SupplierProductRead
+from app.service.group_service import publish_supplier_product_progress
 from app.service.supplier_service import (
     create_supplier_product,
     get_reserved_units_by_supplier_product,
     list_supplier_products,
+    update_supplier_product_inventory,
 )
 from app.service.utils import to_float
 
@@ -50,6 +52,41 @@ async def create_supplier_product_endpoint(
     )
 
 
+@router.patch("/{supplier_product_id}", response_model=SupplierProductRead)
+async def update_supplier_product_inventory_endpoint(
+    supplier_product_id: str,
+    payload: SupplierProductInventoryUpdate,
+    db: AsyncSession = Depends(get_db_session),
+) -> SupplierProductRead:
+    try:
+        item = await update_supplier_product_inventory(
+            db,
+            supplier_product_id=supplier_product_id,
+            supplier_business_id=payload.supplier_business_id,
+            available_units=payload.available_units,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    # Inventory moves every open group's remaining units and may flip their statuses.
+    await publish_supplier_product_progress(db, item.id)
+    reserved_by_product = await get_reserved_units_by_supplier_product(db, [item.id])
+    return SupplierProductRead(
+        id=item.id,
+        supplier_business_id=item.supplier_business_id,
+        supplier_business_name=None,
+        name=item.name,
+        category=item.category,
+        material=item.material,
+        available_units=max(0, int(item.available_units) - int(reserved_by_product.get(item.id, 0))),
+        unit_price=to_float(item.unit_price),
+        min_order_units=item.min_order_units,
+        status=item.status,
+        created_at=item.created_at,
+        updated_at=item.updated_at,
+    )
+
+
 @router.get("", response_model=list[SupplierProductRead])
 async def list_supplier_products_endpoint(
     db: AsyncSession = Depends(get_db_session),
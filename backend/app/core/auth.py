@@ -1,20 +1,42 @@
+"""Bearer-token authentication against Supabase Auth.
+
+By default (``SUPABASE_AUTH_MODE=local``) access tokens are verified in-process. HS256
+tokens are checked with the project's JWT secret (``SUPABASE_JWT_SECRET``); until that is
+set they are checked remotely as before, so upgrading without it does not lock users out.
+Asymmetric tokens (RS256/ES256) are checked against the project's JWKS, which is cached and
+refreshed every ``SUPABASE_JWKS_REFRESH_SECONDS`` or when a token names an unknown key.
+``SUPABASE_AUTH_MODE=remote`` keeps the older behaviour of asking ``/auth/v1/user``
+about every new token.
+
+Either way, results go through the bounded per-process token cache in
+``app.core.token_cache``, which also coalesces concurrent checks of the same token.
+"""
+
 import asyncio
-import json
+import logging
 import time
 from typing import Any
-from urllib.error import HTTPError, URLError
-from urllib.request import Request, urlopen
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+import httpx
+import jwt
 from pydantic import BaseModel
 
 from app.core.config import Settings, get_settings
+from app.core.http import get_http_client
+from app.core.token_cache import get_token_cache
+
+logger = logging.getLogger(__name__)
 
 security = HTTPBearer()
 
-_TOKEN_CACHE: dict[str, tuple[dict[str, Any], float]] = {}
-_TOKEN_CACHE_TTL = 300  # 5 minutes
+AUTH_MODES = ("local", "remote")
+ASYMMETRIC_ALGORITHMS = ("RS256", "ES256")
+# An unknown key id triggers a JWKS refetch at most this often, so forged kids cannot
+# turn every request into a call to Supabase.
+_JWKS_MIN_REFETCH_SECONDS = 30.0
+_warned_missing_jwt_secret = False
 
 
 class AuthenticatedUser(BaseModel):
@@ -32,55 +54,192 @@ def _unauthorized(detail: str = "Invalid or expired token") -> HTTPException:
     )
 
 
-async def _fetch_supabase_user(token: str, settings: Settings) -> dict[str, Any]:
-    cached = _TOKEN_CACHE.get(token)
-    if cached is not None:
-        data, ts = cached
-        if time.monotonic() - ts < _TOKEN_CACHE_TTL:
-            return data
-        del _TOKEN_CACHE[token]
+def _misconfigured(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=detail)
+
 
+def _auth_unavailable() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Failed to validate token with Supabase",
+    )
+
+
+async def _fetch_supabase_user(token: str, settings: Settings) -> dict[str, Any]:
     if not settings.supabase_url:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="SUPABASE_URL is not configured",
-        )
+        raise _misconfigured("SUPABASE_URL is not configured")
 
     if not settings.supabase_anon_key:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="SUPABASE_ANON_KEY is not configured",
-        )
+        raise _misconfigured("SUPABASE_ANON_KEY is not configured")
 
     user_url = f"{settings.supabase_url.rstrip('/')}/auth/v1/user"
-
-    def _fetch() -> dict[str, Any]:
-        request = Request(
+    try:
+        response = await get_http_client().get(
             user_url,
             headers={
                 "Authorization": f"Bearer {token}",
                 "apikey": settings.supabase_anon_key,
             },
+            timeout=10.0,
+        )
+    except httpx.HTTPError as exc:
+        raise _auth_unavailable() from exc
+    if response.status_code in (401, 403):
+        raise _unauthorized()
+    if response.status_code != 200:
+        raise _auth_unavailable()
+    try:
+        return response.json()
+    except ValueError as exc:
+        raise _auth_unavailable() from exc
+
+
+class _JwksCache:
+    """The project's signing keys by ``kid``, fetched from the JWKS endpoint on demand."""
+
+    def __init__(self) -> None:
+        self.url = ""
+        self.keys: dict[str, jwt.PyJWK] = {}
+        self.fetched_at = 0.0
+        self._lock: asyncio.Lock | None = None
+        self._lock_loop: asyncio.AbstractEventLoop | None = None
+
+    def _refresh_lock(self) -> asyncio.Lock:
+        # One refresh per event loop at a time; concurrent callers wait for its result.
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    async def _refresh(self, url: str) -> None:
+        try:
+            response = await get_http_client().get(url, timeout=10.0)
+            response.raise_for_status()
+            entries = response.json().get("keys", [])
+        except (httpx.HTTPError, ValueError, AttributeError) as exc:
+            raise _auth_unavailable() from exc
+        keys: dict[str, jwt.PyJWK] = {}
+        for entry in entries:
+            if entry.get("use", "sig") != "sig" or not entry.get("kid"):
+                continue
+            try:
+                keys[entry["kid"]] = jwt.PyJWK(entry)
+            except jwt.PyJWTError as exc:
+                logger.warning("Skipping unusable JWKS key %s: %s", entry.get("kid"), exc)
+        self.url = url
+        self.keys = keys
+        self.fetched_at = time.monotonic()
+
+    async def get_key(self, url: str, kid: str, refresh_seconds: float) -> jwt.PyJWK | None:
+        age = time.monotonic() - self.fetched_at
+        stale = self.url != url or age >= refresh_seconds
+        if not stale and (kid in self.keys or age < _JWKS_MIN_REFETCH_SECONDS):
+            return self.keys.get(kid)
+        async with self._refresh_lock():
+            # Another request may have refreshed while this one waited.
+            age = time.monotonic() - self.fetched_at
+            if self.url != url or age >= refresh_seconds or (kid not in self.keys and age >= _JWKS_MIN_REFETCH_SECONDS):
+                try:
+                    await self._refresh(url)
+                except HTTPException:
+                    if self.url != url or not self.keys:
+                        raise
+                    # Keep verifying with the last good key set while Supabase is unreachable.
+                    logger.warning("JWKS refresh from %s failed; using cached keys", url)
+        return self.keys.get(kid)
+
+
+_jwks_cache = _JwksCache()
+
+
+def _jwks_url(settings: Settings) -> str:
+    if settings.supabase_jwks_url:
+        return settings.supabase_jwks_url
+    if not settings.supabase_url:
+        raise _misconfigured("SUPABASE_URL or SUPABASE_JWKS_URL is not configured")
+    return f"{settings.supabase_url.rstrip('/')}/auth/v1/.well-known/jwks.json"
+
+
+async def _verify_supabase_jwt(token: str, settings: Settings) -> dict[str, Any]:
+    """Check the token's signature and claims locally; returns the user in ``/auth/v1/user`` shape."""
+    try:
+        header = jwt.get_unverified_header(token)
+    except jwt.PyJWTError as exc:
+        raise _unauthorized() from exc
+
+    algorithm = header.get("alg")
+    if algorithm == "HS256":
+        if not settings.supabase_jwt_secret:
+            global _warned_missing_jwt_secret
+            if not _warned_missing_jwt_secret:
+                logger.warning("SUPABASE_JWT_SECRET is not set; verifying HS256 tokens with Supabase instead")
+                _warned_missing_jwt_secret = True
+            return await _fetch_supabase_user(token, settings)
+        key: Any = settings.supabase_jwt_secret
+    elif algorithm in ASYMMETRIC_ALGORITHMS:
+        kid = header.get("kid")
+        if not kid:
+            raise _unauthorized()
+        jwk = await _jwks_cache.get_key(_jwks_url(settings), kid, settings.supabase_jwks_refresh_seconds)
+        if jwk is None or jwk.algorithm_name != algorithm:
+            raise _unauthorized()
+        key = jwk.key
+    else:
+        raise _unauthorized()
+
+    try:
+        claims = jwt.decode(
+            token,
+            key,
+            algorithms=[algorithm],
+            audience=settings.supabase_jwt_audience or None,
+            issuer=f"{settings.supabase_url.rstrip('/')}/auth/v1" if settings.supabase_url else None,
+            leeway=settings.supabase_jwt_leeway_seconds,
+            options={"require": ["exp", "sub"], "verify_aud": bool(settings.supabase_jwt_audience)},
         )
-        with urlopen(request, timeout=10.0) as response:
-            return json.loads(response.read().decode("utf-8"))
+    except jwt.PyJWTError as exc:
+        raise _unauthorized() from exc
+
+    return {
+        "id": claims["sub"],
+        "email": claims.get("email"),
+        "role": claims.get("role"),
+        "aud": claims.get("aud"),
+        "app_metadata": claims.get("app_metadata") or {},
+        "user_metadata": claims.get("user_metadata") or {},
+    }
+
+
+async def _validate_token(token: str, settings: Settings) -> dict[str, Any]:
+    if settings.supabase_auth_mode == "remote":
+        return await _fetch_supabase_user(token, settings)
+    if settings.supabase_auth_mode != "local":
+        raise _misconfigured(f"SUPABASE_AUTH_MODE must be one of {', '.join(AUTH_MODES)}")
+    return await _verify_supabase_jwt(token, settings)
+
 
+def _token_expiry(token: str) -> float | None:
+    """The token's ``exp`` without verifying it; only ever used to shorten a cache entry."""
     try:
-        result = await asyncio.to_thread(_fetch)
-        _TOKEN_CACHE[token] = (result, time.monotonic())
-        return result
-    except HTTPError as exc:
-        if exc.code in (401, 403):
-            raise _unauthorized() from exc
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Failed to validate token with Supabase",
-        ) from exc
-    except (URLError, TimeoutError, json.JSONDecodeError, OSError) as exc:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Failed to validate token with Supabase",
-        ) from exc
+        exp = jwt.decode(token, options={"verify_signature": False}).get("exp")
+    except jwt.PyJWTError:
+        return None
+    return float(exp) if isinstance(exp, (int, float)) else None
+
+
+def _is_rejection(exc: BaseException) -> bool:
+    # Only definitive 401s are cached; config errors and Supabase outages are retried.
+    return isinstance(exc, HTTPException) and exc.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+async def _resolve_supabase_user(token: str, settings: Settings) -> dict[str, Any]:
+    return await get_token_cache().get_or_load(
+        token,
+        lambda: _validate_token(token, settings),
+        token_expires_at=_token_expiry(token),
+        is_rejection=_is_rejection,
+    )
 
 
 async def get_current_user(
@@ -88,7 +247,7 @@ async def get_current_user(
     settings: Settings = Depends(get_settings),
 ) -> AuthenticatedUser:
     token = credentials.credentials
-    user_data = await _fetch_supabase_user(token, settings)
+    user_data = await _resolve_supabase_user(token, settings)
 
     user_id = user_data.get("id")
     if not user_id:
@@ -0,0 +1,40 @@
+class CacheCounters:
+    """Hit/miss/store/eviction counters for one cache in this worker process."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def snapshot(self) -> dict[str, float | int]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def reset(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+
+_registry: dict[str, CacheCounters] = {}
+
+
+def cache_counters(name: str) -> CacheCounters:
+    """Return the process-wide counters for ``name``, creating them on first use."""
+    counters = _registry.get(name)
+    if counters is None:
+        counters = _registry[name] = CacheCounters(name)
+    return counters
+
+
+def cache_metrics_snapshot() -> dict[str, dict[str, float | int]]:
+    return {name: counters.snapshot() for name, counters in sorted(_registry.items())}
@@ -16,6 +16,18 @@ class Settings(BaseSettings):
     supabase_url: str = ""
     supabase_anon_key: str = ""
     supabase_jwt_audience: str = "authenticated"
+    # "local" verifies access tokens in-process; "remote" asks Supabase about each new token.
+    supabase_auth_mode: str = "local"
+    # Empty: HS256 tokens are checked remotely even in local mode.
+    supabase_jwt_secret: str = ""
+    # Defaults to {SUPABASE_URL}/auth/v1/.well-known/jwks.json
+    supabase_jwks_url: str = ""
+    supabase_jwks_refresh_seconds: float = 600.0
+    supabase_jwt_leeway_seconds: float = 30.0
+    auth_token_cache_max_entries: int = 10000
+    auth_token_cache_ttl_seconds: float = 300.0
+    auth_token_cache_negative_ttl_seconds: float = 30.0
+    auth_token_cache_sweep_seconds: float = 60.0
     baseline_delivery_miles: float = 5.0
     consolidated_delivery_miles: float = 8.0
     city_projection_businesses: int = 1000
@@ -26,6 +38,19 @@ class Settings(BaseSettings):
     gemini_api_key: str = ""
     gemini_model: str = "gemini-2.0-flash-lite"
     google_maps_api_key: str = ""
+    geocode_request_timeout_seconds: float = 10.0
+    geocode_max_concurrency: int = 8
+    geocode_cache_ttl_seconds: float = 2592000.0
+    geocode_cache_negative_ttl_seconds: float = 86400.0
+    business_import_batch_size: int = 200
+    business_import_max_bytes: int = 50_000_000
+    # How often each worker checks whether regions changed; 0 disables the in-memory index.
+    region_index_refresh_seconds: float = 60.0
+    # JSON list of city grids to seed (empty: the built-in San Francisco grid).
+    region_cities_path: str = ""
+    # CSV of zip_prefix,region_code fallbacks (empty: the built-in San Francisco table).
+    region_zip_table_path: str = ""
+    region_subcell_divisions: int = 4
     group_default_min_businesses_required: int = 5
     smtp_host: str = ""
     smtp_port: int = 587
@@ -34,6 +59,34 @@ class Settings(BaseSettings):
     smtp_from_email: str = ""
     smtp_use_tls: bool = True
     cors_allow_origins: str = "*"
+    order_lifecycle_scheduler_enabled: bool = True
+    order_lifecycle_interval_seconds: float = 60.0
+    group_list_cache_ttl_seconds: float = 30.0
+    job_worker_enabled: bool = True
+    job_worker_interval_seconds: float = 2.0
+    job_worker_batch_size: int = 10
+    job_max_attempts: int = 5
+    job_retry_base_seconds: float = 30.0
+    job_lock_timeout_seconds: float = 600.0
+    http_timeout_seconds: float = 10.0
+    http_max_connections: int = 20
+    directions_request_timeout_seconds: float = 12.0
+    directions_max_concurrency: int = 4
+    directions_deadline_seconds: float = 20.0
+    # "candidates": one optimize:true Directions request per candidate final stop.
+    # "matrix": one distance matrix, local ordering, one fixed-order Directions request.
+    directions_mode: str = "candidates"
+    # Distance Matrix bills every origin x destination element; above this many stops,
+    # matrix mode orders on the road graph or straight-line miles instead.
+    directions_matrix_max_stops: int = 25
+    route_cache_ttl_seconds: float = 604800.0
+    route_cache_coordinate_decimals: int = 4
+    route_optimizer_time_budget_seconds: float = 0.25
+    default_truck_unit_capacity: int = 0
+    delivery_planning_time_budget_seconds: float = 2.0
+    # "google" tries Directions first; "road_graph" routes only on the local graph.
+    routing_backend: str = "google"
+    road_graph_path: str = ""
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
@@ -0,0 +1,48 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """Run an async callable on a fixed interval inside the app's event loop.
+
+    Failures are logged and the loop keeps going; every uvicorn worker runs its own copy,
+    so callbacks must be idempotent.
+    """
+
+    def __init__(self, name: str, interval_seconds: float, func: Callable[[], Awaitable[object]]) -> None:
+        self.name = name
+        self.interval_seconds = max(0.1, float(interval_seconds))
+        self._func = func
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run(), name=self.name)
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._func()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Periodic task %s failed", self.name)
+            await asyncio.sleep(self.interval_seconds)
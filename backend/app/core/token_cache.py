@@ -0,0 +1,156 @@
+import asyncio
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+import hashlib
+import time
+from typing import Any
+
+from app.core.cache_metrics import CacheCounters, cache_counters
+from app.core.config import get_settings
+
+
+class TokenCache:
+    """Bounded LRU/TTL cache of validated bearer tokens for one worker process.
+
+    Entries are keyed by a SHA-256 of the token, so raw tokens are not kept in memory.
+    Each entry lives for ``ttl_seconds``, or until the token's own expiry if that is sooner.
+    Concurrent lookups of an uncached token share one validation (single flight).
+    Rejections the caller marks as definitive are cached for ``negative_ttl_seconds``.
+    Expired entries are dropped lazily and by ``purge_expired``, which the app runs in the
+    background.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int,
+        ttl_seconds: float,
+        negative_ttl_seconds: float,
+        counters: CacheCounters | None = None,
+    ) -> None:
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.counters = counters or CacheCounters("token_cache")
+        # key -> (monotonic expiry, value, rejection)
+        self._entries: OrderedDict[str, tuple[float, Any, BaseException | None]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task[Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def _lookup(self, key: str) -> tuple[float, Any, BaseException | None] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            self.counters.evictions += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, key: str, expires_at: float, value: Any, rejection: BaseException | None) -> None:
+        if expires_at <= time.monotonic():
+            return
+        self._entries[key] = (expires_at, value, rejection)
+        self._entries.move_to_end(key)
+        self.counters.stores += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.counters.evictions += 1
+
+    async def get_or_load(
+        self,
+        token: str,
+        load: Callable[[], Awaitable[Any]],
+        *,
+        token_expires_at: float | None = None,
+        is_rejection: Callable[[BaseException], bool] = lambda _exc: False,
+    ) -> Any:
+        """Cached value for ``token``, or the result of ``load()`` (run once for concurrent callers).
+
+        ``token_expires_at`` is the token's own expiry as a Unix timestamp. Exceptions for
+        which ``is_rejection`` is true are cached and re-raised to later callers.
+        """
+        if self.ttl_seconds <= 0:
+            return await load()
+        key = self.key(token)
+        entry = self._lookup(key)
+        if entry is not None:
+            self.counters.hits += 1
+            if entry[2] is not None:
+                raise entry[2].with_traceback(None)
+            return entry[1]
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.counters.misses += 1
+            task = asyncio.ensure_future(self._load(key, load, token_expires_at, is_rejection))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.counters.hits += 1
+        # A caller that is cancelled must not cancel the validation others are waiting on.
+        return await asyncio.shield(task)
+
+    async def _load(
+        self,
+        key: str,
+        load: Callable[[], Awaitable[Any]],
+        token_expires_at: float | None,
+        is_rejection: Callable[[BaseException], bool],
+    ) -> Any:
+        now = time.monotonic()
+        cap = now + (token_expires_at - time.time()) if token_expires_at is not None else float("inf")
+        try:
+            value = await load()
+        except Exception as exc:
+            if is_rejection(exc) and self.negative_ttl_seconds > 0:
+                self._store(key, min(now + self.negative_ttl_seconds, cap), None, exc)
+            raise
+        self._store(key, min(now + self.ttl_seconds, cap), value, None)
+        return value
+
+    def _finish(self, key: str, task: asyncio.Task[Any]) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here so an unawaited failure is not logged as lost
+
+    def purge_expired(self) -> int:
+        """Drop every expired entry; returns how many were removed."""
+        now = time.monotonic()
+        expired = [key for key, (expires_at, _, _) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+        self.counters.evictions += len(expired)
+        return len(expired)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+_token_cache: TokenCache | None = None
+
+
+def get_token_cache() -> TokenCache:
+    """Process-wide cache of validated access tokens, sized from settings on first use."""
+    global _token_cache
+    if _token_cache is None:
+        settings = get_settings()
+        _token_cache = TokenCache(
+            max_entries=settings.auth_token_cache_max_entries,
+            ttl_seconds=settings.auth_token_cache_ttl_seconds,
+            negative_ttl_seconds=settings.auth_token_cache_negative_ttl_seconds,
+            counters=cache_counters("auth_token_cache"),
+        )
+    return _token_cache
+
+
+async def purge_token_cache() -> None:
+    get_token_cache().purge_expired()
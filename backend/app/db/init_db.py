@@ -3,16 +3,42 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.base import Base
 from app.db.models import (
+    BackgroundJob,
     Business,
     BuyingGroup,
+    ChangeVersion,
+    DeliveryRoute,
+    GeocodeCacheEntry,
     GroupCommitment,
+    GroupRollup,
     Product,
     Region,
+    RouteCacheEntry,
     SupplierConfirmedOrder,
     SupplierProduct,
 )
 from app.db.seed import seed_products, seed_regions
 from app.db.session import SessionLocal, engine
+from app.service.group_rollup_service import rebuild_group_rollups
+
+
+COMMITMENT_DEDUPE_STATEMENTS = (
+    "WITH ranked AS ("
+    " SELECT id, ROW_NUMBER() OVER (PARTITION BY group_id, business_id ORDER BY created_at, id) AS rn,"
+    " SUM(units) OVER (PARTITION BY group_id, business_id) AS total_units,"
+    " COUNT(*) OVER (PARTITION BY group_id, business_id) AS copies"
+    " FROM group_commitments"
+    ") UPDATE group_commitments SET units = ranked.total_units FROM ranked"
+    " WHERE group_commitments.id = ranked.id AND ranked.rn = 1 AND ranked.copies > 1",
+    "DELETE FROM group_commitments WHERE id IN ("
+    " SELECT id FROM ("
+    "  SELECT id, ROW_NUMBER() OVER (PARTITION BY group_id, business_id ORDER BY created_at, id) AS rn"
+    "  FROM group_commitments"
+    " ) ranked WHERE rn > 1"
+    ")",
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_group_commitments_group_id_business_id "
+    "ON group_commitments (group_id, business_id)",
+)
 
 
 async def init_db() -> None:
@@ -28,6 +54,7 @@ async def init_db() -> None:
             "ALTER TABLE businesses ADD COLUMN IF NOT EXISTS latitude DOUBLE PRECISION",
             "ALTER TABLE businesses ADD COLUMN IF NOT EXISTS longitude DOUBLE PRECISION",
             "ALTER TABLE businesses ADD COLUMN IF NOT EXISTS region_id INTEGER",
+            "ALTER TABLE businesses ADD COLUMN IF NOT EXISTS truck_unit_capacity INTEGER",
             "ALTER TABLE buying_groups ADD COLUMN IF NOT EXISTS region_id INTEGER",
             "ALTER TABLE buying_groups ADD COLUMN IF NOT EXISTS supplier_business_id VARCHAR(36)",
             "ALTER TABLE buying_groups ADD COLUMN IF NOT EXISTS supplier_product_id VARCHAR(36)",
@@ -39,13 +66,37 @@ async def init_db() -> None:
             "ALTER TABLE supplier_confirmed_orders ADD COLUMN IF NOT EXISTS route_total_miles DOUBLE PRECISION",
             "ALTER TABLE supplier_confirmed_orders ADD COLUMN IF NOT EXISTS route_total_minutes DOUBLE PRECISION",
             "ALTER TABLE supplier_confirmed_orders ADD COLUMN IF NOT EXISTS route_points JSONB",
+            "ALTER TABLE supplier_confirmed_orders ADD COLUMN IF NOT EXISTS delivery_route_id VARCHAR(36) "
+            "REFERENCES delivery_routes (id) ON DELETE SET NULL",
+            # Trip geometry is kept once per route as an encoded polyline; orders planned before
+            # that still carry their own route_points.
+            "ALTER TABLE delivery_routes ADD COLUMN IF NOT EXISTS route_polyline TEXT",
+            "ALTER TABLE delivery_routes DROP COLUMN IF EXISTS route_points",
+            "CREATE INDEX IF NOT EXISTS ix_supplier_confirmed_orders_due ON supplier_confirmed_orders (estimated_end_at) "
+            "WHERE status = 'confirmed'",
+            "CREATE INDEX IF NOT EXISTS ix_buying_groups_created_at_id ON buying_groups (created_at, id)",
+            "CREATE INDEX IF NOT EXISTS ix_buying_groups_region_id_created_at_id ON buying_groups (region_id, created_at, id)",
+            "CREATE INDEX IF NOT EXISTS ix_buying_groups_supplier_product_id ON buying_groups (supplier_product_id)",
         ]
         for ddl in statements:
+            # Each statement gets its own savepoint: in Postgres a failed statement aborts the
+            # enclosing transaction, which would silently skip everything after it.
             try:
-                await conn.execute(text(ddl))
+                async with conn.begin_nested():
+                    await conn.execute(text(ddl))
             except Exception:
                 pass
 
+    # Joins used to race past the duplicate check; fold any repeated (group, business)
+    # commitments into the earliest one, keeping total units, then enforce uniqueness. This
+    # runs in its own transaction and is not guarded, so a failure stops startup instead of
+    # leaving the table without its unique index.
+    async with engine.begin() as conn:
+        for ddl in COMMITMENT_DEDUPE_STATEMENTS:
+            await conn.execute(text(ddl))
+
     async with SessionLocal() as session:  # type: AsyncSession
         await seed_regions(session)
         await seed_products(session)
+        # Groups created before the rollup table existed have no counter row yet.
+        await rebuild_group_rollups(session, only_missing=True)
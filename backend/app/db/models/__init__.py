@@ -1,9 +1,15 @@
+from app.db.models.background_job import BackgroundJob
 from app.db.models.business import Business
 from app.db.models.buying_group import BuyingGroup
+from app.db.models.change_version import ChangeVersion
+from app.db.models.delivery_route import DeliveryRoute
+from app.db.models.geocode_cache_entry import GeocodeCacheEntry
 from app.db.models.group_commitment import GroupCommitment
+from app.db.models.group_rollup import GroupRollup
 from app.db.models.product import Product
 from app.db.models.region import Region
+from app.db.models.route_cache_entry import RouteCacheEntry
 from app.db.models.supplier_confirmed_order import SupplierConfirmedOrder
 from app.db.models.supplier_product import SupplierProduct
 
-__all__ = ["Business", "Product", "BuyingGroup", "GroupCommitment", "Region", "SupplierProduct", "SupplierConfirmedOrder"]
+__all__ = ["BackgroundJob", "Business", "Product", "BuyingGroup", "ChangeVersion", "DeliveryRoute", "GeocodeCacheEntry", "GroupCommitment", "GroupRollup", "Region", "RouteCacheEntry", "SupplierProduct", "SupplierConfirmedOrder"]
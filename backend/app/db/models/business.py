@@ -22,4 +22,6 @@ class Business(Base):
     latitude: Mapped[float | None] = mapped_column(Float, nullable=True)
     longitude: Mapped[float | None] = mapped_column(Float, nullable=True)
     region_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("regions.id"), nullable=True)
+    # Supplier delivery setting: units one truck carries; null falls back to DEFAULT_TRUCK_UNIT_CAPACITY.
+    truck_unit_capacity: Mapped[int | None] = mapped_column(Integer, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
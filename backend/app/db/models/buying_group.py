@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, func
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
@@ -8,6 +8,11 @@ from app.db.base import Base
 
 class BuyingGroup(Base):
     __tablename__ = "buying_groups"
+    __table_args__ = (
+        Index("ix_buying_groups_created_at_id", "created_at", "id"),
+        Index("ix_buying_groups_region_id_created_at_id", "region_id", "created_at", "id"),
+        Index("ix_buying_groups_supplier_product_id", "supplier_product_id"),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
     product_id: Mapped[str] = mapped_column(String(36), ForeignKey("products.id"), nullable=False)
@@ -0,0 +1,30 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, ForeignKey, Index, Integer, String, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class DeliveryRoute(Base):
+    """One truck trip from a supplier, shared by the confirmed orders it delivers."""
+
+    __tablename__ = "delivery_routes"
+    __table_args__ = (
+        Index("ix_delivery_routes_supplier_business_id_scheduled_start_at", "supplier_business_id", "scheduled_start_at"),
+    )
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    supplier_business_id: Mapped[str] = mapped_column(String(36), ForeignKey("businesses.id"), nullable=False)
+    scheduled_start_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    trip_index: Mapped[int] = mapped_column(Integer, nullable=False)
+    order_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    stop_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    total_units: Mapped[int] = mapped_column(Integer, nullable=False)
+    total_miles: Mapped[float] = mapped_column(Float, nullable=False)
+    total_minutes: Mapped[float] = mapped_column(Float, nullable=False)
+    # Sum of the miles each order would have driven on its own tour (straight-line estimate).
+    unbatched_miles: Mapped[float] = mapped_column(Float, nullable=False)
+    # Google encoded polyline ([lng, lat] at 1e-5 precision); expanded only when geometry is requested.
+    route_polyline: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
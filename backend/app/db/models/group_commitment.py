@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, func
+from sqlalchemy import DateTime, ForeignKey, Integer, String, UniqueConstraint, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
@@ -8,6 +8,9 @@ from app.db.base import Base
 
 class GroupCommitment(Base):
     __tablename__ = "group_commitments"
+    __table_args__ = (
+        UniqueConstraint("group_id", "business_id", name="uq_group_commitments_group_id_business_id"),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
     group_id: Mapped[str] = mapped_column(String(36), ForeignKey("buying_groups.id"), nullable=False)
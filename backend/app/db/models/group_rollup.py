@@ -0,0 +1,18 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class GroupRollup(Base):
+    __tablename__ = "group_rollups"
+
+    group_id: Mapped[str] = mapped_column(String(36), ForeignKey("buying_groups.id"), primary_key=True)
+    current_units: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    business_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, Integer, String, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class RouteCacheEntry(Base):
+    __tablename__ = "route_cache"
+
+    # sha256 of the rounded origin and sorted, rounded destination set
+    cache_key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    encoded_polyline: Mapped[str] = mapped_column(Text, nullable=False)
+    total_miles: Mapped[float] = mapped_column(Float, nullable=False)
+    total_minutes: Mapped[float] = mapped_column(Float, nullable=False)
+    stop_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    hit_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, Float, ForeignKey, Integer, JSON, String, UniqueConstraint, func
+from sqlalchemy import DateTime, Float, ForeignKey, Index, Integer, JSON, String, UniqueConstraint, func, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
@@ -8,7 +8,15 @@ from app.db.base import Base
 
 class SupplierConfirmedOrder(Base):
     __tablename__ = "supplier_confirmed_orders"
-    __table_args__ = (UniqueConstraint("group_id", name="uq_supplier_confirmed_orders_group_id"),)
+    __table_args__ = (
+        UniqueConstraint("group_id", name="uq_supplier_confirmed_orders_group_id"),
+        # Due-time index for the lifecycle scheduler: only still-open orders are scanned.
+        Index(
+            "ix_supplier_confirmed_orders_due",
+            "estimated_end_at",
+            postgresql_where=text("status = 'confirmed'"),
+        ),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
     supplier_business_id: Mapped[str] = mapped_column(String(36), ForeignKey("businesses.id"), nullable=False)
@@ -22,4 +30,7 @@ class SupplierConfirmedOrder(Base):
     route_total_miles: Mapped[float | None] = mapped_column(Float, nullable=True)
     route_total_minutes: Mapped[float | None] = mapped_column(Float, nullable=True)
     route_points: Mapped[list[list[float]] | None] = mapped_column(JSON, nullable=True)
+    delivery_route_id: Mapped[str | None] = mapped_column(
+        String(36), ForeignKey("delivery_routes.id", ondelete="SET NULL"), nullable=True
+    )
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -0,0 +1,50 @@
+"""Rebuild or verify the ``group_rollups`` counters against raw commitments.
+
+Usage:
+    python -m app.db.rebuild_group_rollups            # verify, rebuild, verify again
+    python -m app.db.rebuild_group_rollups --verify   # report mismatches only
+"""
+
+import argparse
+import asyncio
+
+from app.db.session import SessionLocal, engine
+from app.service.group_rollup_service import rebuild_group_rollups, verify_group_rollups
+
+
+async def _run(verify_only: bool) -> int:
+    async with SessionLocal() as session:
+        mismatches = await verify_group_rollups(session)
+        for row in mismatches:
+            print(
+                f"group {row['group_id']}: stored units={row['stored_current_units']} "
+                f"businesses={row['stored_business_count']}, expected units={row['expected_current_units']} "
+                f"businesses={row['expected_business_count']}"
+            )
+        print(f"{len(mismatches)} group rollup(s) out of sync")
+        if verify_only or not mismatches:
+            return 1 if mismatches else 0
+
+        updated = await rebuild_group_rollups(session)
+        print(f"Rebuilt {updated} group rollup(s)")
+        remaining = await verify_group_rollups(session)
+        print(f"{len(remaining)} group rollup(s) out of sync after rebuild")
+        return 1 if remaining else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--verify", action="store_true", help="only report mismatches, do not rewrite rows")
+    args = parser.parse_args()
+
+    async def _main() -> int:
+        try:
+            return await _run(args.verify)
+        finally:
+            await engine.dispose()
+
+    raise SystemExit(asyncio.run(_main()))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,12 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.router import api_router
 from app.core.config import get_settings
+from app.core.http import close_http_client
+from app.core.scheduler import PeriodicTask
+from app.core.token_cache import purge_token_cache
 from app.db.init_db import init_db
+from app.service.job_worker import run_job_worker_tick
+from app.service.supplier_order_service import run_order_lifecycle_tick
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
@@ -21,7 +26,26 @@ async def lifespan(_: FastAPI):
             if settings.db_init_strict:
                 raise
             logger.warning("DB init skipped on startup: %s", exc)
-    yield
+
+    background_tasks: list[PeriodicTask] = []
+    if settings.order_lifecycle_scheduler_enabled:
+        background_tasks.append(
+            PeriodicTask("order-lifecycle", settings.order_lifecycle_interval_seconds, run_order_lifecycle_tick)
+        )
+    if settings.job_worker_enabled:
+        background_tasks.append(PeriodicTask("job-worker", settings.job_worker_interval_seconds, run_job_worker_tick))
+    if settings.auth_token_cache_ttl_seconds > 0:
+        background_tasks.append(
+            PeriodicTask("token-cache-sweep", settings.auth_token_cache_sweep_seconds, purge_token_cache)
+        )
+    for task in background_tasks:
+        task.start()
+    try:
+        yield
+    finally:
+        for task in background_tasks:
+            await task.stop()
+        await close_http_client()
 
 
 app = FastAPI(title=settings.app_name, version=settings.app_version, lifespan=lifespan)
@@ -34,6 +58,7 @@ app.add_middleware(
     allow_credentials=not allow_all_origins,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
 app.include_router(api_router, prefix=settings.api_prefix)
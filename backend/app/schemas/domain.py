@@ -5,15 +5,16 @@ from pydantic import BaseModel, ConfigDict, Field
 
 
 class BusinessCreate(BaseModel):
-    name: str | None = None
-    email: str | None = None
-    business_type: str | None = None
-    account_type: str = "business"
-    address: str | None = None
-    city: str | None = None
-    state: str | None = None
-    neighborhood: str | None = None
-    zip_code: str | None = Field(default=None, alias="zip")
+    # Lengths mirror the ``businesses`` columns so oversized values fail validation, not the INSERT.
+    name: str | None = Field(default=None, max_length=255)
+    email: str | None = Field(default=None, max_length=255)
+    business_type: str | None = Field(default=None, max_length=100)
+    account_type: str = Field(default="business", max_length=30)
+    address: str | None = Field(default=None, max_length=255)
+    city: str | None = Field(default=None, max_length=100)
+    state: str | None = Field(default=None, max_length=50)
+    neighborhood: str | None = Field(default=None, max_length=100)
+    zip_code: str | None = Field(default=None, alias="zip", max_length=20)
     latitude: float | None = None
     longitude: float | None = None
 
@@ -34,9 +35,15 @@ class BusinessRead(BaseModel):
     latitude: float | None = None
     longitude: float | None = None
     region_id: int | None = None
+    truck_unit_capacity: int | None = None
     created_at: datetime
 
 
+class SupplierDeliverySettingsUpdate(BaseModel):
+    # Units one truck carries; null uses the server default.
+    truck_unit_capacity: int | None = Field(default=None, ge=1)
+
+
 class ProductRead(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -98,6 +105,7 @@ class GroupRead(BaseModel):
     scheduled_start_at: datetime | None = None
     estimated_end_at: datetime | None = None
     deadline: datetime | None = None
+    created_at: datetime | None = None
     target_units: int
     remaining_units: int | None = None
     current_units: int
@@ -139,6 +147,11 @@ class SupplierProductCreate(BaseModel):
     min_order_units: int = 1
 
 
+class SupplierProductInventoryUpdate(BaseModel):
+    supplier_business_id: str
+    available_units: int
+
+
 class SupplierProductRead(BaseModel):
     id: str
     supplier_business_id: str
@@ -167,6 +180,7 @@ class SupplierConfirmedOrderRead(BaseModel):
     route_total_miles: float | None = None
     route_total_minutes: float | None = None
     route_points: list[list[float]] | None = None
+    delivery_route_id: str | None = None
     group_display_name: str | None = None
     product_name: str | None = None
     created_at: datetime
@@ -0,0 +1,275 @@
+"""Bulk business onboarding from CSV or NDJSON.
+
+Rows are read lazily and handled ``BUSINESS_IMPORT_BATCH_SIZE`` at a time. Each batch does
+one geocode-cache lookup, geocodes its misses concurrently (bounded by the geocoding
+client), assigns regions with one vectorized call on the in-memory region index, inserts
+its businesses in a single multi-row INSERT and commits. If that INSERT fails, the batch is
+retried one row at a time so only the offending rows are reported. One result per row is
+yielded as soon as its batch is done, so neither the upload nor the report is ever held in
+memory as a whole.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Iterable, Iterator
+import csv
+from datetime import UTC, datetime
+import json
+import logging
+from typing import IO
+from uuid import uuid4
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.db.models.business import Business
+from app.schemas.domain import BusinessCreate
+from app.service.business_service import build_geocode_input, check_geocoded_location, normalize_business_type
+from app.service.geocode_cache_service import get_cached_geocodes, normalize_address, store_cached_geocodes
+from app.service.geocoding_service import GeocodingUnavailable, geocode_address
+from app.service.region_index import RegionIndex, get_region_index, load_regions
+from app.service.region_service import zip_fallback_region
+
+logger = logging.getLogger(__name__)
+
+# (1-based data row number, parsed fields or None, parse error or None)
+ImportRow = tuple[int, dict[str, object] | None, str | None]
+
+
+def iter_csv_rows(stream: IO[str]) -> Iterator[ImportRow]:
+    """Rows of a CSV with a header line; column names match ``BusinessCreate`` (``zip`` for ZIP)."""
+    reader = csv.DictReader(stream)
+    row_number = 0
+    try:
+        for row in reader:
+            row_number += 1
+            if None in row:
+                yield row_number, None, "Row has more fields than the header"
+                continue
+            yield row_number, row, None
+    except csv.Error as exc:
+        # The reader cannot resynchronise after a broken row, so this ends the import.
+        yield row_number + 1, None, f"Malformed CSV at line {reader.line_num}: {exc}"
+
+
+def iter_ndjson_rows(stream: IO[str]) -> Iterator[ImportRow]:
+    row_number = 0
+    for line in stream:
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            value = json.loads(line)
+        except ValueError:
+            yield row_number, None, "Line is not valid JSON"
+            continue
+        if not isinstance(value, dict):
+            yield row_number, None, "Line must be a JSON object"
+            continue
+        yield row_number, value, None
+
+
+def _parse_business(fields: dict[str, object]) -> BusinessCreate:
+    # CSV cells are strings; blank means "not given".
+    cleaned = {
+        key.strip(): (value.strip() or None) if isinstance(value, str) else value
+        for key, value in fields.items()
+        if key
+    }
+    if "zip_code" in cleaned and "zip" not in cleaned:
+        cleaned["zip"] = cleaned.pop("zip_code")
+    return BusinessCreate.model_validate(cleaned)
+
+
+async def _geocode_misses(addresses: list[str]) -> dict[str, dict[str, object] | None | GeocodingUnavailable]:
+    async def geocode(address: str) -> dict[str, object] | None | GeocodingUnavailable:
+        try:
+            return await geocode_address(address)
+        except GeocodingUnavailable as exc:
+            return exc
+
+    results = await asyncio.gather(*(geocode(address) for address in addresses))
+    return dict(zip(addresses, results))
+
+
+async def _import_batch(
+    session: AsyncSession,
+    batch: list[ImportRow],
+    index: RegionIndex,
+) -> list[dict[str, object]]:
+    settings = get_settings()
+    results: dict[int, dict[str, object]] = {}
+    pending: list[tuple[int, BusinessCreate, str]] = []
+    for row_number, fields, error in batch:
+        if error is not None:
+            results[row_number] = {"row": row_number, "status": "error", "error": error}
+            continue
+        try:
+            payload = _parse_business(fields)
+            business_type = normalize_business_type(payload.account_type, payload.business_type)
+        except ValidationError as exc:
+            first = exc.errors()[0]
+            location = ".".join(str(part) for part in first["loc"])
+            results[row_number] = {"row": row_number, "status": "error", "error": f"{location}: {first['msg']}"}
+            continue
+        except ValueError as exc:
+            results[row_number] = {"row": row_number, "status": "error", "error": str(exc)}
+            continue
+        pending.append((row_number, payload, business_type))
+
+    # Geocode each distinct address once: cache first, then the network for the rest.
+    geocode_inputs: dict[int, str] = {}
+    for row_number, payload, _ in pending:
+        if payload.latitude is None or payload.longitude is None:
+            geocode_input = build_geocode_input(
+                payload.address,
+                payload.city.strip() if payload.city else None,
+                payload.state.strip() if payload.state else None,
+                payload.zip_code,
+            )
+            if normalize_address(geocode_input):
+                geocode_inputs[row_number] = geocode_input
+    keys = {row_number: normalize_address(value) for row_number, value in geocode_inputs.items()}
+    cache_enabled = settings.geocode_cache_ttl_seconds > 0
+    cached = await get_cached_geocodes(session, list(keys.values())) if cache_enabled else {}
+    misses: dict[str, str] = {}
+    for row_number, key in keys.items():
+        if key not in cached:
+            misses.setdefault(key, geocode_inputs[row_number])
+    fetched = await _geocode_misses(list(misses.values()))
+    geocodes: dict[str, dict[str, object] | None] = {key: value[1] for key, value in cached.items()}
+    definitive: dict[str, dict[str, object] | None] = {}
+    for key, address in misses.items():
+        outcome = fetched[address]
+        if isinstance(outcome, GeocodingUnavailable):
+            geocodes[key] = None
+        else:
+            geocodes[key] = definitive[key] = outcome
+
+    located: list[tuple[int, BusinessCreate, str, float | None, float | None]] = []
+    for row_number, payload, business_type in pending:
+        latitude, longitude = payload.latitude, payload.longitude
+        geo = geocodes.get(keys[row_number]) if row_number in keys else None
+        if geo:
+            try:
+                check_geocoded_location(geo, payload.account_type)
+            except ValueError as exc:
+                results[row_number] = {"row": row_number, "status": "error", "error": str(exc)}
+                continue
+            latitude, longitude = float(geo["latitude"]), float(geo["longitude"])
+        located.append((row_number, payload, business_type, latitude, longitude))
+
+    # One vectorized region lookup for every row that has coordinates.
+    with_coordinates = [item for item in located if item[3] is not None and item[4] is not None]
+    matched = index.lookup_many([item[3] for item in with_coordinates], [item[4] for item in with_coordinates])
+    regions_by_row = {item[0]: region for item, region in zip(with_coordinates, matched)}
+
+    now = datetime.now(UTC)
+    values: dict[int, dict[str, object]] = {}
+    created: dict[int, dict[str, object]] = {}
+    for row_number, payload, business_type, latitude, longitude in located:
+        region = regions_by_row.get(row_number) or zip_fallback_region(index, payload.zip_code)
+        if payload.account_type == "business" and region is None:
+            results[row_number] = {
+                "row": row_number,
+                "status": "error",
+                "error": "Could not assign region from address/coordinates",
+            }
+            continue
+
+        city = payload.city.strip() if payload.city else None
+        business_id = str(uuid4())
+        values[row_number] = {
+            "id": business_id,
+            "name": payload.name,
+            "email": payload.email.strip().lower() if payload.email else None,
+            "business_type": business_type,
+            "account_type": payload.account_type,
+            "address": payload.address,
+            "city": city,
+            "state": payload.state.strip() if payload.state else None,
+            "neighborhood": (payload.neighborhood.strip() if payload.neighborhood else city) or "unknown",
+            "zip": payload.zip_code,
+            "latitude": latitude,
+            "longitude": longitude,
+            "region_id": region.id if region else None,
+            "created_at": now,
+        }
+        created[row_number] = {
+            "row": row_number,
+            "status": "created",
+            "business_id": business_id,
+            "region_id": region.id if region else None,
+        }
+
+    try:
+        if cache_enabled and definitive:
+            await store_cached_geocodes(session, definitive)
+        if values:
+            await session.execute(insert(Business).values(list(values.values())))
+        await session.commit()
+    except SQLAlchemyError:
+        logger.exception("Bulk insert of %s businesses failed; retrying them one at a time", len(values))
+        await session.rollback()
+        created = await _insert_rows_one_by_one(session, values, created)
+    results.update(created)
+    return [results[row_number] for row_number, _, _ in batch]
+
+
+async def _insert_rows_one_by_one(
+    session: AsyncSession,
+    values: dict[int, dict[str, object]],
+    created: dict[int, dict[str, object]],
+) -> dict[int, dict[str, object]]:
+    """Insert and commit each row on its own; rows the database rejects are reported as errors."""
+    outcomes: dict[int, dict[str, object]] = {}
+    for row_number, row_values in values.items():
+        try:
+            await session.execute(insert(Business).values(row_values))
+            await session.commit()
+        except SQLAlchemyError as exc:
+            logger.warning("Import row %s was rejected by the database: %s", row_number, exc)
+            await session.rollback()
+            outcomes[row_number] = {"row": row_number, "status": "error", "error": "Could not save this row"}
+            continue
+        outcomes[row_number] = created[row_number]
+    return outcomes
+
+
+async def import_businesses(session: AsyncSession, rows: Iterable[ImportRow]) -> AsyncIterator[dict[str, object]]:
+    """Create businesses from parsed rows, yielding one result per row in input order.
+
+    A final ``{"summary": ...}`` item reports the totals. Rows that fail validation,
+    geocoding checks or region assignment are reported and skipped; the rest are kept.
+    """
+    batch_size = max(1, get_settings().business_import_batch_size)
+    # Check for region changes up front; the whole import then runs on one snapshot.
+    index = await get_region_index(session, max_age_seconds=0) or RegionIndex(await load_regions())
+    created = 0
+    failed = 0
+    batch: list[ImportRow] = []
+
+    async def flush() -> list[dict[str, object]]:
+        nonlocal created, failed
+        report = await _import_batch(session, batch, index)
+        batch.clear()
+        for result in report:
+            if result["status"] == "created":
+                created += 1
+            else:
+                failed += 1
+        return report
+
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            for result in await flush():
+                yield result
+    if batch:
+        for result in await flush():
+            yield result
+    yield {"summary": {"created": created, "failed": failed}}
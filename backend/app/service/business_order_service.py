@@ -7,7 +7,6 @@ from app.db.models.group_commitment import GroupCommitment
 from app.db.models.product import Product
 from app.db.models.supplier_confirmed_order import SupplierConfirmedOrder
 from app.db.models.supplier_product import SupplierProduct
-from app.service.supplier_order_service import reconcile_completed_orders
 
 
 async def list_business_orders(session: AsyncSession, business_id: str) -> list[dict[str, object]]:
@@ -29,9 +28,6 @@ async def list_business_orders(session: AsyncSession, business_id: str) -> list[
     result = await session.execute(base_stmt)
     rows = result.all()
 
-    order_rows_for_reconcile = [(order, group, product, supplier_product) for order, group, product, supplier_product, _ in rows]
-    await reconcile_completed_orders(session, order_rows_for_reconcile)
-
     group_ids = sorted({str(group.id) for _, group, _, _, _ in rows if group is not None})
     participants_by_group: dict[str, list[dict[str, object]]] = {}
     if group_ids:
@@ -5,8 +5,42 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models.business import Business
-from app.service.geocoding_service import geocode_address
-from app.service.region_service import find_region_by_lat_lng, find_region_by_zip_fallback
+from app.service.geocode_cache_service import cached_geocode_address
+from app.service.region_service import assign_region
+
+
+def normalize_business_type(account_type: str, business_type: str | None) -> str:
+    if account_type not in {"business", "supplier"}:
+        raise ValueError("account_type must be either 'business' or 'supplier'")
+    if account_type == "business" and not business_type:
+        raise ValueError("business_type is required for business accounts")
+    return "supplier" if account_type == "supplier" else str(business_type).strip().lower()
+
+
+def build_geocode_input(address: str | None, city: str | None, state: str | None, zip_code: str | None) -> str:
+    location_country = "United States"
+    address_parts = [address, city, state, zip_code.strip() if zip_code else None, location_country]
+    return ", ".join([part.strip() for part in address_parts if part and part.strip()])
+
+
+def check_geocoded_location(geo: dict[str, object], account_type: str) -> None:
+    """Businesses must geocode into San Francisco and suppliers into the US."""
+    locality = (geo.get("locality") or "").strip().lower()
+    admin_level_1 = (geo.get("admin_area_level_1") or "").strip().lower()
+    country = (geo.get("country") or "").strip().lower()
+    postal_code = str(geo.get("postal_code") or "").strip()
+
+    in_sf = (
+        locality == "san francisco"
+        and admin_level_1 in {"ca", "california"}
+        and country in {"us", "united states"}
+        and postal_code.startswith("941")
+    )
+    in_us = country in {"us", "united states"}
+    if account_type == "business" and not in_sf:
+        raise ValueError("Address geocoded outside San Francisco; only SF businesses are supported")
+    if account_type == "supplier" and not in_us:
+        raise ValueError("Supplier address must be inside the United States")
 
 
 async def create_business(
@@ -24,12 +58,7 @@ async def create_business(
     latitude: float | None,
     longitude: float | None,
 ) -> Business:
-    if account_type not in {"business", "supplier"}:
-        raise ValueError("account_type must be either 'business' or 'supplier'")
-    if account_type == "business" and not business_type:
-        raise ValueError("business_type is required for business accounts")
-
-    normalized_business_type = "supplier" if account_type == "supplier" else str(business_type).strip().lower()
+    normalized_business_type = normalize_business_type(account_type, business_type)
     normalized_city = city.strip() if city else None
     normalized_state = state.strip() if state else None
     normalized_neighborhood = neighborhood.strip() if neighborhood else normalized_city
@@ -37,37 +66,17 @@ async def create_business(
     resolved_latitude = latitude
     resolved_longitude = longitude
     if resolved_latitude is None or resolved_longitude is None:
-        location_country = "United States"
-        address_parts = [address, normalized_city, normalized_state, zip_code.strip() if zip_code else None, location_country]
-        geocode_input = ", ".join([part.strip() for part in address_parts if part and part.strip()])
+        geocode_input = build_geocode_input(address, normalized_city, normalized_state, zip_code)
         if geocode_input.strip():
-            geo = geocode_address(geocode_input)
+            geo = await cached_geocode_address(session, geocode_input)
+            # Keep the cache entry even if the address is rejected below.
+            await session.commit()
             if geo:
-                locality = (geo.get("locality") or "").strip().lower()
-                admin_level_1 = (geo.get("admin_area_level_1") or "").strip().lower()
-                country = (geo.get("country") or "").strip().lower()
-                postal_code = str(geo.get("postal_code") or "").strip()
-
-                in_sf = (
-                    locality == "san francisco"
-                    and admin_level_1 in {"ca", "california"}
-                    and country in {"us", "united states"}
-                    and postal_code.startswith("941")
-                )
-                in_us = country in {"us", "united states"}
-                if account_type == "business" and not in_sf:
-                    raise ValueError("Address geocoded outside San Francisco; only SF businesses are supported")
-                if account_type == "supplier" and not in_us:
-                    raise ValueError("Supplier address must be inside the United States")
-
+                check_geocoded_location(geo, account_type)
                 resolved_latitude = float(geo["latitude"])
                 resolved_longitude = float(geo["longitude"])
 
-    region = None
-    if resolved_latitude is not None and resolved_longitude is not None:
-        region = await find_region_by_lat_lng(session, resolved_latitude, resolved_longitude)
-    if region is None:
-        region = await find_region_by_zip_fallback(session, zip_code)
+    region = await assign_region(session, resolved_latitude, resolved_longitude, zip_code)
     if account_type == "business" and region is None:
         raise ValueError("Could not assign region from address/coordinates")
 
@@ -102,3 +111,22 @@ async def get_business_by_email(session: AsyncSession, email: str) -> Business |
     normalized = email.strip().lower()
     result = await session.execute(select(Business).where(Business.email == normalized))
     return result.scalar_one_or_none()
+
+
+async def update_supplier_delivery_settings(
+    session: AsyncSession,
+    *,
+    business_id: str,
+    truck_unit_capacity: int | None,
+) -> Business:
+    business = await session.get(Business, business_id)
+    if business is None:
+        raise ValueError("Business not found")
+    if business.account_type != "supplier":
+        raise ValueError("Only supplier accounts have delivery settings")
+    if truck_unit_capacity is not None and truck_unit_capacity <= 0:
+        raise ValueError("truck_unit_capacity must be greater than 0")
+    business.truck_unit_capacity = truck_unit_capacity
+    await session.commit()
+    await session.refresh(business)
+    return business
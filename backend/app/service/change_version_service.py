@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+import hashlib
+
+from sqlalchemy import func, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.buying_group import BuyingGroup
+from app.db.models.change_version import ChangeVersion
+
+# Bumped whenever rows are added to or changed in the regions table.
+REGION_SET_SCOPE = "regions"
+
+
+def region_scope(region_id: int) -> str:
+    return f"region:{region_id}"
+
+
+def group_scope(group_id: str) -> str:
+    return f"group:{group_id}"
+
+
+def supplier_product_scope(supplier_product_id: str) -> str:
+    return f"supplier_product:{supplier_product_id}"
+
+
+async def bump_change_versions(
+    session: AsyncSession,
+    *,
+    region_ids: Iterable[int | None] = (),
+    group_ids: Iterable[str] = (),
+    supplier_product_ids: Iterable[str | None] = (),
+    scopes: Iterable[str] = (),
+) -> None:
+    """Increment change counters in the caller's transaction; the caller commits."""
+    all_scopes = sorted(
+        {region_scope(rid) for rid in region_ids if rid is not None}
+        | {group_scope(gid) for gid in group_ids}
+        | {supplier_product_scope(spid) for spid in supplier_product_ids if spid}
+        | set(scopes)
+    )
+    if not all_scopes:
+        return
+    # Sorted scopes keep row-lock order consistent across concurrent writers.
+    stmt = pg_insert(ChangeVersion).values([{"scope": scope, "version": 1} for scope in all_scopes])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ChangeVersion.scope],
+        set_={"version": ChangeVersion.version + 1, "updated_at": func.now()},
+    )
+    await session.execute(stmt)
+
+
+async def get_change_version(session: AsyncSession, scope: str) -> int:
+    result = await session.execute(select(ChangeVersion.version).where(ChangeVersion.scope == scope))
+    return int(result.scalar_one_or_none() or 0)
+
+
+async def get_region_change_version(session: AsyncSession, region_id: int | None) -> int:
+    """Version of one region's listing, or of all regions when ``region_id`` is None.
+
+    Counters only ever grow, so the sum over every region changes whenever any of them does.
+    """
+    stmt = select(func.coalesce(func.sum(ChangeVersion.version), 0))
+    if region_id is None:
+        stmt = stmt.where(ChangeVersion.scope.like("region:%"))
+    else:
+        stmt = stmt.where(ChangeVersion.scope == region_scope(region_id))
+    result = await session.execute(stmt)
+    return int(result.scalar_one() or 0)
+
+
+async def get_group_change_version(session: AsyncSession, group_id: str) -> int:
+    """Version of a group's detail payload: its own counter plus its supplier product's."""
+    supplier_product_scope_expr = (
+        select(literal("supplier_product:") + BuyingGroup.supplier_product_id)
+        .where(BuyingGroup.id == group_id)
+        .scalar_subquery()
+    )
+    stmt = select(func.coalesce(func.sum(ChangeVersion.version), 0)).where(
+        (ChangeVersion.scope == group_scope(group_id)) | (ChangeVersion.scope == supplier_product_scope_expr)
+    )
+    result = await session.execute(stmt)
+    return int(result.scalar_one() or 0)
+
+
+def build_etag(kind: str, version: int, *parts: object) -> str:
+    digest = hashlib.sha1(repr((kind, version, parts)).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{kind}-{version}-{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {candidate.strip() for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates or etag.removeprefix("W/") in candidates
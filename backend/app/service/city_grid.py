@@ -0,0 +1,265 @@
+"""City region grids: generation, stable cell codes and the ZIP-prefix fallback table.
+
+Each city is a rectangle split into ``rows x cols`` blocks, and each block is one
+``regions`` row. Blocks split again into ``REGION_SUBCELL_DIVISIONS`` squared sub-cells,
+which are computed on lookup rather than stored. Codes depend only on the city code and the
+grid position, so regenerating a city keeps its IDs. A block is ``SF-2-3`` (row 2, column 3,
+both 1-based from the south-west corner), and one of its sub-cells is ``SF-2-3.1.4``.
+
+Cities come from ``REGION_CITIES_PATH`` (a JSON list, see ``CityGridSpec.from_dict``) and
+default to the original San Francisco layout. ZIP fallbacks come from
+``REGION_ZIP_TABLE_PATH`` (CSV with ``zip_prefix,region_code`` columns) and default to
+``DEFAULT_ZIP_PREFIXES``.
+"""
+
+from __future__ import annotations
+
+import csv
+from functools import lru_cache
+import json
+import math
+import re
+
+from app.core.config import get_settings
+
+_CITY_CODE_RE = re.compile(r"^[A-Z0-9_]{1,12}$")
+_CELL_CODE_RE = re.compile(r"^([A-Z0-9_]{1,12})-(\d+)-(\d+)$")
+MIN_ZIP_PREFIX_DIGITS = 3
+
+DEFAULT_ZIP_PREFIXES: dict[str, str] = {
+    "94102": "SF-2-2",
+    "94103": "SF-2-3",
+    "94107": "SF-3-3",
+    "94109": "SF-1-2",
+    "94110": "SF-3-2",
+    "94114": "SF-2-1",
+    "94117": "SF-2-1",
+    "94118": "SF-1-1",
+}
+
+
+def miles_to_lat(miles: float) -> float:
+    return miles / 69.0
+
+
+def miles_to_lng(miles: float, lat: float) -> float:
+    return miles / (69.172 * max(math.cos(math.radians(lat)), 0.2))
+
+
+def cell_code(city_code: str, row: int, col: int) -> str:
+    return f"{city_code}-{row}-{col}"
+
+
+def parse_cell_code(code: str) -> tuple[str, int, int] | None:
+    """(city code, row, col) for a block code such as ``SF-2-3``; None for other codes."""
+    match = _CELL_CODE_RE.match(code)
+    if not match:
+        return None
+    return match.group(1), int(match.group(2)), int(match.group(3))
+
+
+def subcell_code(block_code: str, sub_row: int, sub_col: int) -> str:
+    return f"{block_code}.{sub_row}.{sub_col}"
+
+
+class CityGridSpec:
+    """Bounds and block layout of one city's region grid."""
+
+    def __init__(
+        self,
+        code: str,
+        name: str,
+        min_lat: float,
+        max_lat: float,
+        min_lng: float,
+        max_lng: float,
+        rows: int,
+        cols: int,
+    ) -> None:
+        if not _CITY_CODE_RE.match(code):
+            raise ValueError(f"City code must be 1-12 of A-Z, 0-9 or _: {code!r}")
+        if not (min_lat < max_lat and min_lng < max_lng):
+            raise ValueError(f"City {code} has empty bounds")
+        if rows < 1 or cols < 1:
+            raise ValueError(f"City {code} needs at least one row and column")
+        self.code = code
+        self.name = name
+        self.min_lat = min_lat
+        self.max_lat = max_lat
+        self.min_lng = min_lng
+        self.max_lng = max_lng
+        self.rows = rows
+        self.cols = cols
+
+    @classmethod
+    def around(
+        cls,
+        code: str,
+        name: str,
+        center_lat: float,
+        center_lng: float,
+        half_span_miles: float,
+        block_miles: float,
+    ) -> CityGridSpec:
+        """Square city centred on a point, cut into blocks of about ``block_miles``."""
+        # Blocks are stretched to fill the span exactly (7 miles in 2-mile blocks -> 4 x 1.75 mi).
+        blocks = max(1, math.ceil(half_span_miles * 2 / block_miles - 1e-4))
+        return cls(
+            code,
+            name,
+            center_lat - miles_to_lat(half_span_miles),
+            center_lat + miles_to_lat(half_span_miles),
+            center_lng - miles_to_lng(half_span_miles, center_lat),
+            center_lng + miles_to_lng(half_span_miles, center_lat),
+            blocks,
+            blocks,
+        )
+
+    @classmethod
+    def from_bounds(
+        cls,
+        code: str,
+        name: str,
+        min_lat: float,
+        max_lat: float,
+        min_lng: float,
+        max_lng: float,
+        block_miles: float,
+    ) -> CityGridSpec:
+        """Any rectangle, cut into blocks of about ``block_miles`` on each axis."""
+        middle_lat = (min_lat + max_lat) / 2
+        height_miles = (max_lat - min_lat) * 69.0
+        width_miles = (max_lng - min_lng) / miles_to_lng(1.0, middle_lat)
+        rows = max(1, math.ceil(height_miles / block_miles - 1e-4))
+        cols = max(1, math.ceil(width_miles / block_miles - 1e-4))
+        return cls(code, name, min_lat, max_lat, min_lng, max_lng, rows, cols)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, object]) -> CityGridSpec:
+        """Spec from config: ``code``, ``name``, ``block_miles`` and either ``center_lat`` /
+        ``center_lng`` / ``half_span_miles`` or ``min_lat`` / ``max_lat`` / ``min_lng`` / ``max_lng``.
+        """
+        try:
+            code = str(data["code"])
+            name = str(data.get("name") or code)
+            block_miles = float(data["block_miles"])
+            if "center_lat" in data:
+                return cls.around(
+                    code,
+                    name,
+                    float(data["center_lat"]),
+                    float(data["center_lng"]),
+                    float(data["half_span_miles"]),
+                    block_miles,
+                )
+            return cls.from_bounds(
+                code,
+                name,
+                float(data["min_lat"]),
+                float(data["max_lat"]),
+                float(data["min_lng"]),
+                float(data["max_lng"]),
+                block_miles,
+            )
+        except KeyError as exc:
+            raise ValueError(f"City grid entry is missing {exc.args[0]!r}") from exc
+
+    def block_bounds(self, row: int, col: int) -> tuple[float, float, float, float]:
+        """(min_lat, max_lat, min_lng, max_lng) of the 1-based block."""
+        lat_step = (self.max_lat - self.min_lat) / self.rows
+        lng_step = (self.max_lng - self.min_lng) / self.cols
+        return (
+            self.min_lat + (row - 1) * lat_step,
+            self.min_lat + row * lat_step,
+            self.min_lng + (col - 1) * lng_step,
+            self.min_lng + col * lng_step,
+        )
+
+    def region_rows(self) -> list[dict[str, object]]:
+        """Column values for every block's ``regions`` row, row-major from the south-west."""
+        rows = []
+        for row in range(1, self.rows + 1):
+            for col in range(1, self.cols + 1):
+                min_lat, max_lat, min_lng, max_lng = self.block_bounds(row, col)
+                rows.append(
+                    {
+                        "code": cell_code(self.code, row, col),
+                        "name": f"{self.name} Block {row}-{col}",
+                        "row_index": row,
+                        "col_index": col,
+                        "min_lat": min_lat,
+                        "max_lat": max_lat,
+                        "min_lng": min_lng,
+                        "max_lng": max_lng,
+                    }
+                )
+        return rows
+
+
+DEFAULT_CITY_GRIDS = (CityGridSpec.around("SF", "SF", 37.7749, -122.4194, 3.5, 2.0),)
+
+
+def load_city_grids(path: str = "") -> list[CityGridSpec]:
+    """City specs from a JSON file, or the defaults when no path is configured."""
+    if not path:
+        return list(DEFAULT_CITY_GRIDS)
+    with open(path, encoding="utf-8") as handle:
+        entries = json.load(handle)
+    if not isinstance(entries, list):
+        raise ValueError(f"{path} must contain a JSON list of cities")
+    specs = [CityGridSpec.from_dict(entry) for entry in entries]
+    codes = [spec.code for spec in specs]
+    if len(set(codes)) != len(codes):
+        raise ValueError(f"{path} lists a city code more than once")
+    return specs
+
+
+class ZipPrefixTable:
+    """Longest-prefix match of ZIP codes to region codes (5 down to 3 digits).
+
+    A lookup is at most three dict probes, however many prefixes are loaded.
+    """
+
+    def __init__(self, prefixes: dict[str, str]) -> None:
+        self.prefixes: dict[str, str] = {}
+        for prefix, region_code in prefixes.items():
+            prefix = prefix.strip()
+            if not (prefix.isdigit() and MIN_ZIP_PREFIX_DIGITS <= len(prefix) <= 5):
+                raise ValueError(f"ZIP prefix must be 3-5 digits: {prefix!r}")
+            self.prefixes[prefix] = region_code.strip()
+
+    def __len__(self) -> int:
+        return len(self.prefixes)
+
+    def lookup(self, zip_code: str | None) -> str | None:
+        if not zip_code:
+            return None
+        digits = zip_code.strip()[:5]
+        if not digits.isdigit():
+            return None
+        for length in range(len(digits), MIN_ZIP_PREFIX_DIGITS - 1, -1):
+            region_code = self.prefixes.get(digits[:length])
+            if region_code:
+                return region_code
+        return None
+
+
+def load_zip_prefix_table(path: str = "") -> ZipPrefixTable:
+    """Table from a ``zip_prefix,region_code`` CSV, or the defaults when no path is configured."""
+    if not path:
+        return ZipPrefixTable(DEFAULT_ZIP_PREFIXES)
+    with open(path, newline="", encoding="utf-8") as handle:
+        reader = csv.DictReader(handle)
+        if not reader.fieldnames or not {"zip_prefix", "region_code"} <= set(reader.fieldnames):
+            raise ValueError(f"{path} needs zip_prefix and region_code columns")
+        return ZipPrefixTable({row["zip_prefix"]: row["region_code"] for row in reader})
+
+
+@lru_cache(maxsize=4)
+def _zip_prefix_table(path: str) -> ZipPrefixTable:
+    return load_zip_prefix_table(path)
+
+
+def get_zip_prefix_table() -> ZipPrefixTable:
+    """The table at ``REGION_ZIP_TABLE_PATH``, loaded once per process."""
+    return _zip_prefix_table(get_settings().region_zip_table_path)
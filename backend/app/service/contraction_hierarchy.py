@@ -0,0 +1,255 @@
+"""Contraction hierarchy over a road graph, for fast stop-to-stop travel matrices.
+
+Nodes are contracted one at a time, least important first. Importance is the edge
+difference plus the number of already-contracted neighbours and the node's level. Contracting
+``v`` adds a shortcut ``u -> w`` for each pair of its remaining neighbours unless a witness
+search finds a path at least as fast that avoids ``v``. Witness searches are capped, and a
+capped search only adds a redundant shortcut, never a wrong one.
+
+Every edge then leads from a node to a more important one. ``up_*`` holds each node's
+outgoing edges; ``down_*`` holds its incoming edges reversed, so both query directions only
+climb. A many-to-many matrix runs one backward climb per target, which leaves the target's
+distance in a bucket at every node it reaches. It then runs one forward climb per source,
+which scans the buckets of the nodes it reaches. With stall-on-demand, each climb settles
+about a hundred nodes of a 90k-node grid, where a Dijkstra settles most of the extract.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+
+import numpy as np
+
+# Witness searches give up after settling this many nodes.
+WITNESS_SETTLE_LIMIT = 60
+
+ARRAY_NAMES = (
+    "rank",
+    "up_indptr",
+    "up_indices",
+    "up_seconds",
+    "up_meters",
+    "down_indptr",
+    "down_indices",
+    "down_seconds",
+    "down_meters",
+)
+
+
+def _csr(adjacency: list[list[tuple[int, float, float]]]) -> tuple[np.ndarray, ...]:
+    counts = [len(edges) for edges in adjacency]
+    indptr = np.concatenate(([0], np.cumsum(counts, dtype=np.int64)))
+    flat = [edge for edges in adjacency for edge in edges]
+    indices = np.asarray([head for head, _, _ in flat], dtype=np.int32)
+    seconds = np.asarray([edge_seconds for _, edge_seconds, _ in flat], dtype=np.float64)
+    meters = np.asarray([edge_meters for _, _, edge_meters in flat], dtype=np.float64)
+    return indptr, indices, seconds, meters
+
+
+class ContractionHierarchy:
+    """Upward and (reversed) downward edges of a contracted graph, as CSR arrays."""
+
+    def __init__(
+        self,
+        rank: np.ndarray,
+        up_indptr: np.ndarray,
+        up_indices: np.ndarray,
+        up_seconds: np.ndarray,
+        up_meters: np.ndarray,
+        down_indptr: np.ndarray,
+        down_indices: np.ndarray,
+        down_seconds: np.ndarray,
+        down_meters: np.ndarray,
+    ) -> None:
+        self.rank = np.asarray(rank, dtype=np.int32)
+        self.up_indptr = np.asarray(up_indptr, dtype=np.int64)
+        self.up_indices = np.asarray(up_indices, dtype=np.int32)
+        self.up_seconds = np.asarray(up_seconds, dtype=np.float64)
+        self.up_meters = np.asarray(up_meters, dtype=np.float64)
+        self.down_indptr = np.asarray(down_indptr, dtype=np.int64)
+        self.down_indices = np.asarray(down_indices, dtype=np.int32)
+        self.down_seconds = np.asarray(down_seconds, dtype=np.float64)
+        self.down_meters = np.asarray(down_meters, dtype=np.float64)
+        node_count = len(self.rank)
+        if len(self.up_indptr) != node_count + 1 or len(self.down_indptr) != node_count + 1:
+            raise ValueError("Contraction hierarchy arrays are inconsistent")
+        self._search_lists: tuple[list, ...] | None = None
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        return {name: getattr(self, name) for name in ARRAY_NAMES}
+
+    def _lists(self) -> tuple[list, ...]:
+        if self._search_lists is None:
+            self._search_lists = tuple(getattr(self, name).tolist() for name in ARRAY_NAMES[1:])
+        return self._search_lists
+
+    @staticmethod
+    def _climb(
+        start: int,
+        indptr: list,
+        indices: list,
+        seconds: list,
+        meters: list,
+        stall_indptr: list,
+        stall_indices: list,
+        stall_seconds: list,
+    ) -> list[tuple[int, float, float]]:
+        """Nodes reachable from ``start`` over climbing edges, as (node, seconds, meters).
+
+        ``stall_*`` are the climbing edges of the opposite direction. A node that a more
+        important node already reaches faster through one of them is not on any shortest
+        path, so it is neither expanded nor returned (stall-on-demand).
+        """
+        dist = {start: 0.0}
+        dist_m = {start: 0.0}
+        heap = [(0.0, start)]
+        settled: list[tuple[int, float, float]] = []
+        while heap:
+            node_seconds, node = heapq.heappop(heap)
+            if node_seconds > dist[node]:
+                continue
+            stalled = False
+            for edge in range(stall_indptr[node], stall_indptr[node + 1]):
+                if dist.get(stall_indices[edge], math.inf) + stall_seconds[edge] < node_seconds:
+                    stalled = True
+                    break
+            if stalled:
+                continue
+            node_meters = dist_m[node]
+            settled.append((node, node_seconds, node_meters))
+            for edge in range(indptr[node], indptr[node + 1]):
+                head = indices[edge]
+                candidate = node_seconds + seconds[edge]
+                if candidate < dist.get(head, math.inf):
+                    dist[head] = candidate
+                    dist_m[head] = node_meters + meters[edge]
+                    heapq.heappush(heap, (candidate, head))
+        return settled
+
+    def travel_matrices(self, nodes: list[int]) -> tuple[np.ndarray, np.ndarray]:
+        """(meters, seconds) matrices between ``nodes`` along fastest paths; inf if unreachable."""
+        up_indptr, up_indices, up_seconds, up_meters, down_indptr, down_indices, down_seconds, down_meters = self._lists()
+        size = len(nodes)
+        meters_rows = [[math.inf] * size for _ in range(size)]
+        seconds_rows = [[math.inf] * size for _ in range(size)]
+
+        buckets: dict[int, list[tuple[int, float, float]]] = {}
+        for column, target in enumerate(nodes):
+            for node, node_seconds, node_meters in self._climb(
+                target, down_indptr, down_indices, down_seconds, down_meters, up_indptr, up_indices, up_seconds
+            ):
+                buckets.setdefault(node, []).append((column, node_seconds, node_meters))
+
+        for row, source in enumerate(nodes):
+            row_seconds = seconds_rows[row]
+            row_meters = meters_rows[row]
+            for node, node_seconds, node_meters in self._climb(
+                source, up_indptr, up_indices, up_seconds, up_meters, down_indptr, down_indices, down_seconds
+            ):
+                for column, tail_seconds, tail_meters in buckets.get(node, ()):
+                    if node_seconds + tail_seconds < row_seconds[column]:
+                        row_seconds[column] = node_seconds + tail_seconds
+                        row_meters[column] = node_meters + tail_meters
+        return np.asarray(meters_rows, dtype=np.float64), np.asarray(seconds_rows, dtype=np.float64)
+
+
+def contract_graph(
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    edge_seconds: np.ndarray,
+    edge_meters: np.ndarray,
+) -> ContractionHierarchy:
+    """Contract a CSR graph in pure Python; takes a few minutes per 100k nodes."""
+    node_count = len(indptr) - 1
+    # Remaining graph: outgoing[u][w] = incoming[w][u] = (seconds, meters) of the fastest u -> w edge.
+    outgoing: list[dict[int, tuple[float, float]]] = [{} for _ in range(node_count)]
+    incoming: list[dict[int, tuple[float, float]]] = [{} for _ in range(node_count)]
+    tails = np.repeat(np.arange(node_count), np.diff(indptr)).tolist()
+    for tail, head, seconds, meters in zip(tails, indices.tolist(), edge_seconds.tolist(), edge_meters.tolist()):
+        if tail == head:
+            continue
+        current = outgoing[tail].get(head)
+        if current is None or seconds < current[0]:
+            outgoing[tail][head] = incoming[head][tail] = (seconds, meters)
+
+    def witness_seconds(source: int, skip: int, limit: float, targets: set[int]) -> dict[int, float]:
+        dist = {source: 0.0}
+        heap = [(0.0, source)]
+        settled = 0
+        remaining = len(targets)
+        while heap and remaining and settled < WITNESS_SETTLE_LIMIT:
+            node_seconds, node = heapq.heappop(heap)
+            if node_seconds > dist[node]:
+                continue
+            if node_seconds > limit:
+                break
+            settled += 1
+            if node in targets:
+                remaining -= 1
+            for head, (seconds, _) in outgoing[node].items():
+                if head == skip:
+                    continue
+                candidate = node_seconds + seconds
+                if candidate < dist.get(head, math.inf):
+                    dist[head] = candidate
+                    heapq.heappush(heap, (candidate, head))
+        return dist
+
+    def shortcuts(node: int) -> list[tuple[int, int, float, float]]:
+        heads = outgoing[node]
+        if not heads or not incoming[node]:
+            return []
+        longest = max(seconds for seconds, _ in heads.values())
+        needed = []
+        for tail, (tail_seconds, tail_meters) in incoming[node].items():
+            targets = set(heads)
+            targets.discard(tail)
+            if not targets:
+                continue
+            witness = witness_seconds(tail, node, tail_seconds + longest, targets)
+            for head in targets:
+                head_seconds, head_meters = heads[head]
+                through = tail_seconds + head_seconds
+                if witness.get(head, math.inf) > through:
+                    needed.append((tail, head, through, tail_meters + head_meters))
+        return needed
+
+    deleted_neighbors = [0] * node_count
+    level = [0] * node_count
+
+    def priority(node: int) -> tuple[int, list[tuple[int, int, float, float]]]:
+        needed = shortcuts(node)
+        edge_difference = len(needed) - len(outgoing[node]) - len(incoming[node])
+        return edge_difference + deleted_neighbors[node] + level[node], needed
+
+    heap = [(priority(node)[0], node) for node in range(node_count)]
+    heapq.heapify(heap)
+    rank = [0] * node_count
+    up: list[list[tuple[int, float, float]]] = [[] for _ in range(node_count)]
+    down: list[list[tuple[int, float, float]]] = [[] for _ in range(node_count)]
+    contracted = 0
+    while heap:
+        _, node = heapq.heappop(heap)
+        # Lazy update: the stored priority may be stale; contract only if it is still the smallest.
+        current, needed = priority(node)
+        if heap and current > heap[0][0]:
+            heapq.heappush(heap, (current, node))
+            continue
+        for tail, head, seconds, meters in needed:
+            existing = outgoing[tail].get(head)
+            if existing is None or seconds < existing[0]:
+                outgoing[tail][head] = incoming[head][tail] = (seconds, meters)
+        up[node] = [(head, seconds, meters) for head, (seconds, meters) in outgoing[node].items()]
+        down[node] = [(tail, seconds, meters) for tail, (seconds, meters) in incoming[node].items()]
+        for neighbor in set(outgoing[node]) | set(incoming[node]):
+            outgoing[neighbor].pop(node, None)
+            incoming[neighbor].pop(node, None)
+            deleted_neighbors[neighbor] += 1
+            level[neighbor] = max(level[neighbor], level[node] + 1)
+        outgoing[node] = {}
+        incoming[node] = {}
+        rank[node] = contracted
+        contracted += 1
+
+    return ContractionHierarchy(np.asarray(rank), *_csr(up), *_csr(down))
@@ -0,0 +1,259 @@
+"""Daily delivery planning: batch a supplier's confirmed orders for one start slot into trucks.
+
+Orders are the customers of a capacitated vehicle-routing problem: each has a demand (its
+total units) and a set of stops (its participants). Trips are built by savings-style merging,
+starting from one trip per order and repeatedly merging the pair of trips whose combined tour
+saves the most miles while staying within the truck's unit capacity. An order always rides
+on exactly one trip, so its route, miles and end time stay well defined.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+from itertools import combinations
+import logging
+import time
+from uuid import uuid4
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.db.models.business import Business
+from app.db.models.buying_group import BuyingGroup
+from app.db.models.delivery_route import DeliveryRoute
+from app.db.models.group_commitment import GroupCommitment
+from app.db.models.supplier_confirmed_order import SupplierConfirmedOrder
+from app.service.change_version_service import bump_change_versions
+from app.service.delivery_route_service import compute_delivery_route
+from app.service.group_cache import group_listing_cache
+from app.service.route_geometry import encode_polyline
+from app.service.route_optimizer import optimize_stop_order
+
+logger = logging.getLogger(__name__)
+
+Point = tuple[float, float]
+
+# Per-evaluation budget while comparing candidate merges; the final trips get the full optimizer.
+MERGE_EVALUATION_BUDGET_SECONDS = 0.01
+# Planning passes per run; a pass is redone when the slot's orders change while its routes are fetched.
+PLANNING_ATTEMPTS = 3
+
+
+def _trip_stops(order_ids: list[str], order_stops: dict[str, list[Point]]) -> list[Point]:
+    # Two participants at the same address are one stop for the truck.
+    return list(dict.fromkeys(point for order_id in order_ids for point in order_stops[order_id]))
+
+
+def plan_delivery_trips(
+    origin: Point,
+    order_stops: dict[str, list[Point]],
+    order_units: dict[str, int],
+    *,
+    truck_unit_capacity: int | None,
+    time_budget_seconds: float,
+) -> list[tuple[list[str], float]]:
+    """Group orders into truck trips; returns (order ids, straight-line tour miles) per trip.
+
+    An order larger than the truck capacity still gets a trip of its own. Merging stops when
+    no merge saves distance or the time budget runs out, so the result is never longer in
+    total than one trip per order.
+    """
+    deadline = time.perf_counter() + max(0.0, time_budget_seconds)
+    tour_miles: dict[frozenset[str], float] = {}
+
+    def miles_for(trip: frozenset[str]) -> float:
+        if trip not in tour_miles:
+            stops = _trip_stops(sorted(trip), order_stops)
+            tour_miles[trip] = optimize_stop_order(origin, stops, time_budget_seconds=MERGE_EVALUATION_BUDGET_SECONDS)[1]
+        return tour_miles[trip]
+
+    trips = [frozenset([order_id]) for order_id in sorted(order_stops)]
+    units = {trip: sum(order_units[order_id] for order_id in trip) for trip in trips}
+    while len(trips) > 1 and time.perf_counter() < deadline:
+        best: tuple[float, frozenset[str], frozenset[str]] | None = None
+        for first, second in combinations(trips, 2):
+            if truck_unit_capacity and units[first] + units[second] > truck_unit_capacity:
+                continue
+            savings = miles_for(first) + miles_for(second) - miles_for(first | second)
+            if savings > 1e-9 and (best is None or savings > best[0]):
+                best = (savings, first, second)
+            if time.perf_counter() >= deadline:
+                break
+        if best is None:
+            break
+        _, first, second = best
+        merged = first | second
+        units[merged] = units[first] + units[second]
+        trips = [trip for trip in trips if trip not in (first, second)] + [merged]
+
+    return [(sorted(trip), miles_for(trip)) for trip in sorted(trips, key=lambda trip: sorted(trip))]
+
+
+def _slot_orders_query(supplier_business_id: str, scheduled_start_at: datetime):
+    return (
+        select(SupplierConfirmedOrder)
+        .where(
+            SupplierConfirmedOrder.supplier_business_id == supplier_business_id,
+            SupplierConfirmedOrder.scheduled_start_at == scheduled_start_at,
+            SupplierConfirmedOrder.status == "confirmed",
+        )
+        .order_by(SupplierConfirmedOrder.created_at, SupplierConfirmedOrder.id)
+    )
+
+
+def _slot_fingerprint(orders: list[SupplierConfirmedOrder]) -> list[tuple[str, str, int]]:
+    return sorted((order.id, order.group_id, int(order.total_units)) for order in orders)
+
+
+async def plan_supplier_delivery_day(
+    session: AsyncSession,
+    *,
+    supplier_business_id: str,
+    scheduled_start_at: datetime,
+    now_utc: datetime | None = None,
+) -> int:
+    """Re-plan every confirmed order of a supplier for one start slot; returns the trip count.
+
+    Runs again whenever another order joins the slot, replacing the slot's previous trips.
+    Slots that have already started are left alone.
+
+    Trips and road routes are computed from an unlocked read, since routing may call the
+    directions API. Only then are the slot's orders locked and re-read; if the slot changed
+    meanwhile the plan is recomputed, otherwise it is written in a short transaction.
+    """
+    now_utc = now_utc or datetime.now(UTC)
+    if scheduled_start_at <= now_utc:
+        return 0
+    supplier = await session.get(Business, supplier_business_id)
+    if supplier is None or supplier.latitude is None or supplier.longitude is None:
+        return 0
+    settings = get_settings()
+    origin = (float(supplier.latitude), float(supplier.longitude))
+    truck_unit_capacity = supplier.truck_unit_capacity or settings.default_truck_unit_capacity or None
+
+    for _ in range(PLANNING_ATTEMPTS):
+        orders_result = await session.execute(_slot_orders_query(supplier_business_id, scheduled_start_at))
+        orders = list(orders_result.scalars().all())
+        if not orders:
+            return 0
+
+        stops_result = await session.execute(
+            select(GroupCommitment.group_id, Business.latitude, Business.longitude)
+            .join(Business, Business.id == GroupCommitment.business_id)
+            .where(
+                GroupCommitment.group_id.in_([order.group_id for order in orders]),
+                Business.latitude.is_not(None),
+                Business.longitude.is_not(None),
+            )
+        )
+        stops_by_group: dict[str, list[Point]] = {}
+        for group_id, lat, lng in stops_result.all():
+            stops_by_group.setdefault(str(group_id), []).append((float(lat), float(lng)))
+        orders_by_id = {order.id: order for order in orders if stops_by_group.get(order.group_id)}
+        if not orders_by_id:
+            return 0
+
+        order_stops = {order_id: stops_by_group[order.group_id] for order_id, order in orders_by_id.items()}
+        trips = await asyncio.to_thread(
+            plan_delivery_trips,
+            origin,
+            order_stops,
+            {order_id: int(order.total_units) for order_id, order in orders_by_id.items()},
+            truck_unit_capacity=truck_unit_capacity,
+            time_budget_seconds=settings.delivery_planning_time_budget_seconds,
+        )
+
+        planned: list[tuple[list[str], list[Point], list[list[float]], float, float, float]] = []
+        for order_ids, _ in trips:
+            stops = _trip_stops(order_ids, order_stops)
+            route_points, total_miles, total_minutes = await compute_delivery_route(
+                supplier_latitude=origin[0],
+                supplier_longitude=origin[1],
+                destination_points=stops,
+                session=session,
+            )
+            unbatched_miles = sum(
+                optimize_stop_order(
+                    origin, order_stops[order_id], time_budget_seconds=MERGE_EVALUATION_BUDGET_SECONDS
+                )[1]
+                for order_id in order_ids
+            )
+            planned.append((order_ids, stops, route_points, total_miles, total_minutes, unbatched_miles))
+        # Ends the read (keeping any route-cache entries) before the locks are taken.
+        await session.commit()
+
+        # Locking the slot's orders serializes concurrent writers for the same slot.
+        locked_result = await session.execute(
+            _slot_orders_query(supplier_business_id, scheduled_start_at)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        locked_orders = list(locked_result.scalars().all())
+        if _slot_fingerprint(locked_orders) != _slot_fingerprint(orders):
+            await session.rollback()
+            continue
+        return await _write_delivery_plan(
+            session,
+            supplier_business_id=supplier_business_id,
+            scheduled_start_at=scheduled_start_at,
+            orders_by_id=orders_by_id,
+            planned=planned,
+        )
+
+    # The slot kept changing; each change queues its own planning run, which will catch up.
+    logger.info("Slot %s of supplier %s changed during planning; skipped", scheduled_start_at, supplier_business_id)
+    return 0
+
+
+async def _write_delivery_plan(
+    session: AsyncSession,
+    *,
+    supplier_business_id: str,
+    scheduled_start_at: datetime,
+    orders_by_id: dict[str, SupplierConfirmedOrder],
+    planned: list[tuple[list[str], list[Point], list[list[float]], float, float, float]],
+) -> int:
+    await session.execute(
+        delete(DeliveryRoute).where(
+            DeliveryRoute.supplier_business_id == supplier_business_id,
+            DeliveryRoute.scheduled_start_at == scheduled_start_at,
+        )
+    )
+    assignments: list[tuple[DeliveryRoute, list[str]]] = []
+    for trip_index, (order_ids, stops, route_points, total_miles, total_minutes, unbatched_miles) in enumerate(planned):
+        route = DeliveryRoute(
+            id=str(uuid4()),
+            supplier_business_id=supplier_business_id,
+            scheduled_start_at=scheduled_start_at,
+            trip_index=trip_index,
+            order_count=len(order_ids),
+            stop_count=len(stops),
+            total_units=sum(int(orders_by_id[order_id].total_units) for order_id in order_ids),
+            total_miles=total_miles,
+            total_minutes=total_minutes,
+            unbatched_miles=unbatched_miles,
+            route_polyline=encode_polyline(route_points),
+            created_at=datetime.now(UTC),
+        )
+        session.add(route)
+        assignments.append((route, order_ids))
+    await session.flush()
+
+    for route, order_ids in assignments:
+        for order_id in order_ids:
+            order = orders_by_id[order_id]
+            order.delivery_route_id = route.id
+            order.route_points = None
+            order.route_total_miles = route.total_miles
+            order.route_total_minutes = route.total_minutes
+            order.estimated_end_at = scheduled_start_at + timedelta(minutes=route.total_minutes)
+
+    group_ids = sorted(order.group_id for order in orders_by_id.values())
+    region_result = await session.execute(select(BuyingGroup.region_id).where(BuyingGroup.id.in_(group_ids)))
+    region_ids = {int(region_id) for (region_id,) in region_result.all() if region_id is not None}
+    await bump_change_versions(session, region_ids=region_ids, group_ids=group_ids)
+    await session.commit()
+    group_listing_cache.invalidate_regions(region_ids)
+    return len(assignments)
@@ -1,16 +1,30 @@
 from __future__ import annotations
 
-import json
-import math
+import asyncio
 from datetime import UTC, datetime, timedelta
-from urllib.error import HTTPError, URLError
-from urllib.parse import urlencode
-from urllib.request import urlopen
 from zoneinfo import ZoneInfo
 
+import httpx
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from app.core.config import get_settings
+from app.core.http import get_http_client
+from app.service.route_cache_service import get_cached_route, route_cache_key, store_cached_route
+from app.service.route_geometry import decode_polyline, encode_polyline
+from app.service.road_graph import METERS_PER_MILE, RoadGraph, get_road_graph
+from app.service.route_optimizer import optimize_stop_order
 
 PACIFIC_TZ = ZoneInfo("America/Los_Angeles")
+DIRECTIONS_URL = "https://maps.googleapis.com/maps/api/directions/json"
+DISTANCE_MATRIX_URL = "https://maps.googleapis.com/maps/api/distancematrix/json"
+MAX_DESTINATION_CANDIDATES = 10
+# Directions accepts at most 25 intermediate waypoints per request.
+MAX_DIRECTIONS_WAYPOINTS = 25
+# Distance Matrix allows 100 elements per request; 10 x 10 tiles stay within it.
+DISTANCE_MATRIX_TILE = 10
+
+RouteResult = tuple[list[list[float]] | None, float | None, float | None]
 
 
 def next_business_day_start_utc(reference_utc: datetime | None = None) -> datetime:
@@ -35,74 +49,13 @@ def next_business_day_start_utc(reference_utc: datetime | None = None) -> dateti
     return local_start.astimezone(UTC)
 
 
-def _haversine_miles(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
-    r = 3958.8
-    lat1r, lng1r = math.radians(lat1), math.radians(lng1)
-    lat2r, lng2r = math.radians(lat2), math.radians(lng2)
-    dlat = lat2r - lat1r
-    dlng = lng2r - lng1r
-    a = math.sin(dlat / 2) ** 2 + math.cos(lat1r) * math.cos(lat2r) * math.sin(dlng / 2) ** 2
-    return 2 * r * math.asin(math.sqrt(a))
-
-
-def _nearest_neighbor_route(
-    supplier_point: tuple[float, float],
-    stops: list[tuple[float, float]],
-) -> list[tuple[float, float]]:
-    remaining = stops[:]
-    current = supplier_point
-    route: list[tuple[float, float]] = [supplier_point]
-    while remaining:
-        idx = min(
-            range(len(remaining)),
-            key=lambda i: _haversine_miles(current[0], current[1], remaining[i][0], remaining[i][1]),
-        )
-        nxt = remaining.pop(idx)
-        route.append(nxt)
-        current = nxt
-    return route
-
-
-def _decode_polyline(encoded: str) -> list[list[float]]:
-    points: list[list[float]] = []
-    index = 0
-    lat = 0
-    lng = 0
-    length = len(encoded)
-    while index < length:
-        shift = 0
-        result = 0
-        while True:
-            b = ord(encoded[index]) - 63
-            index += 1
-            result |= (b & 0x1F) << shift
-            shift += 5
-            if b < 0x20:
-                break
-        dlat = ~(result >> 1) if result & 1 else (result >> 1)
-        lat += dlat
-
-        shift = 0
-        result = 0
-        while True:
-            b = ord(encoded[index]) - 63
-            index += 1
-            result |= (b & 0x1F) << shift
-            shift += 5
-            if b < 0x20:
-                break
-        dlng = ~(result >> 1) if result & 1 else (result >> 1)
-        lng += dlng
-        points.append([lng / 1e5, lat / 1e5])
-    return points
-
-
-def _fetch_directions_request(
+async def _fetch_directions_request(
     *,
     origin_point: tuple[float, float],
     destination_point: tuple[float, float],
     waypoint_points: list[tuple[float, float]],
-) -> tuple[list[list[float]] | None, float | None, float | None]:
+    optimize_waypoints: bool = True,
+) -> RouteResult:
     settings = get_settings()
     if not settings.google_maps_api_key:
         return None, None, None
@@ -117,13 +70,18 @@ def _fetch_directions_request(
         "key": settings.google_maps_api_key,
     }
     if waypoint_points:
-        params["waypoints"] = "optimize:true|" + "|".join(f"{lat},{lng}" for lat, lng in waypoint_points)
+        prefix = "optimize:true|" if optimize_waypoints else ""
+        params["waypoints"] = prefix + "|".join(f"{lat},{lng}" for lat, lng in waypoint_points)
 
-    url = f"https://maps.googleapis.com/maps/api/directions/json?{urlencode(params)}"
     try:
-        with urlopen(url, timeout=12.0) as response:
-            payload = json.loads(response.read().decode("utf-8"))
-    except (HTTPError, URLError, TimeoutError, OSError, json.JSONDecodeError):
+        response = await get_http_client().get(
+            DIRECTIONS_URL,
+            params=params,
+            timeout=settings.directions_request_timeout_seconds,
+        )
+        response.raise_for_status()
+        payload = response.json()
+    except (httpx.HTTPError, ValueError):
         return None, None, None
 
     if payload.get("status") != "OK":
@@ -138,39 +96,61 @@ def _fetch_directions_request(
     total_seconds = sum(float(leg.get("duration", {}).get("value", 0) or 0) for leg in legs)
     if not polyline:
         return None, None, None
-    return _decode_polyline(polyline), total_meters / 1609.344, total_seconds / 60.0
+    return decode_polyline(polyline), total_meters / 1609.344, total_seconds / 60.0
 
 
-def _fetch_optimized_directions(
+async def _fetch_optimized_directions(
     supplier_point: tuple[float, float],
     destination_points: list[tuple[float, float]],
-) -> tuple[list[list[float]] | None, float | None, float | None]:
+) -> RouteResult:
     settings = get_settings()
     if not settings.google_maps_api_key or len(destination_points) == 0:
         return None, None, None
 
     # For a single stop, this is just one direct driving route.
     if len(destination_points) == 1:
-        return _fetch_directions_request(
+        return await _fetch_directions_request(
             origin_point=supplier_point,
             destination_point=destination_points[0],
             waypoint_points=[],
         )
 
     # Try each stop as the final destination and let Google optimize intermediate waypoints.
-    # Keep this bounded to avoid excessive API usage on very large groups.
-    candidate_indexes = range(min(len(destination_points), 10))
+    # Stops arrive pre-ordered by the local optimizer, so candidates are taken from the end
+    # of that tour (the likeliest final stops) and waypoints are sent in tour order. Keep this
+    # bounded to avoid excessive API usage on very large groups; candidates run concurrently
+    # under a cap, and whatever has answered by the deadline is compared.
+    semaphore = asyncio.Semaphore(max(1, settings.directions_max_concurrency))
+
+    async def fetch_candidate(destination_index: int) -> RouteResult:
+        async with semaphore:
+            return await _fetch_directions_request(
+                origin_point=supplier_point,
+                destination_point=destination_points[destination_index],
+                waypoint_points=[p for i, p in enumerate(destination_points) if i != destination_index],
+            )
+
+    tasks = [
+        asyncio.create_task(fetch_candidate(destination_index))
+        for destination_index in range(
+            len(destination_points) - 1,
+            len(destination_points) - 1 - min(len(destination_points), MAX_DESTINATION_CANDIDATES),
+            -1,
+        )
+    ]
+    done, pending = await asyncio.wait(tasks, timeout=settings.directions_deadline_seconds)
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
     best_points: list[list[float]] | None = None
     best_miles: float | None = None
     best_minutes: float | None = None
-    for destination_index in candidate_indexes:
-        destination_point = destination_points[destination_index]
-        waypoint_points = [p for i, p in enumerate(destination_points) if i != destination_index]
-        points, miles, minutes = _fetch_directions_request(
-            origin_point=supplier_point,
-            destination_point=destination_point,
-            waypoint_points=waypoint_points,
-        )
+    for task in tasks:
+        if task not in done or task.exception() is not None:
+            continue
+        points, miles, minutes = task.result()
         if points is None or miles is None or minutes is None:
             continue
         if best_minutes is None or minutes < best_minutes:
@@ -180,35 +160,214 @@ def _fetch_optimized_directions(
     return best_points, best_miles, best_minutes
 
 
-def compute_delivery_route(
+async def _fetch_distance_matrix(points: list[tuple[float, float]]) -> np.ndarray | None:
+    """Driving miles between every pair of ``points`` from the Distance Matrix API.
+
+    Large sets are split into tiles fetched concurrently; None if any element is missing.
+    ``n`` points cost ``ceil(n / 10) ** 2`` requests and ``n ** 2`` billed elements, so
+    callers cap ``n`` with ``DIRECTIONS_MATRIX_MAX_STOPS``.
+    """
+    settings = get_settings()
+    if not settings.google_maps_api_key:
+        return None
+    semaphore = asyncio.Semaphore(max(1, settings.directions_max_concurrency))
+    matrix = np.full((len(points), len(points)), np.inf)
+
+    async def fetch_tile(row_start: int, column_start: int) -> bool:
+        origins = points[row_start : row_start + DISTANCE_MATRIX_TILE]
+        destinations = points[column_start : column_start + DISTANCE_MATRIX_TILE]
+        params = {
+            "origins": "|".join(f"{lat},{lng}" for lat, lng in origins),
+            "destinations": "|".join(f"{lat},{lng}" for lat, lng in destinations),
+            "mode": "driving",
+            "key": settings.google_maps_api_key,
+        }
+        async with semaphore:
+            try:
+                response = await get_http_client().get(
+                    DISTANCE_MATRIX_URL,
+                    params=params,
+                    timeout=settings.directions_request_timeout_seconds,
+                )
+                response.raise_for_status()
+                payload = response.json()
+            except (httpx.HTTPError, ValueError):
+                return False
+        if payload.get("status") != "OK":
+            return False
+        rows = payload.get("rows") or []
+        if len(rows) != len(origins):
+            return False
+        for row_offset, row in enumerate(rows):
+            elements = row.get("elements") or []
+            if len(elements) != len(destinations):
+                return False
+            for column_offset, element in enumerate(elements):
+                if element.get("status") != "OK":
+                    return False
+                meters = float(element.get("distance", {}).get("value", 0) or 0)
+                matrix[row_start + row_offset, column_start + column_offset] = meters / METERS_PER_MILE
+        return True
+
+    starts = range(0, len(points), DISTANCE_MATRIX_TILE)
+    try:
+        results = await asyncio.wait_for(
+            asyncio.gather(*(fetch_tile(row, column) for row in starts for column in starts)),
+            timeout=settings.directions_deadline_seconds,
+        )
+    except TimeoutError:
+        return None
+    if not all(results):
+        return None
+    np.fill_diagonal(matrix, 0.0)
+    return matrix
+
+
+async def _fetch_fixed_order_directions(
+    supplier_point: tuple[float, float],
+    ordered_stops: list[tuple[float, float]],
+) -> RouteResult:
+    """Driving route through the stops in the given order, without Google re-ordering them.
+
+    One request covers up to 25 waypoints; longer tours are split into consecutive legs
+    that share their end stops, fetched concurrently and stitched together.
+    """
+    settings = get_settings()
+    if not settings.google_maps_api_key or not ordered_stops:
+        return None, None, None
+    path = [supplier_point, *ordered_stops]
+    leg_size = MAX_DIRECTIONS_WAYPOINTS + 1
+    semaphore = asyncio.Semaphore(max(1, settings.directions_max_concurrency))
+
+    async def fetch_leg(start: int) -> RouteResult:
+        leg = path[start : start + leg_size + 1]
+        async with semaphore:
+            return await _fetch_directions_request(
+                origin_point=leg[0],
+                destination_point=leg[-1],
+                waypoint_points=leg[1:-1],
+                optimize_waypoints=False,
+            )
+
+    try:
+        legs = await asyncio.wait_for(
+            asyncio.gather(*(fetch_leg(start) for start in range(0, len(path) - 1, leg_size))),
+            timeout=settings.directions_deadline_seconds,
+        )
+    except TimeoutError:
+        return None, None, None
+
+    points: list[list[float]] = []
+    total_miles = 0.0
+    total_minutes = 0.0
+    for leg_points, leg_miles, leg_minutes in legs:
+        if not leg_points or leg_miles is None or leg_minutes is None:
+            return None, None, None
+        points.extend(leg_points[1:] if points else leg_points)
+        total_miles += leg_miles
+        total_minutes += leg_minutes
+    return points, total_miles, total_minutes
+
+
+def _road_miles_matrix(graph: RoadGraph, points: list[tuple[float, float]]) -> np.ndarray | None:
+    nodes = graph.nearest_nodes(points)
+    if nodes is None:
+        return None
+    meters, _ = graph.travel_matrices(nodes)
+    if not np.isfinite(meters).all():
+        return None
+    return meters / METERS_PER_MILE
+
+
+def _order_stops(
+    supplier_point: tuple[float, float],
+    destination_points: list[tuple[float, float]],
+    graph: RoadGraph | None,
+    time_budget_seconds: float,
+    matrix: np.ndarray | None = None,
+) -> tuple[list[int], float]:
+    """Visit order for the stops, on road miles when a matrix is given or a road graph covers them."""
+    if matrix is None and graph is not None:
+        matrix = _road_miles_matrix(graph, [supplier_point, *destination_points])
+    return optimize_stop_order(
+        supplier_point,
+        destination_points,
+        time_budget_seconds=time_budget_seconds,
+        matrix=matrix,
+    )
+
+
+async def compute_delivery_route(
     *,
     supplier_latitude: float,
     supplier_longitude: float,
     destination_points: list[tuple[float, float]],
+    session: AsyncSession | None = None,
 ) -> tuple[list[list[float]], float, float]:
+    """Route from the supplier through every stop.
+
+    With ``ROUTING_BACKEND=google`` (the default) Google Directions is tried first; its
+    results are read from and written to the route cache when a ``session`` is given (in
+    the caller's transaction). ``DIRECTIONS_MODE=candidates`` (the default) sends one
+    ``optimize:true`` request per candidate final stop. In ``matrix`` mode stops are ordered
+    on one driving-distance matrix (local road graph if configured, else Distance Matrix for
+    up to ``DIRECTIONS_MATRIX_MAX_STOPS`` stops, else straight-line miles) and a single
+    fixed-order Directions request fetches the route. When Directions is unavailable, or with
+    ``ROUTING_BACKEND=road_graph``, the local road graph at ``ROAD_GRAPH_PATH`` routes the
+    tour. Without either, the straight-line tour is returned. Only Directions is cached.
+    """
+    settings = get_settings()
     supplier_point = (supplier_latitude, supplier_longitude)
-    directions_points, directions_miles, directions_minutes = _fetch_optimized_directions(
-        supplier_point,
-        destination_points,
-    )
-    if directions_points and directions_miles is not None and directions_minutes is not None:
-        return directions_points, float(directions_miles), float(directions_minutes)
+    use_directions = settings.routing_backend != "road_graph" and bool(settings.google_maps_api_key)
+    cache_key: str | None = None
+    if session is not None and use_directions and settings.route_cache_ttl_seconds > 0:
+        cache_key = route_cache_key(supplier_point, destination_points)
+        cached = await get_cached_route(session, cache_key)
+        if cached is not None:
+            encoded_polyline, cached_miles, cached_minutes = cached
+            return decode_polyline(encoded_polyline), cached_miles, cached_minutes
 
-    ordered = _nearest_neighbor_route(
+    graph = await asyncio.to_thread(get_road_graph)
+    matrix_mode = use_directions and settings.directions_mode == "matrix"
+    google_matrix = None
+    if matrix_mode and graph is None and 1 < len(destination_points) <= settings.directions_matrix_max_stops:
+        google_matrix = await _fetch_distance_matrix([supplier_point, *destination_points])
+    # Local search (and road matrices) are CPU-bound for large groups; keep them off the event loop.
+    stop_order, optimized_miles = await asyncio.to_thread(
+        _order_stops,
         supplier_point,
         destination_points,
+        graph,
+        settings.route_optimizer_time_budget_seconds,
+        google_matrix,
     )
-    fallback_points = [[lng, lat] for lat, lng in ordered]
-    total_miles = 0.0
-    for i in range(1, len(ordered)):
-        total_miles += _haversine_miles(
-            ordered[i - 1][0],
-            ordered[i - 1][1],
-            ordered[i][0],
-            ordered[i][1],
+    ordered_stops = [destination_points[index] for index in stop_order]
+
+    if use_directions:
+        fetch_directions = _fetch_fixed_order_directions if matrix_mode else _fetch_optimized_directions
+        directions_points, directions_miles, directions_minutes = await fetch_directions(
+            supplier_point,
+            ordered_stops,
         )
+        if directions_points and directions_miles is not None and directions_minutes is not None:
+            if cache_key is not None:
+                await store_cached_route(
+                    session,
+                    cache_key,
+                    encoded_polyline=encode_polyline(directions_points),
+                    total_miles=float(directions_miles),
+                    total_minutes=float(directions_minutes),
+                    stop_count=len(destination_points),
+                )
+            return directions_points, float(directions_miles), float(directions_minutes)
+
+    if graph is not None:
+        road_route = await asyncio.to_thread(graph.route_through, [supplier_point, *ordered_stops])
+        if road_route is not None:
+            return road_route
 
+    fallback_points = [[lng, lat] for lat, lng in [supplier_point, *ordered_stops]]
     avg_speed_mph = 22.0
-    base_minutes = (total_miles / avg_speed_mph) * 60.0
+    base_minutes = (optimized_miles / avg_speed_mph) * 60.0
     stop_buffer_minutes = max(0, len(destination_points) - 1) * 4.0
-    return fallback_points, float(total_miles), float(base_minutes + stop_buffer_minutes)
+    return fallback_points, float(optimized_miles), float(base_minutes + stop_buffer_minutes)
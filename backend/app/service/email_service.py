@@ -30,7 +30,5 @@ async def send_group_confirmed_email(recipients: list[str], group_id: str) -> bo
             server.send_message(msg)
         return True
 
-    try:
-        return await asyncio.to_thread(_send)
-    except Exception:
-        return False
+    # SMTP errors propagate so the notification job is retried.
+    return await asyncio.to_thread(_send)
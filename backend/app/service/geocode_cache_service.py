@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+import re
+import unicodedata
+
+from sqlalchemy import func, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache_metrics import cache_counters
+from app.core.config import get_settings
+from app.db.models.geocode_cache_entry import GeocodeCacheEntry
+from app.service.geocoding_service import GeocodingUnavailable, geocode_address
+
+geocode_cache_counters = cache_counters("geocode_cache")
+
+GEOCODE_FIELDS = (
+    "latitude",
+    "longitude",
+    "locality",
+    "admin_area_level_1",
+    "country",
+    "postal_code",
+    "formatted_address",
+)
+
+# Units within a building share its geocode, so "Apt 4", "Suite 200" and "#3B" are dropped.
+_UNIT_RE = re.compile(r"\b(?:apt|apartment|unit|suite|ste|room|rm|floor)\b\.?\s*#?\s*[a-z0-9-]+|#\s*[a-z0-9-]+")
+_ZIP_PLUS_FOUR_RE = re.compile(r"\b(\d{5})-\d{4}\b")
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+_PHRASES = (
+    ("united states of america", "us"),
+    ("united states", "us"),
+)
+_ABBREVIATIONS = {
+    "street": "st",
+    "avenue": "ave",
+    "av": "ave",
+    "boulevard": "blvd",
+    "road": "rd",
+    "drive": "dr",
+    "lane": "ln",
+    "court": "ct",
+    "place": "pl",
+    "terrace": "ter",
+    "highway": "hwy",
+    "parkway": "pkwy",
+    "square": "sq",
+    "alley": "aly",
+    "north": "n",
+    "south": "s",
+    "east": "e",
+    "west": "w",
+    "northeast": "ne",
+    "northwest": "nw",
+    "southeast": "se",
+    "southwest": "sw",
+    "california": "ca",
+    "usa": "us",
+}
+
+
+def normalize_address(address: str) -> str:
+    """Canonical cache key for an address: case, spacing, units and common abbreviations folded.
+
+    ``"123 Main Street, Apt 4, San Francisco, CA 94103-1234"`` and
+    ``"123  main st #4 san francisco ca 94103"`` normalize to the same key.
+    """
+    text = unicodedata.normalize("NFKC", address).lower()
+    text = _UNIT_RE.sub(" ", text)
+    text = _ZIP_PLUS_FOUR_RE.sub(r"\1", text)
+    text = _PUNCTUATION_RE.sub(" ", text.replace("&", " and "))
+    text = " ".join(text.split())
+    for phrase, replacement in _PHRASES:
+        text = re.sub(rf"\b{phrase}\b", replacement, text)
+    return " ".join(_ABBREVIATIONS.get(token, token) for token in text.split())
+
+
+async def get_cached_geocodes(
+    session: AsyncSession, normalized_addresses: list[str]
+) -> dict[str, tuple[bool, dict[str, object] | None]]:
+    """(found, result) for every live entry among the keys, counting hits on the rows."""
+    keys = sorted(set(normalized_addresses))
+    if not keys:
+        return {}
+    result = await session.execute(
+        update(GeocodeCacheEntry)
+        .where(GeocodeCacheEntry.normalized_address.in_(keys), GeocodeCacheEntry.expires_at > func.now())
+        .values(hit_count=GeocodeCacheEntry.hit_count + 1)
+        .returning(
+            GeocodeCacheEntry.normalized_address,
+            GeocodeCacheEntry.found,
+            *(getattr(GeocodeCacheEntry, field) for field in GEOCODE_FIELDS),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    entries: dict[str, tuple[bool, dict[str, object] | None]] = {}
+    for key, found, *values in result.all():
+        entries[key] = (True, dict(zip(GEOCODE_FIELDS, values))) if found else (False, None)
+    geocode_cache_counters.hits += len(entries)
+    geocode_cache_counters.misses += len(keys) - len(entries)
+    return entries
+
+
+async def get_cached_geocode(
+    session: AsyncSession, normalized_address: str
+) -> tuple[bool, dict[str, object] | None] | None:
+    """Return (found, result) for a live entry, counting the hit on the row; None on a miss."""
+    return (await get_cached_geocodes(session, [normalized_address])).get(normalized_address)
+
+
+async def store_cached_geocodes(session: AsyncSession, geocodes: dict[str, dict[str, object] | None]) -> None:
+    """Insert or refresh entries in the caller's transaction; a ``None`` value caches a miss."""
+    settings = get_settings()
+    now = datetime.now(UTC)
+    rows = []
+    for normalized_address, geocode in geocodes.items():
+        if geocode is None and settings.geocode_cache_negative_ttl_seconds <= 0:
+            continue
+        ttl_seconds = settings.geocode_cache_ttl_seconds if geocode else settings.geocode_cache_negative_ttl_seconds
+        rows.append(
+            {
+                "normalized_address": normalized_address,
+                "found": geocode is not None,
+                "hit_count": 0,
+                "expires_at": now + timedelta(seconds=ttl_seconds),
+                **{field: (geocode or {}).get(field) for field in GEOCODE_FIELDS},
+            }
+        )
+    if not rows:
+        return
+    stmt = pg_insert(GeocodeCacheEntry).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[GeocodeCacheEntry.normalized_address],
+        set_={
+            "found": stmt.excluded.found,
+            **{field: getattr(stmt.excluded, field) for field in GEOCODE_FIELDS},
+            "hit_count": 0,
+            "expires_at": stmt.excluded.expires_at,
+            "updated_at": func.now(),
+        },
+    )
+    await session.execute(stmt)
+    geocode_cache_counters.stores += len(rows)
+
+
+async def store_cached_geocode(
+    session: AsyncSession,
+    normalized_address: str,
+    geocode: dict[str, object] | None,
+) -> None:
+    await store_cached_geocodes(session, {normalized_address: geocode})
+
+
+async def cached_geocode_address(session: AsyncSession, address: str) -> dict[str, object] | None:
+    """Geocode through the cache. Definitive misses are cached; geocoder outages are not.
+
+    Writes happen in the caller's transaction; the caller commits.
+    """
+    normalized = normalize_address(address)
+    if not normalized:
+        return None
+    settings = get_settings()
+    cache_enabled = settings.geocode_cache_ttl_seconds > 0
+    if cache_enabled:
+        cached = await get_cached_geocode(session, normalized)
+        if cached is not None:
+            return cached[1]
+    try:
+        geocode = await geocode_address(address)
+    except GeocodingUnavailable:
+        return None
+    if cache_enabled:
+        await store_cached_geocode(session, normalized, geocode)
+    return geocode
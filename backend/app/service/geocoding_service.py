@@ -1,9 +1,11 @@
-import json
-from urllib.error import HTTPError, URLError
-from urllib.parse import urlencode
-from urllib.request import urlopen
+import asyncio
+
+import httpx
 
 from app.core.config import get_settings
+from app.core.http import get_http_client
+
+GEOCODE_URL = "https://maps.googleapis.com/maps/api/geocode/json"
 
 
 def _component(components: list[dict[str, object]], key: str) -> str | None:
@@ -15,27 +17,54 @@ def _component(components: list[dict[str, object]], key: str) -> str | None:
     return None
 
 
-def geocode_address(address: str) -> dict[str, object] | None:
+class GeocodingUnavailable(Exception):
+    """The geocoder could not answer (no key, network error, quota); the address may be fine."""
+
+
+# Statuses meaning Google looked and found nothing; anything else non-OK is transient.
+NOT_FOUND_STATUSES = {"ZERO_RESULTS"}
+
+
+_semaphore: asyncio.Semaphore | None = None
+_semaphore_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _geocode_semaphore() -> asyncio.Semaphore:
+    """Caps in-flight geocodes per event loop (``GEOCODE_MAX_CONCURRENCY``)."""
+    global _semaphore, _semaphore_loop
+    loop = asyncio.get_running_loop()
+    if _semaphore is None or _semaphore_loop is not loop:
+        _semaphore = asyncio.Semaphore(max(1, get_settings().geocode_max_concurrency))
+        _semaphore_loop = loop
+    return _semaphore
+
+
+async def geocode_address(address: str) -> dict[str, object] | None:
+    """Resolve an address; None when Google has no match, ``GeocodingUnavailable`` otherwise.
+
+    Uses the shared pooled HTTP client, so a slow geocode only suspends its own request.
+    """
     settings = get_settings()
     if not settings.google_maps_api_key:
-        return None
-
-    query = urlencode(
-        {
-            "address": address,
-            "key": settings.google_maps_api_key,
-        }
-    )
-    url = f"https://maps.googleapis.com/maps/api/geocode/json?{query}"
+        raise GeocodingUnavailable("Google Maps API key is not configured")
 
     try:
-        with urlopen(url, timeout=10.0) as response:
-            payload = json.loads(response.read().decode("utf-8"))
-    except (HTTPError, URLError, TimeoutError, OSError, json.JSONDecodeError):
-        return None
+        async with _geocode_semaphore():
+            response = await get_http_client().get(
+                GEOCODE_URL,
+                params={"address": address, "key": settings.google_maps_api_key},
+                timeout=settings.geocode_request_timeout_seconds,
+            )
+        response.raise_for_status()
+        payload = response.json()
+    except (httpx.HTTPError, ValueError) as exc:
+        raise GeocodingUnavailable(str(exc) or type(exc).__name__) from exc
 
-    if payload.get("status") != "OK":
+    status = payload.get("status")
+    if status in NOT_FOUND_STATUSES:
         return None
+    if status != "OK":
+        raise GeocodingUnavailable(f"Geocoding failed with status {status}")
 
     results = payload.get("results") or []
     if not results:
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from collections.abc import Hashable, Iterable
+import time
+
+from app.core.config import get_settings
+
+ALL_REGIONS = None
+
+
+class GroupListingCache:
+    """In-process cache of computed group listing payloads, partitioned by region.
+
+    Entries for one region (and the all-regions partition, which contains that region's
+    groups too) are dropped when a write in that region commits. Builds that started
+    before an invalidation are not stored, and the TTL bounds staleness from writes made
+    by other worker processes.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries_per_region: int = 256) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries_per_region = max_entries_per_region
+        self._partitions: dict[int | None, dict[Hashable, tuple[float, list[dict[str, object]]]]] = {}
+        self._generations: dict[int | None, int] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def generation(self, region_id: int | None) -> int:
+        return self._generations.get(region_id, 0)
+
+    def get(self, region_id: int | None, key: Hashable) -> list[dict[str, object]] | None:
+        if not self.enabled:
+            return None
+        entry = self._partitions.get(region_id, {}).get(key)
+        if entry is None:
+            return None
+        expires_at, payload = entry
+        if expires_at <= time.monotonic():
+            self._partitions[region_id].pop(key, None)
+            return None
+        return payload
+
+    def put(self, region_id: int | None, key: Hashable, payload: list[dict[str, object]], *, generation: int) -> None:
+        if not self.enabled or generation != self.generation(region_id):
+            return
+        partition = self._partitions.setdefault(region_id, {})
+        if len(partition) >= self.max_entries_per_region and key not in partition:
+            partition.pop(next(iter(partition)))
+        partition[key] = (time.monotonic() + self.ttl_seconds, payload)
+
+    def invalidate_regions(self, region_ids: Iterable[int | None]) -> None:
+        for region_id in {*region_ids, ALL_REGIONS}:
+            self._partitions.pop(region_id, None)
+            self._generations[region_id] = self.generation(region_id) + 1
+
+    def clear(self) -> None:
+        for region_id in list(self._partitions):
+            self._generations[region_id] = self.generation(region_id) + 1
+        self._partitions.clear()
+
+
+group_listing_cache = GroupListingCache(ttl_seconds=get_settings().group_list_cache_ttl_seconds)
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.buying_group import BuyingGroup
+from app.db.models.group_rollup import GroupRollup
+from app.db.models.supplier_product import SupplierProduct
+
+OPEN_GROUP_STATUSES = ("active", "capacity_reached")
+
+
+async def reconcile_capacity_statuses(session: AsyncSession, supplier_product_id: str) -> list[str]:
+    """Recompute ``active`` <-> ``capacity_reached`` for every open group on a supplier product.
+
+    Runs as a single UPDATE in the caller's transaction (the caller commits) and returns the
+    ids of the groups whose status changed. A group's capacity is its target capped by the
+    supplier's inventory minus what the other open groups on that product have reserved.
+    """
+    current_units = func.coalesce(GroupRollup.current_units, 0)
+    open_groups = (
+        select(
+            BuyingGroup.id.label("group_id"),
+            BuyingGroup.target_units.label("target_units"),
+            BuyingGroup.min_businesses_required.label("min_businesses_required"),
+            current_units.label("current_units"),
+            func.coalesce(GroupRollup.business_count, 0).label("business_count"),
+            func.sum(current_units).over().label("reserved_units"),
+        )
+        .outerjoin(GroupRollup, GroupRollup.group_id == BuyingGroup.id)
+        .where(
+            BuyingGroup.supplier_product_id == supplier_product_id,
+            BuyingGroup.status.in_(OPEN_GROUP_STATUSES),
+        )
+        .cte("open_groups")
+    )
+    capacity = (
+        select(
+            open_groups.c.group_id,
+            open_groups.c.current_units,
+            open_groups.c.business_count,
+            open_groups.c.min_businesses_required,
+            func.least(
+                open_groups.c.target_units,
+                func.greatest(
+                    0,
+                    SupplierProduct.available_units - (open_groups.c.reserved_units - open_groups.c.current_units),
+                ),
+            ).label("max_capacity"),
+        )
+        .join(SupplierProduct, SupplierProduct.id == supplier_product_id)
+        .cte("capacity")
+    )
+    next_status = case(
+        (
+            (capacity.c.current_units >= capacity.c.max_capacity)
+            & (capacity.c.business_count < capacity.c.min_businesses_required),
+            "capacity_reached",
+        ),
+        (capacity.c.current_units < capacity.c.max_capacity, "active"),
+        else_=BuyingGroup.status,
+    )
+    stmt = (
+        update(BuyingGroup)
+        .where(BuyingGroup.id == capacity.c.group_id, BuyingGroup.status != next_status)
+        .values(status=next_status)
+        .returning(BuyingGroup.id)
+    )
+    result = await session.execute(stmt)
+    return [str(group_id) for (group_id,) in result.all()]
+
+
+async def get_supplier_product_region_ids(session: AsyncSession, supplier_product_id: str) -> set[int]:
+    """Regions holding any group on a supplier product, i.e. whose listings show its inventory."""
+    result = await session.execute(
+        select(BuyingGroup.region_id).where(BuyingGroup.supplier_product_id == supplier_product_id).distinct()
+    )
+    return {int(region_id) for (region_id,) in result.all() if region_id is not None}
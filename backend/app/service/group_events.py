@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class GroupEventBroker:
+    """Fan group progress deltas out to in-process subscribers (one queue per SSE client).
+
+    Subscribers filter by region (None means every region). Slow subscribers lose their
+    oldest queued events rather than blocking publishers. Events only reach clients
+    connected to the worker process that committed the write.
+    """
+
+    def __init__(self, max_queue_size: int = 100) -> None:
+        self.max_queue_size = max_queue_size
+        self._subscribers: dict[asyncio.Queue[dict[str, object]], int | None] = {}
+
+    def has_any_subscribers(self) -> bool:
+        return bool(self._subscribers)
+
+    def has_subscribers(self, region_id: int | None) -> bool:
+        return any(filter_region is None or filter_region == region_id for filter_region in self._subscribers.values())
+
+    @asynccontextmanager
+    async def subscribe(self, region_id: int | None = None) -> AsyncIterator[asyncio.Queue[dict[str, object]]]:
+        queue: asyncio.Queue[dict[str, object]] = asyncio.Queue(maxsize=self.max_queue_size)
+        self._subscribers[queue] = region_id
+        try:
+            yield queue
+        finally:
+            self._subscribers.pop(queue, None)
+
+    def publish(self, event: dict[str, object]) -> None:
+        region_id = event.get("region_id")
+        for queue, filter_region in list(self._subscribers.items()):
+            if filter_region is not None and filter_region != region_id:
+                continue
+            if queue.full():
+                try:
+                    queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    pass
+                logger.debug("Dropped oldest group event for a slow subscriber")
+            queue.put_nowait(event)
+
+
+group_event_broker = GroupEventBroker()
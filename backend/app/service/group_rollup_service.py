@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.buying_group import BuyingGroup
+from app.db.models.group_commitment import GroupCommitment
+from app.db.models.group_rollup import GroupRollup
+
+
+async def apply_commitment_to_rollup(
+    session: AsyncSession,
+    *,
+    group_id: str,
+    units_delta: int,
+    business_delta: int,
+) -> None:
+    """Adjust a group's counters in the caller's transaction; the caller commits."""
+    stmt = pg_insert(GroupRollup).values(
+        group_id=group_id,
+        current_units=max(0, units_delta),
+        business_count=max(0, business_delta),
+        version=1,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[GroupRollup.group_id],
+        set_={
+            "current_units": GroupRollup.current_units + units_delta,
+            "business_count": GroupRollup.business_count + business_delta,
+            "version": GroupRollup.version + 1,
+            "updated_at": func.now(),
+        },
+    )
+    await session.execute(stmt)
+
+
+def _raw_rollups_query():
+    return (
+        select(
+            BuyingGroup.id.label("group_id"),
+            func.coalesce(func.sum(GroupCommitment.units), 0).label("current_units"),
+            func.count(func.distinct(GroupCommitment.business_id)).label("business_count"),
+        )
+        .outerjoin(GroupCommitment, GroupCommitment.group_id == BuyingGroup.id)
+        .group_by(BuyingGroup.id)
+    )
+
+
+async def rebuild_group_rollups(session: AsyncSession, *, only_missing: bool = False) -> int:
+    """Recompute rollup rows from raw commitments.
+
+    With ``only_missing`` existing rows are left untouched, which is what startup uses to
+    backfill groups created before the rollup table existed.
+    """
+    raw = _raw_rollups_query().add_columns(func.now().label("updated_at")).subquery()
+    stmt = pg_insert(GroupRollup).from_select(
+        ["group_id", "current_units", "business_count", "updated_at"],
+        select(raw.c.group_id, raw.c.current_units, raw.c.business_count, raw.c.updated_at),
+    )
+    if only_missing:
+        stmt = stmt.on_conflict_do_nothing(index_elements=[GroupRollup.group_id])
+    else:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[GroupRollup.group_id],
+            set_={
+                "current_units": stmt.excluded.current_units,
+                "business_count": stmt.excluded.business_count,
+                "version": GroupRollup.version + 1,
+                "updated_at": func.now(),
+            },
+            where=or_(
+                GroupRollup.current_units != stmt.excluded.current_units,
+                GroupRollup.business_count != stmt.excluded.business_count,
+            ),
+        )
+    result = await session.execute(stmt)
+    await session.commit()
+    return int(result.rowcount or 0)
+
+
+async def verify_group_rollups(session: AsyncSession) -> list[dict[str, object]]:
+    """Return every group whose stored counters disagree with its raw commitments."""
+    raw = _raw_rollups_query().subquery()
+    stmt = (
+        select(
+            raw.c.group_id,
+            raw.c.current_units,
+            raw.c.business_count,
+            GroupRollup.current_units,
+            GroupRollup.business_count,
+        )
+        .outerjoin(GroupRollup, GroupRollup.group_id == raw.c.group_id)
+        .where(
+            or_(
+                GroupRollup.group_id.is_(None),
+                GroupRollup.current_units != raw.c.current_units,
+                GroupRollup.business_count != raw.c.business_count,
+            )
+        )
+        .order_by(raw.c.group_id)
+    )
+    result = await session.execute(stmt)
+    return [
+        {
+            "group_id": str(group_id),
+            "expected_current_units": int(expected_units or 0),
+            "expected_business_count": int(expected_businesses or 0),
+            "stored_current_units": int(stored_units) if stored_units is not None else None,
+            "stored_business_count": int(stored_businesses) if stored_businesses is not None else None,
+        }
+        for group_id, expected_units, expected_businesses, stored_units, stored_businesses in result.all()
+    ]
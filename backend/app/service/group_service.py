@@ -1,28 +1,46 @@
 from __future__ import annotations
 
-import asyncio
+import base64
+import json
 from datetime import UTC, datetime, timedelta
 from decimal import Decimal
 from uuid import uuid4
 
-from sqlalchemy import Select, func, select
+from sqlalchemy import Float, Select, func, literal, select, tuple_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, defer
 
 from app.core.config import get_settings
 from app.db.models.business import Business
 from app.db.models.buying_group import BuyingGroup
+from app.db.models.delivery_route import DeliveryRoute
 from app.db.models.group_commitment import GroupCommitment
+from app.db.models.group_rollup import GroupRollup
 from app.db.models.product import Product
 from app.db.models.region import Region
 from app.db.models.supplier_confirmed_order import SupplierConfirmedOrder
 from app.db.models.supplier_product import SupplierProduct
-from app.service.delivery_route_service import compute_delivery_route, next_business_day_start_utc
+from app.service.change_version_service import bump_change_versions
+from app.service.delivery_route_service import next_business_day_start_utc
 from app.service.email_service import send_group_confirmed_email
+from app.service.group_cache import group_listing_cache
+from app.service.group_capacity_service import (
+    OPEN_GROUP_STATUSES,
+    get_supplier_product_region_ids,
+    reconcile_capacity_statuses,
+)
+from app.service.group_events import group_event_broker
+from app.service.group_rollup_service import apply_commitment_to_rollup
+from app.service.job_queue_service import JOB_NOTIFY_GROUP_CONFIRMED, JOB_PLAN_ORDER_ROUTE, enqueue_job
+from app.service.route_geometry import route_points_for_read
 from app.service.supplier_service import get_reserved_units_by_supplier_product
 from app.service.utils import safe_divide, to_float
 
 settings = get_settings()
 TERMINAL_GROUP_STATUSES = {"confirmed", "completed", "closed", "cancelled"}
+LISTED_GROUP_STATUSES = ("active", "capacity_reached", "confirmed")
+COMMITMENT_UNIQUE_CONSTRAINT = "uq_group_commitments_group_id_business_id"
 
 
 def _build_group_metrics(
@@ -131,8 +149,11 @@ async def create_group(
         created_at=datetime.now(UTC),
     )
     session.add(group)
+    session.add(GroupRollup(group_id=group.id, current_units=0, business_count=0, version=0))
+    await bump_change_versions(session, region_ids=[group.region_id], group_ids=[group.id])
     await session.commit()
     await session.refresh(group)
+    group_listing_cache.invalidate_regions([group.region_id])
     return group
 
 
@@ -153,36 +174,35 @@ async def join_group(session: AsyncSession, *, group_id: str, business_id: str,
         raise ValueError("Business must be assigned to a region before joining groups")
     if group.region_id != business.region_id:
         raise ValueError("Businesses can only join groups in the same region")
+    # Capacity is checked and the commitment written while holding the group (and inventory)
+    # row locks, so concurrent joins serialize instead of both passing the check.
+    current_units, business_count = await _lock_group_for_write(session, group)
     if group.status in TERMINAL_GROUP_STATUSES:
+        await session.rollback()
         if group.status == "confirmed":
             raise ValueError("Group is already confirmed")
         raise ValueError("Group is no longer open for joining")
-    existing_commitment = await session.execute(
-        select(GroupCommitment.id).where(
-            GroupCommitment.group_id == group.id,
-            GroupCommitment.business_id == business.id,
-        )
-    )
-    if existing_commitment.first() is not None:
-        raise ValueError("Business has already joined this group")
-
-    rollups = await _fetch_group_rollups(session, [group.id])
-    current_units = int(rollups.get(group.id, {}).get("current_units", 0))
-    business_count = int(rollups.get(group.id, {}).get("business_count", 0))
     max_units_allowed, _, status_changed = await _sync_group_capacity_status(
         session,
         group,
         current_units=current_units,
         business_count=business_count,
     )
-    if status_changed:
-        await session.commit()
+    rejection: str | None = None
     if group.status == "capacity_reached" and current_units >= max_units_allowed:
-        raise ValueError("Group inventory capacity is filled; waiting on supplier restock")
-
-    if current_units + units > max_units_allowed:
+        rejection = "Group inventory capacity is filled; waiting on supplier restock"
+    elif current_units + units > max_units_allowed:
         remaining = max(0, max_units_allowed - current_units)
-        raise ValueError(f"Requested units exceed remaining group capacity ({remaining} units left)")
+        rejection = f"Requested units exceed remaining group capacity ({remaining} units left)"
+    if rejection is not None:
+        if status_changed:
+            await bump_change_versions(session, region_ids=[group.region_id], group_ids=[group.id])
+            await session.commit()
+            group_listing_cache.invalidate_regions([group.region_id])
+            await _publish_group_progress(session, group)
+        else:
+            await session.rollback()
+        raise ValueError(rejection)
 
     commitment = GroupCommitment(
         id=str(uuid4()),
@@ -192,8 +212,23 @@ async def join_group(session: AsyncSession, *, group_id: str, business_id: str,
         created_at=datetime.now(UTC),
     )
     session.add(commitment)
+    try:
+        await session.flush()
+    except IntegrityError as exc:
+        await session.rollback()
+        if COMMITMENT_UNIQUE_CONSTRAINT in str(exc.orig):
+            raise ValueError("Business has already joined this group") from exc
+        raise
+    await apply_commitment_to_rollup(session, group_id=group_id, units_delta=units, business_delta=1)
+    changed_group_ids: list[str] = []
+    if group.supplier_product_id:
+        # The new units shrink what every other open group on this inventory can still take.
+        changed_group_ids = await reconcile_capacity_statuses(session, group.supplier_product_id)
+    changed_region_ids = await _record_group_change(session, group)
     await session.commit()
-    await session.refresh(commitment)
+    group_listing_cache.invalidate_regions(changed_region_ids)
+    await _publish_group_progress(session, group)
+    await publish_groups_progress(session, [changed for changed in changed_group_ids if changed != group.id])
     await _maybe_confirm_group(session, group.id)
     return commitment
 
@@ -228,10 +263,11 @@ async def _maybe_confirm_group(
     if not group or group.status in TERMINAL_GROUP_STATUSES:
         return
 
-    rollups = await _fetch_group_rollups(session, [group_id])
-    stats = rollups.get(group_id, {"current_units": 0, "business_count": 0})
-    current_units = int(stats["current_units"])
-    business_count = int(stats["business_count"])
+    current_units, business_count = await _lock_group_for_write(session, group)
+    if group.status in TERMINAL_GROUP_STATUSES:
+        # A concurrent join confirmed it while we waited for the lock.
+        await session.commit()
+        return
     _, _, status_changed = await _sync_group_capacity_status(
         session,
         group,
@@ -239,21 +275,23 @@ async def _maybe_confirm_group(
         business_count=business_count,
     )
     if status_changed:
-        await session.commit()
-        await session.refresh(group)
+        await bump_change_versions(session, region_ids=[group.region_id], group_ids=[group.id])
 
     if current_units <= 0:
+        await _end_unconfirmed(session, group, status_changed=status_changed)
         if allow_supplier_override:
             raise ValueError("Cannot confirm a group with no committed units")
         return
 
     if business_count < int(group.min_businesses_required) and not allow_supplier_override:
+        await _end_unconfirmed(session, group, status_changed=status_changed)
         return
 
     supplier_product = None
     if group.supplier_product_id:
         supplier_product = await session.get(SupplierProduct, group.supplier_product_id)
         if supplier_product and supplier_product.available_units < current_units:
+            await _end_unconfirmed(session, group, status_changed=status_changed)
             raise ValueError("Supplier inventory is insufficient for confirmation")
 
     group.status = "confirmed"
@@ -268,79 +306,163 @@ async def _maybe_confirm_group(
                     supplier_product.available_units = 0
                     supplier_product.status = "sold_out"
 
-            supplier = await session.get(Business, group.supplier_business_id)
-            route_points: list[list[float]] | None = None
-            route_total_miles: float | None = None
-            route_total_minutes: float | None = None
-            if supplier is not None and supplier.latitude is not None and supplier.longitude is not None:
-                commitment_businesses_result = await session.execute(
-                    select(Business)
-                    .join(GroupCommitment, GroupCommitment.business_id == Business.id)
-                    .where(GroupCommitment.group_id == group.id)
-                )
-                commitment_businesses = commitment_businesses_result.scalars().all()
-                delivery_stops = [
-                    (float(b.latitude), float(b.longitude))
-                    for b in commitment_businesses
-                    if b.latitude is not None and b.longitude is not None
-                ]
-            else:
-                delivery_stops = []
-
-            if delivery_stops:
-                route_points, route_total_miles, route_total_minutes = compute_delivery_route(
-                    supplier_latitude=float(supplier.latitude),
-                    supplier_longitude=float(supplier.longitude),
-                    destination_points=delivery_stops,
-                )
-
-            scheduled_start_at = next_business_day_start_utc()
-            estimated_end_at = (
-                scheduled_start_at + timedelta(minutes=route_total_minutes)
-                if route_total_minutes is not None
-                else None
-            )
+            order_id = str(uuid4())
             session.add(
                 SupplierConfirmedOrder(
-                    id=str(uuid4()),
+                    id=order_id,
                     supplier_business_id=group.supplier_business_id,
                     supplier_product_id=group.supplier_product_id,
                     group_id=group.id,
                     total_units=current_units,
                     business_count=business_count,
                     status="confirmed",
-                    scheduled_start_at=scheduled_start_at,
-                    estimated_end_at=estimated_end_at,
-                    route_total_miles=route_total_miles,
-                    route_total_minutes=route_total_minutes,
-                    route_points=route_points,
+                    scheduled_start_at=next_business_day_start_utc(),
                     created_at=datetime.now(UTC),
                 )
             )
-
+            # Route planning calls out to Maps; the worker fills in route_* and estimated_end_at.
+            enqueue_job(session, kind=JOB_PLAN_ORDER_ROUTE, payload={"order_id": order_id})
+    # One job per recipient, so a retry never re-sends to someone already emailed.
+    for email in await _participant_emails(session, group.id):
+        enqueue_job(session, kind=JOB_NOTIFY_GROUP_CONFIRMED, payload={"group_id": group.id, "email": email})
+
+    changed_group_ids: list[str] = []
+    if supplier_product is not None:
+        await session.flush()
+        changed_group_ids = await reconcile_capacity_statuses(session, supplier_product.id)
+    changed_region_ids = await _record_group_change(session, group)
     await session.commit()
+    group_listing_cache.invalidate_regions(changed_region_ids)
+    await _publish_group_progress(session, group)
+    await publish_groups_progress(session, [changed for changed in changed_group_ids if changed != group.id])
 
+
+async def _participant_emails(session: AsyncSession, group_id: str) -> list[str]:
     participant_result = await session.execute(
         select(Business.email)
         .join(GroupCommitment, GroupCommitment.business_id == Business.id)
-        .where(GroupCommitment.group_id == group.id, Business.email.is_not(None))
+        .where(GroupCommitment.group_id == group_id, Business.email.is_not(None))
+    )
+    return sorted({str(email).strip() for (email,) in participant_result.all() if email and str(email).strip()})
+
+
+async def notify_group_confirmed(session: AsyncSession, group_id: str, email: str | None = None) -> bool:
+    """Email one participant that the group is confirmed (background job).
+
+    Jobs queued before notifications were split per recipient carry no ``email``; they are
+    turned into one job per participant instead of sending to everyone at once.
+    """
+    if email is not None:
+        return await send_group_confirmed_email([email], group_id)
+    for recipient in await _participant_emails(session, group_id):
+        enqueue_job(session, kind=JOB_NOTIFY_GROUP_CONFIRMED, payload={"group_id": group_id, "email": recipient})
+    await session.commit()
+    return True
+
+
+async def _lock_group_for_write(session: AsyncSession, group: BuyingGroup) -> tuple[int, int]:
+    """Row-lock a group until the transaction ends; returns its (current_units, business_count).
+
+    A group drawing on supplier inventory locks that supplier product first: sibling groups
+    share its capacity, so their joins have to queue on the same row. Inventory updates and
+    confirmations also write the supplier product before the group, so the order cannot deadlock.
+    """
+    if group.supplier_product_id:
+        await session.execute(
+            select(SupplierProduct)
+            .where(SupplierProduct.id == group.supplier_product_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+    row = (
+        await session.execute(
+            select(BuyingGroup, GroupRollup.current_units, GroupRollup.business_count)
+            .outerjoin(GroupRollup, GroupRollup.group_id == BuyingGroup.id)
+            .where(BuyingGroup.id == group.id)
+            .with_for_update(of=BuyingGroup)
+            .execution_options(populate_existing=True)
+        )
+    ).first()
+    if row is None:
+        raise ValueError("Group not found")
+    return int(row[1] or 0), int(row[2] or 0)
+
+
+async def _end_unconfirmed(session: AsyncSession, group: BuyingGroup, *, status_changed: bool) -> None:
+    """Release the confirmation locks, keeping any capacity status change that was made."""
+    await session.commit()
+    if status_changed:
+        group_listing_cache.invalidate_regions([group.region_id])
+        await _publish_group_progress(session, group)
+
+
+async def _record_group_change(session: AsyncSession, group: BuyingGroup) -> set[int]:
+    """Bump change versions for a group write before commit; returns the regions to invalidate."""
+    region_ids = {group.region_id}
+    if group.supplier_product_id:
+        # Every listing that shows this inventory's remaining units is affected.
+        region_ids |= await get_supplier_product_region_ids(session, group.supplier_product_id)
+    await bump_change_versions(
+        session,
+        region_ids=region_ids,
+        group_ids=[group.id],
+        supplier_product_ids=[group.supplier_product_id],
+    )
+    return region_ids
+
+
+async def publish_groups_progress(session: AsyncSession, group_ids: list[str]) -> None:
+    """Publish progress for groups changed as a side effect, e.g. siblings a reconcile flipped."""
+    if not group_ids or not group_event_broker.has_any_subscribers():
+        return
+    result = await session.execute(
+        select(BuyingGroup).where(BuyingGroup.id.in_(sorted(set(group_ids)))).execution_options(populate_existing=True)
+    )
+    for group in result.scalars().all():
+        await _publish_group_progress(session, group)
+
+
+async def publish_supplier_product_progress(session: AsyncSession, supplier_product_id: str) -> None:
+    """Publish progress for every open group drawing on a supplier product, after its inventory changed."""
+    if not group_event_broker.has_any_subscribers():
+        return
+    result = await session.execute(
+        select(BuyingGroup.id).where(
+            BuyingGroup.supplier_product_id == supplier_product_id,
+            BuyingGroup.status.in_(OPEN_GROUP_STATUSES),
+        )
+    )
+    await publish_groups_progress(session, [str(group_id) for (group_id,) in result.all()])
+
+
+async def _publish_group_progress(session: AsyncSession, group: BuyingGroup) -> None:
+    if not group_event_broker.has_subscribers(group.region_id):
+        return
+    rollup = (await _fetch_group_rollups(session, [group.id])).get(group.id, {"current_units": 0, "business_count": 0})
+    current_units = int(rollup["current_units"])
+    max_capacity, _ = await _compute_group_capacity(session, group)
+    group_event_broker.publish(
+        {
+            "group_id": group.id,
+            "region_id": group.region_id,
+            "status": group.status,
+            "current_units": current_units,
+            "business_count": int(rollup["business_count"]),
+            "remaining_units": _remaining_units_for_group(
+                status=group.status,
+                current_units=current_units,
+                max_capacity=max_capacity,
+            ),
+        }
     )
-    recipients = sorted({str(email).strip() for (email,) in participant_result.all() if email})
-    await send_group_confirmed_email(recipients, group.id)
 
 
 async def _fetch_group_rollups(session: AsyncSession, group_ids: list[str]) -> dict[str, dict[str, int]]:
     if not group_ids:
         return {}
 
-    stmt = (
-        select(
-            GroupCommitment.group_id,
-            func.coalesce(func.sum(GroupCommitment.units), 0).label("current_units"),
-            func.count(func.distinct(GroupCommitment.business_id)).label("business_count"),
-        )
-        .where(GroupCommitment.group_id.in_(group_ids))
-        .group_by(GroupCommitment.group_id)
+    stmt = select(GroupRollup.group_id, GroupRollup.current_units, GroupRollup.business_count).where(
+        GroupRollup.group_id.in_(group_ids)
     )
     result = await session.execute(stmt)
 
@@ -353,34 +475,6 @@ async def _fetch_group_rollups(session: AsyncSession, group_ids: list[str]) -> d
     return rollups
 
 
-async def _complete_finished_orders(session: AsyncSession) -> None:
-    now_utc = datetime.now(UTC)
-    result = await session.execute(
-        select(SupplierConfirmedOrder, BuyingGroup)
-        .join(BuyingGroup, BuyingGroup.id == SupplierConfirmedOrder.group_id)
-        .where(
-            SupplierConfirmedOrder.status == "confirmed",
-            SupplierConfirmedOrder.estimated_end_at.is_not(None),
-            SupplierConfirmedOrder.estimated_end_at <= now_utc,
-        )
-    )
-    rows = result.all()
-    if not rows:
-        return
-
-    changed = False
-    for order, group in rows:
-        if order.status != "completed":
-            order.status = "completed"
-            changed = True
-        if group.status == "confirmed":
-            group.status = "completed"
-            changed = True
-
-    if changed:
-        await session.commit()
-
-
 async def _compute_group_capacity(
     session: AsyncSession,
     group: BuyingGroup,
@@ -443,95 +537,194 @@ def _group_base_query() -> Select:
         select(BuyingGroup, Product, Region)
         .join(Product, Product.id == BuyingGroup.product_id)
         .outerjoin(Region, Region.id == BuyingGroup.region_id)
-        .order_by(BuyingGroup.created_at.desc())
+        .order_by(BuyingGroup.created_at.desc(), BuyingGroup.id.desc())
     )
 
 
+def encode_group_cursor(created_at: datetime, group_id: str) -> str:
+    raw = json.dumps([created_at.isoformat(), group_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_group_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at_raw, group_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        created_at = datetime.fromisoformat(str(created_at_raw))
+    except (ValueError, TypeError, json.JSONDecodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    return created_at, str(group_id)
+
+
 async def list_active_groups(
     session: AsyncSession,
     region_id: int | None = None,
     business_id: str | None = None,
+    *,
+    category: str | None = None,
+    status: str | None = None,
+    supplier_business_id: str | None = None,
+    min_progress_pct: float | None = None,
+    cursor: str | None = None,
+    limit: int | None = None,
 ) -> list[dict[str, object]]:
-    await _complete_finished_orders(session)
-    stmt = _group_base_query().where(BuyingGroup.status.in_(["active", "capacity_reached", "confirmed"]))
-    if region_id is not None:
-        stmt = stmt.where(BuyingGroup.region_id == region_id)
-    result = await session.execute(stmt)
-    rows = result.all()
-
-    groups = [row[0] for row in rows]
-    products_by_group = {row[0].id: row[1] for row in rows}
-    regions_by_group = {row[0].id: row[2] for row in rows}
-
-    group_ids = [g.id for g in groups]
-    sp_ids = sorted({g.supplier_product_id for g in groups if g.supplier_product_id})
-
-    if sp_ids:
-        rollups, reserved_by_product = await asyncio.gather(
-            _fetch_group_rollups(session, group_ids),
-            get_reserved_units_by_supplier_product(session, sp_ids),
-        )
-    else:
-        rollups = await _fetch_group_rollups(session, group_ids)
-        reserved_by_product = {}
-
-    sp_objects: dict[str, SupplierProduct] = {}
-    if sp_ids:
-        sp_result = await session.execute(select(SupplierProduct).where(SupplierProduct.id.in_(sp_ids)))
-        sp_objects = {sp.id: sp for sp in sp_result.scalars().all()}
-    confirmed_orders_map: dict[str, SupplierConfirmedOrder] = {}
-    if group_ids:
-        confirmed_orders_result = await session.execute(
-            select(SupplierConfirmedOrder).where(SupplierConfirmedOrder.group_id.in_(group_ids))
+    if status is not None and status not in LISTED_GROUP_STATUSES:
+        raise ValueError(f"status must be one of: {', '.join(LISTED_GROUP_STATUSES)}")
+    if limit is not None and limit <= 0:
+        raise ValueError("limit must be greater than 0")
+    keyset = decode_group_cursor(cursor) if cursor else None
+
+    cache_key = (
+        category.strip().lower() if category else None,
+        status,
+        supplier_business_id,
+        min_progress_pct if min_progress_pct and min_progress_pct > 0 else None,
+        keyset,
+        limit,
+    )
+    payload = group_listing_cache.get(region_id, cache_key)
+    if payload is None:
+        generation = group_listing_cache.generation(region_id)
+        payload = await _build_group_listing(
+            session,
+            region_id=region_id,
+            category=category,
+            status=status,
+            supplier_business_id=supplier_business_id,
+            min_progress_pct=min_progress_pct,
+            keyset=keyset,
+            limit=limit,
         )
-        confirmed_orders_map = {order.group_id: order for order in confirmed_orders_result.scalars().all()}
+        group_listing_cache.put(region_id, cache_key, payload, generation=generation)
+
+    # joined_by_business is per caller, so it is overlaid on the shared payload.
     joined_group_ids: set[str] = set()
-    if business_id and group_ids:
+    if business_id and payload:
         joined_result = await session.execute(
             select(GroupCommitment.group_id).where(
-                GroupCommitment.group_id.in_(group_ids),
+                GroupCommitment.group_id.in_([group["id"] for group in payload]),
                 GroupCommitment.business_id == business_id,
             )
         )
         joined_group_ids = {str(gid) for (gid,) in joined_result.all()}
+    return [{**group, "joined_by_business": str(group["id"]) in joined_group_ids} for group in payload]
+
+
+def _group_listing_query(
+    *,
+    region_id: int | None,
+    category: str | None,
+    status: str | None,
+    supplier_business_id: str | None,
+    min_progress_pct: float | None,
+    keyset: tuple[datetime, str] | None,
+    limit: int | None,
+) -> Select:
+    """One statement returning every column the listing payload needs.
+
+    Rollups, supplier inventory and the confirmed order are 1:1 joins, and the units
+    reserved on each row's supplier product come from a correlated (lateral) subquery,
+    so the page size bounds the work regardless of how many groups exist.
+    """
+    peer_group = aliased(BuyingGroup)
+    peer_rollup = aliased(GroupRollup)
+    reserved_units = (
+        select(func.coalesce(func.sum(peer_rollup.current_units), 0))
+        .select_from(peer_group)
+        .join(peer_rollup, peer_rollup.group_id == peer_group.id)
+        .where(
+            peer_group.supplier_product_id == BuyingGroup.supplier_product_id,
+            peer_group.status.in_(OPEN_GROUP_STATUSES),
+        )
+        .correlate(BuyingGroup)
+        .scalar_subquery()
+    )
+    current_units = func.coalesce(GroupRollup.current_units, 0)
+    stmt = (
+        _group_base_query()
+        .outerjoin(GroupRollup, GroupRollup.group_id == BuyingGroup.id)
+        .outerjoin(SupplierProduct, SupplierProduct.id == BuyingGroup.supplier_product_id)
+        .outerjoin(SupplierConfirmedOrder, SupplierConfirmedOrder.group_id == BuyingGroup.id)
+        .add_columns(
+            current_units.label("current_units"),
+            func.coalesce(GroupRollup.business_count, 0).label("business_count"),
+            SupplierProduct.available_units,
+            reserved_units.label("reserved_units"),
+            SupplierConfirmedOrder.scheduled_start_at,
+            SupplierConfirmedOrder.estimated_end_at,
+        )
+        .where(BuyingGroup.status == status if status is not None else BuyingGroup.status.in_(LISTED_GROUP_STATUSES))
+    )
+    if region_id is not None:
+        stmt = stmt.where(BuyingGroup.region_id == region_id)
+    if category:
+        stmt = stmt.where(func.lower(Product.category) == category.strip().lower())
+    if supplier_business_id:
+        stmt = stmt.where(BuyingGroup.supplier_business_id == supplier_business_id)
+    if min_progress_pct is not None and min_progress_pct > 0:
+        # Bind as floats: integer-typed parameters would reject fractional percentages.
+        stmt = stmt.where(
+            current_units * literal(100.0, Float) >= literal(float(min_progress_pct), Float) * BuyingGroup.target_units
+        )
+    if keyset is not None:
+        stmt = stmt.where(tuple_(BuyingGroup.created_at, BuyingGroup.id) < tuple_(*keyset))
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
+async def _build_group_listing(
+    session: AsyncSession,
+    *,
+    region_id: int | None,
+    category: str | None,
+    status: str | None,
+    supplier_business_id: str | None,
+    min_progress_pct: float | None,
+    keyset: tuple[datetime, str] | None,
+    limit: int | None,
+) -> list[dict[str, object]]:
+    result = await session.execute(
+        _group_listing_query(
+            region_id=region_id,
+            category=category,
+            status=status,
+            supplier_business_id=supplier_business_id,
+            min_progress_pct=min_progress_pct,
+            keyset=keyset,
+            limit=limit,
+        )
+    )
 
     payload: list[dict[str, object]] = []
-    has_status_updates = False
-    for group in groups:
-        product = products_by_group[group.id]
-        rollup = rollups.get(group.id, {"current_units": 0, "business_count": 0})
-        current_units = int(rollup["current_units"])
-        business_count = int(rollup["business_count"])
+    for (
+        group,
+        product,
+        region,
+        current_units,
+        business_count,
+        sp_available_units,
+        reserved_total,
+        scheduled_start_at,
+        estimated_end_at,
+    ) in result.all():
+        current_units = int(current_units or 0)
+        business_count = int(business_count or 0)
         metrics = _build_group_metrics(product, current_units, business_count, group.target_units)
 
         max_capacity = int(group.target_units)
         supplier_available_units: int | None = None
-        if group.supplier_product_id:
-            sp = sp_objects.get(group.supplier_product_id)
-            if sp:
-                reserved_total = int(reserved_by_product.get(group.supplier_product_id, 0))
-                own_reserved = current_units if group.status in ("active", "capacity_reached") else 0
-                reserved_excluding_group = max(0, reserved_total - own_reserved)
-                supplier_available_units = max(0, int(sp.available_units) - reserved_excluding_group)
-                max_capacity = min(max_capacity, supplier_available_units)
-
-        changed = False
-        if group.status != "confirmed":
-            if current_units >= max_capacity and business_count < int(group.min_businesses_required):
-                if group.status != "capacity_reached":
-                    group.status = "capacity_reached"
-                    changed = True
-            elif group.status == "capacity_reached" and current_units < max_capacity:
-                group.status = "active"
-                changed = True
-        if changed:
-            has_status_updates = True
+        if group.supplier_product_id and sp_available_units is not None:
+            own_reserved = current_units if group.status in OPEN_GROUP_STATUSES else 0
+            reserved_excluding_group = max(0, int(reserved_total or 0) - own_reserved)
+            supplier_available_units = max(0, int(sp_available_units) - reserved_excluding_group)
+            max_capacity = min(max_capacity, supplier_available_units)
+
         remaining_units = _remaining_units_for_group(
             status=group.status,
             current_units=current_units,
             max_capacity=max_capacity,
         )
-        region = regions_by_group.get(group.id)
         center_lat = round((region.min_lat + region.max_lat) / 2, 6) if region else None
         center_lng = round((region.min_lng + region.max_lng) / 2, 6) if region else None
 
@@ -540,7 +733,6 @@ async def list_active_groups(
                 "id": group.id,
                 "status": group.status,
                 "created_by_business_id": group.created_by_business_id,
-                "joined_by_business": str(group.id) in joined_group_ids,
                 "region_id": group.region_id,
                 "group_center_latitude": center_lat,
                 "group_center_longitude": center_lng,
@@ -549,13 +741,10 @@ async def list_active_groups(
                 "supplier_available_units": supplier_available_units,
                 "min_businesses_required": group.min_businesses_required,
                 "confirmed_at": group.confirmed_at,
-                "scheduled_start_at": confirmed_orders_map.get(group.id).scheduled_start_at
-                if confirmed_orders_map.get(group.id)
-                else None,
-                "estimated_end_at": confirmed_orders_map.get(group.id).estimated_end_at
-                if confirmed_orders_map.get(group.id)
-                else None,
+                "scheduled_start_at": scheduled_start_at,
+                "estimated_end_at": estimated_end_at,
                 "deadline": group.deadline,
+                "created_at": group.created_at,
                 "target_units": group.target_units,
                 "remaining_units": remaining_units,
                 "product": {
@@ -570,14 +759,17 @@ async def list_active_groups(
             }
         )
 
-    if has_status_updates:
-        await session.commit()
-
     return payload
 
 
-async def get_group_details(session: AsyncSession, group_id: str) -> dict[str, object] | None:
-    await _complete_finished_orders(session)
+async def get_group_details(
+    session: AsyncSession,
+    group_id: str,
+    *,
+    include_route: bool = False,
+    route_zoom: int | None = None,
+) -> dict[str, object] | None:
+    """Full group view. The confirmed order's route geometry is only expanded with ``include_route``."""
     result = await session.execute(_group_base_query().where(BuyingGroup.id == group_id))
     row = result.first()
     if not row:
@@ -587,15 +779,7 @@ async def get_group_details(session: AsyncSession, group_id: str) -> dict[str, o
     rollups = await _fetch_group_rollups(session, [group.id])
     current_units = int(rollups.get(group.id, {}).get("current_units", 0))
     business_count = int(rollups.get(group.id, {}).get("business_count", 0))
-    max_capacity, supplier_available_units, status_changed = await _sync_group_capacity_status(
-        session,
-        group,
-        current_units=current_units,
-        business_count=business_count,
-    )
-    if status_changed:
-        await session.commit()
-        await session.refresh(group)
+    max_capacity, supplier_available_units = await _compute_group_capacity(session, group)
     metrics = _build_group_metrics(product, current_units, business_count, group.target_units)
 
     commitments_result = await session.execute(
@@ -611,10 +795,19 @@ async def get_group_details(session: AsyncSession, group_id: str) -> dict[str, o
         max_capacity=max_capacity,
     )
 
-    confirmed_order_result = await session.execute(
-        select(SupplierConfirmedOrder).where(SupplierConfirmedOrder.group_id == group.id)
-    )
-    confirmed_order = confirmed_order_result.scalar_one_or_none()
+    confirmed_order_stmt = select(SupplierConfirmedOrder).where(SupplierConfirmedOrder.group_id == group.id)
+    if include_route:
+        confirmed_order_stmt = confirmed_order_stmt.add_columns(DeliveryRoute.route_polyline).outerjoin(
+            DeliveryRoute, DeliveryRoute.id == SupplierConfirmedOrder.delivery_route_id
+        )
+    else:
+        confirmed_order_stmt = confirmed_order_stmt.options(defer(SupplierConfirmedOrder.route_points))
+    confirmed_order_result = await session.execute(confirmed_order_stmt)
+    confirmed_order_row = confirmed_order_result.first()
+    confirmed_order = confirmed_order_row[0] if confirmed_order_row is not None else None
+    route_points = None
+    if confirmed_order is not None and include_route:
+        route_points = route_points_for_read(confirmed_order_row[1], confirmed_order.route_points, zoom=route_zoom)
 
     return {
         "id": group.id,
@@ -628,6 +821,7 @@ async def get_group_details(session: AsyncSession, group_id: str) -> dict[str, o
         "scheduled_start_at": confirmed_order.scheduled_start_at if confirmed_order is not None else None,
         "estimated_end_at": confirmed_order.estimated_end_at if confirmed_order is not None else None,
         "deadline": group.deadline,
+        "created_at": group.created_at,
         "target_units": group.target_units,
         "remaining_units": remaining_units,
         "created_by_business_id": group.created_by_business_id,
@@ -662,7 +856,7 @@ async def get_group_details(session: AsyncSession, group_id: str) -> dict[str, o
                 "estimated_end_at": confirmed_order.estimated_end_at,
                 "route_total_miles": confirmed_order.route_total_miles,
                 "route_total_minutes": confirmed_order.route_total_minutes,
-                "route_points": confirmed_order.route_points,
+                "route_points": route_points,
             }
             if confirmed_order is not None
             else None
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from uuid import uuid4
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.db.models.background_job import BackgroundJob
+
+JOB_PLAN_ORDER_ROUTE = "plan_order_route"
+JOB_NOTIFY_GROUP_CONFIRMED = "notify_group_confirmed"
+
+MAX_ERROR_LENGTH = 2000
+
+
+def enqueue_job(
+    session: AsyncSession,
+    *,
+    kind: str,
+    payload: dict[str, object],
+    run_after: datetime | None = None,
+) -> BackgroundJob:
+    """Add a job to the caller's transaction; it becomes visible to workers when that commits."""
+    now = datetime.now(UTC)
+    job = BackgroundJob(
+        id=str(uuid4()),
+        kind=kind,
+        payload=payload,
+        status="pending",
+        attempts=0,
+        max_attempts=get_settings().job_max_attempts,
+        run_after=run_after or now,
+        created_at=now,
+        updated_at=now,
+    )
+    session.add(job)
+    return job
+
+
+async def claim_jobs(session: AsyncSession, *, limit: int, now_utc: datetime | None = None) -> list[BackgroundJob]:
+    """Mark up to ``limit`` runnable jobs as running and commit, so other workers skip them.
+
+    Jobs left ``running`` longer than the lock timeout belong to a worker that died and are
+    claimed again.
+    """
+    now_utc = now_utc or datetime.now(UTC)
+    stale_before = now_utc - timedelta(seconds=get_settings().job_lock_timeout_seconds)
+    runnable = (
+        select(BackgroundJob.id)
+        .where(
+            or_(
+                and_(BackgroundJob.status == "pending", BackgroundJob.run_after <= now_utc),
+                and_(BackgroundJob.status == "running", BackgroundJob.locked_at < stale_before),
+            )
+        )
+        .order_by(BackgroundJob.run_after)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    result = await session.execute(
+        update(BackgroundJob)
+        .where(BackgroundJob.id.in_(runnable.scalar_subquery()))
+        .values(status="running", locked_at=now_utc, attempts=BackgroundJob.attempts + 1, updated_at=now_utc)
+        .returning(BackgroundJob)
+        .execution_options(synchronize_session=False)
+    )
+    jobs = list(result.scalars().all())
+    await session.commit()
+    return jobs
+
+
+async def mark_job_succeeded(session: AsyncSession, job_id: str) -> None:
+    now_utc = datetime.now(UTC)
+    await session.execute(
+        update(BackgroundJob)
+        .where(BackgroundJob.id == job_id)
+        .values(status="succeeded", locked_at=None, last_error=None, updated_at=now_utc)
+    )
+    await session.commit()
+
+
+async def release_job(session: AsyncSession, job: BackgroundJob) -> None:
+    """Hand a claimed job back unfinished: ``pending`` again, without using up an attempt."""
+    now_utc = datetime.now(UTC)
+    await session.execute(
+        update(BackgroundJob)
+        .where(BackgroundJob.id == job.id, BackgroundJob.status == "running")
+        .values(
+            status="pending",
+            locked_at=None,
+            attempts=BackgroundJob.attempts - 1,
+            run_after=now_utc,
+            updated_at=now_utc,
+        )
+    )
+    await session.commit()
+
+
+def retry_delay_seconds(attempts: int) -> float:
+    """Exponential backoff from the configured base, capped at one hour."""
+    base = get_settings().job_retry_base_seconds
+    return min(3600.0, base * (2 ** max(0, attempts - 1)))
+
+
+async def mark_job_failed(session: AsyncSession, job: BackgroundJob, error: str) -> bool:
+    """Record a failed attempt; returns True when the job will be retried."""
+    now_utc = datetime.now(UTC)
+    will_retry = int(job.attempts) < int(job.max_attempts)
+    values: dict[str, object] = {
+        "status": "pending" if will_retry else "failed",
+        "locked_at": None,
+        "last_error": error[:MAX_ERROR_LENGTH],
+        "updated_at": now_utc,
+    }
+    if will_retry:
+        values["run_after"] = now_utc + timedelta(seconds=retry_delay_seconds(int(job.attempts)))
+    await session.execute(update(BackgroundJob).where(BackgroundJob.id == job.id).values(**values))
+    await session.commit()
+    return will_retry
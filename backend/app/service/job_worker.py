@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.db.models.background_job import BackgroundJob
+from app.db.session import SessionLocal
+from app.service.group_service import notify_group_confirmed
+from app.service.job_queue_service import (
+    JOB_NOTIFY_GROUP_CONFIRMED,
+    JOB_PLAN_ORDER_ROUTE,
+    claim_jobs,
+    mark_job_failed,
+    mark_job_succeeded,
+    release_job,
+)
+from app.service.supplier_order_service import plan_order_route
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[AsyncSession, dict[str, object]], Awaitable[object]]
+
+JOB_HANDLERS: dict[str, JobHandler] = {
+    JOB_PLAN_ORDER_ROUTE: lambda session, payload: plan_order_route(session, str(payload["order_id"])),
+    JOB_NOTIFY_GROUP_CONFIRMED: lambda session, payload: notify_group_confirmed(
+        session, str(payload["group_id"]), str(payload["email"]) if payload.get("email") else None
+    ),
+}
+
+
+async def _release(job: BackgroundJob) -> None:
+    async with SessionLocal() as session:
+        await release_job(session, job)
+
+
+async def run_job(job: BackgroundJob) -> bool:
+    """Run one claimed job in its own session and record the outcome; returns True on success.
+
+    If the worker is cancelled (app shutdown) mid-job, the job is handed back as ``pending``
+    so the next worker picks it up at once instead of after the lock timeout.
+    """
+    handler = JOB_HANDLERS.get(job.kind)
+    try:
+        if handler is None:
+            raise LookupError(f"No handler registered for job kind {job.kind!r}")
+        async with SessionLocal() as session:
+            await handler(session, dict(job.payload or {}))
+    except asyncio.CancelledError:
+        await asyncio.shield(_release(job))
+        raise
+    except Exception as exc:
+        async with SessionLocal() as session:
+            will_retry = await mark_job_failed(session, job, f"{type(exc).__name__}: {exc}")
+        if will_retry:
+            logger.warning("Job %s (%s) attempt %s failed: %s", job.id, job.kind, job.attempts, exc)
+        else:
+            logger.error("Job %s (%s) failed after %s attempts: %s", job.id, job.kind, job.attempts, exc)
+        return False
+
+    async with SessionLocal() as session:
+        await mark_job_succeeded(session, job.id)
+    return True
+
+
+async def run_job_worker_tick() -> int:
+    """Drain runnable jobs a batch at a time; returns how many were processed."""
+    batch_size = max(1, get_settings().job_worker_batch_size)
+    processed = 0
+    while True:
+        async with SessionLocal() as session:
+            jobs = await claim_jobs(session, limit=batch_size)
+        if not jobs:
+            break
+        await asyncio.gather(*(run_job(job) for job in jobs))
+        processed += len(jobs)
+        if len(jobs) < batch_size:
+            break
+    return processed
@@ -0,0 +1,469 @@
+"""In-memory lat/lng -> region index.
+
+Regions change only when they are (re)seeded, so every worker keeps them in memory instead
+of sending a bounding-box query per business. Seeded regions are the blocks of city grids
+(see ``app.service.city_grid``). A point's city is found by a coarse lat/lng hash and its
+block by arithmetic. Any other layout falls back to a uniform bucket grid, so a lookup
+still checks only the few regions that overlap the point's bucket.
+
+The index is reloaded when the ``regions`` change version moves, which is checked at most
+every ``REGION_INDEX_REFRESH_SECONDS``.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+import math
+import time
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache_metrics import cache_counters
+from app.core.config import get_settings
+from app.db.models.region import Region
+from app.db.session import SessionLocal
+from app.service.change_version_service import REGION_SET_SCOPE, get_change_version
+from app.service.city_grid import parse_cell_code, subcell_code
+
+region_index_counters = cache_counters("region_index")
+
+# Slack, as a fraction of one cell, for grid detection and for points on a grid's outer edge.
+_GRID_TOLERANCE = 1e-6
+# Buckets per axis for irregular layouts, capped so empty space does not blow up memory.
+_MAX_BUCKETS_PER_AXIS = 256
+# Cities are found through a hash of coarse lat/lng squares, so a lookup only tries the
+# one or two cities whose bounds reach the point's square.
+_CITY_BUCKET_DEGREES = 0.5
+
+
+class RegionSnapshot:
+    """Plain copy of a ``regions`` row.
+
+    The index outlives the request that loaded it, so it must not hold ORM instances: a
+    rollback in that request's session would expire them, and once the session closes every
+    attribute access raises ``DetachedInstanceError``.
+    """
+
+    __slots__ = ("id", "code", "name", "row_index", "col_index", "min_lat", "max_lat", "min_lng", "max_lng")
+
+    def __init__(
+        self,
+        id: int,
+        code: str,
+        name: str,
+        row_index: int,
+        col_index: int,
+        min_lat: float,
+        max_lat: float,
+        min_lng: float,
+        max_lng: float,
+    ) -> None:
+        self.id = id
+        self.code = code
+        self.name = name
+        self.row_index = row_index
+        self.col_index = col_index
+        self.min_lat = min_lat
+        self.max_lat = max_lat
+        self.min_lng = min_lng
+        self.max_lng = max_lng
+
+
+_SNAPSHOT_COLUMNS = tuple(getattr(Region, column) for column in RegionSnapshot.__slots__)
+
+
+async def load_regions() -> list[RegionSnapshot]:
+    """Snapshots of every region, read in a short-lived session of their own."""
+    async with SessionLocal() as session:
+        result = await session.execute(select(*_SNAPSHOT_COLUMNS).order_by(Region.id))
+        return [RegionSnapshot(*row) for row in result.all()]
+
+
+def _degree_bucket(latitude: float, longitude: float) -> tuple[int, int]:
+    return math.floor(latitude / _CITY_BUCKET_DEGREES), math.floor(longitude / _CITY_BUCKET_DEGREES)
+
+
+class RegionCell:
+    """Where a point falls: its region (block), city and 1-based sub-cell within the block."""
+
+    __slots__ = ("region", "city_code", "sub_row", "sub_col")
+
+    def __init__(self, region: RegionSnapshot, city_code: str | None, sub_row: int, sub_col: int) -> None:
+        self.region = region
+        self.city_code = city_code
+        self.sub_row = sub_row
+        self.sub_col = sub_col
+
+    @property
+    def code(self) -> str:
+        return subcell_code(self.region.code, self.sub_row, self.sub_col)
+
+
+class _CityCells:
+    """One city's blocks on a regular grid; a point's block is found by arithmetic."""
+
+    def __init__(
+        self,
+        code: str,
+        cells: np.ndarray,
+        first_row: int,
+        first_col: int,
+        origin: tuple[float, float],
+        step: tuple[float, float],
+        index: RegionIndex,
+    ) -> None:
+        self.code = code
+        self.cells = cells
+        # Stored block edges per row and column. Arithmetic only gets within rounding of
+        # them, so a point on a shared edge is moved onto the stored side afterwards.
+        self.lat_lower = index.min_lat[cells[:, 0]]
+        self.lat_upper = index.max_lat[cells[:, 0]]
+        self.lng_lower = index.min_lng[cells[0, :]]
+        self.lng_upper = index.max_lng[cells[0, :]]
+        self.cell_rows = cells.tolist()
+        self.positions = cells.ravel()
+        self.first_row = first_row
+        self.first_col = first_col
+        self.origin = origin
+        self.step = step
+        row_count, col_count = cells.shape
+        self.extent = (
+            origin[0],
+            origin[0] + row_count * step[0],
+            origin[1],
+            origin[1] + col_count * step[1],
+        )
+
+    @classmethod
+    def build(cls, code: str, positions: list[int], index: RegionIndex) -> _CityCells | None:
+        """Grid for the given regions, or None if they are not equal cells of one rectangle."""
+        members = [index.regions[position] for position in positions]
+        rows = np.array([region.row_index for region in members])
+        cols = np.array([region.col_index for region in members])
+        row_count = int(rows.max() - rows.min()) + 1
+        col_count = int(cols.max() - cols.min()) + 1
+        if row_count * col_count != len(members):
+            return None
+        row_offsets = rows - rows.min()
+        col_offsets = cols - cols.min()
+        cells = np.full((row_count, col_count), -1, dtype=np.int64)
+        cells[row_offsets, col_offsets] = positions
+        if (cells < 0).any():
+            return None  # two regions claim the same cell
+
+        selected = np.asarray(positions)
+        min_lat, max_lat = index.min_lat[selected], index.max_lat[selected]
+        min_lng, max_lng = index.min_lng[selected], index.max_lng[selected]
+        origin_lat = float(min_lat.min())
+        origin_lng = float(min_lng.min())
+        lat_step = (float(max_lat.max()) - origin_lat) / row_count
+        lng_step = (float(max_lng.max()) - origin_lng) / col_count
+        if lat_step <= 0 or lng_step <= 0:
+            return None
+        expected = (
+            (min_lat, origin_lat + row_offsets * lat_step, lat_step),
+            (max_lat, origin_lat + (row_offsets + 1) * lat_step, lat_step),
+            (min_lng, origin_lng + col_offsets * lng_step, lng_step),
+            (max_lng, origin_lng + (col_offsets + 1) * lng_step, lng_step),
+        )
+        if any(not np.allclose(actual, wanted, rtol=0, atol=step * _GRID_TOLERANCE) for actual, wanted, step in expected):
+            return None
+        return cls(code, cells, int(rows.min()), int(cols.min()), (origin_lat, origin_lng), (lat_step, lng_step), index)
+
+    def cell_position(self, latitude: float, longitude: float) -> int:
+        """Position of the block the arithmetic points at, or -1 outside the city."""
+        row_count, col_count = self.cells.shape
+        row_f = (latitude - self.origin[0]) / self.step[0]
+        col_f = (longitude - self.origin[1]) / self.step[1]
+        if not (-_GRID_TOLERANCE <= row_f <= row_count + _GRID_TOLERANCE):
+            return -1
+        if not (-_GRID_TOLERANCE <= col_f <= col_count + _GRID_TOLERANCE):
+            return -1
+        # The outer north/east edges are inclusive, so they belong to the last row/column.
+        row = min(max(int(row_f), 0), row_count - 1)
+        col = min(max(int(col_f), 0), col_count - 1)
+        if row < row_count - 1 and latitude >= self.lat_upper[row]:
+            row += 1
+        elif row > 0 and latitude < self.lat_lower[row]:
+            row -= 1
+        if col < col_count - 1 and longitude >= self.lng_upper[col]:
+            col += 1
+        elif col > 0 and longitude < self.lng_lower[col]:
+            col -= 1
+        return self.cell_rows[row][col]
+
+    def cell_positions(self, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+        """Vectorized ``cell_position``."""
+        row_count, col_count = self.cells.shape
+        positions = np.full(latitudes.shape, -1, dtype=np.int64)
+        with np.errstate(invalid="ignore"):
+            rows_f = (latitudes - self.origin[0]) / self.step[0]
+            cols_f = (longitudes - self.origin[1]) / self.step[1]
+            inside = (
+                (rows_f >= -_GRID_TOLERANCE)
+                & (rows_f <= row_count + _GRID_TOLERANCE)
+                & (cols_f >= -_GRID_TOLERANCE)
+                & (cols_f <= col_count + _GRID_TOLERANCE)
+            )
+        rows = np.clip(rows_f[inside].astype(np.int64), 0, row_count - 1)
+        cols = np.clip(cols_f[inside].astype(np.int64), 0, col_count - 1)
+        lat_in, lng_in = latitudes[inside], longitudes[inside]
+        rows += (rows < row_count - 1) & (lat_in >= self.lat_upper[rows])
+        rows -= (rows > 0) & (lat_in < self.lat_lower[rows])
+        cols += (cols < col_count - 1) & (lng_in >= self.lng_upper[cols])
+        cols -= (cols > 0) & (lng_in < self.lng_lower[cols])
+        positions[inside] = self.cells[rows, cols]
+        return positions
+
+    def block(self, row_index: int, col_index: int) -> int:
+        row, col = row_index - self.first_row, col_index - self.first_col
+        row_count, col_count = self.cells.shape
+        if 0 <= row < row_count and 0 <= col < col_count:
+            return self.cell_rows[row][col]
+        return -1
+
+
+class RegionIndex:
+    """Immutable snapshot of the regions table, answering point lookups without the database.
+
+    Regions are grouped by city (the prefix of ``SF-2-3`` style codes). A city whose blocks
+    tile a rectangle is searched by arithmetic, and cities are found through a coarse
+    lat/lng hash. Other regions go into a uniform bucket grid.
+
+    Bounds are inclusive, as in the SQL lookup. A point on the edge shared by two blocks
+    goes to the block with the higher row or column.
+    """
+
+    def __init__(self, regions: Sequence[RegionSnapshot], version: int = 0) -> None:
+        self.regions = tuple(regions)
+        self.version = version
+        self._by_code = {region.code: region for region in self.regions}
+        self.min_lat = np.array([region.min_lat for region in self.regions], dtype=np.float64)
+        self.max_lat = np.array([region.max_lat for region in self.regions], dtype=np.float64)
+        self.min_lng = np.array([region.min_lng for region in self.regions], dtype=np.float64)
+        self.max_lng = np.array([region.max_lng for region in self.regions], dtype=np.float64)
+        # Plain-Python copies for scalar lookups, where NumPy element access is slow.
+        self._bounds = [
+            (region.min_lat, region.max_lat, region.min_lng, region.max_lng) for region in self.regions
+        ]
+
+        by_city: dict[str, list[int]] = {}
+        loose: list[int] = []
+        for position, region in enumerate(self.regions):
+            parsed = parse_cell_code(region.code)
+            if parsed is None:
+                loose.append(position)
+            else:
+                by_city.setdefault(parsed[0], []).append(position)
+        self._cities: list[_CityCells] = []
+        for city_code, positions in by_city.items():
+            city = _CityCells.build(city_code, positions, self)
+            if city is None:
+                loose.extend(positions)
+            else:
+                self._cities.append(city)
+        self._city_by_code = {city.code: city for city in self._cities}
+        self._city_of_position = {
+            int(position): city for city in self._cities for position in city.positions.tolist()
+        }
+        self._city_buckets: dict[tuple[int, int], list[_CityCells]] = {}
+        for city in self._cities:
+            first_row, first_col = _degree_bucket(city.extent[0], city.extent[2])
+            last_row, last_col = _degree_bucket(city.extent[1], city.extent[3])
+            for row in range(first_row, last_row + 1):
+                for col in range(first_col, last_col + 1):
+                    self._city_buckets.setdefault((row, col), []).append(city)
+
+        self._loose = np.array(sorted(loose), dtype=np.int64)
+        self._buckets: dict[tuple[int, int], list[int]] = {}
+        if len(self._loose):
+            self._build_buckets()
+
+    def __len__(self) -> int:
+        return len(self.regions)
+
+    @property
+    def is_grid(self) -> bool:
+        """True when every region sits on a city grid (no bucket fallback)."""
+        return bool(self.regions) and not len(self._loose)
+
+    @property
+    def city_codes(self) -> list[str]:
+        return [city.code for city in self._cities]
+
+    def _build_buckets(self) -> None:
+        loose = self._loose
+        origin_lat = float(self.min_lat[loose].min())
+        origin_lng = float(self.min_lng[loose].min())
+        span_lat = float(self.max_lat[loose].max()) - origin_lat
+        span_lng = float(self.max_lng[loose].max()) - origin_lng
+        # Roughly one bucket per typical region, so most buckets hold one or two candidates.
+        typical_lat = float(np.median(self.max_lat[loose] - self.min_lat[loose])) or span_lat or 1.0
+        typical_lng = float(np.median(self.max_lng[loose] - self.min_lng[loose])) or span_lng or 1.0
+        rows = min(_MAX_BUCKETS_PER_AXIS, max(1, math.ceil(span_lat / typical_lat)))
+        cols = min(_MAX_BUCKETS_PER_AXIS, max(1, math.ceil(span_lng / typical_lng)))
+        self._origin = (origin_lat, origin_lng)
+        self._step = (span_lat / rows or 1.0, span_lng / cols or 1.0)
+        self._bucket_shape = (rows, cols)
+        for position in loose.tolist():
+            first_row, first_col = self._bucket(self.min_lat[position], self.min_lng[position])
+            last_row, last_col = self._bucket(self.max_lat[position], self.max_lng[position])
+            for row in range(first_row, last_row + 1):
+                for col in range(first_col, last_col + 1):
+                    self._buckets.setdefault((row, col), []).append(position)
+
+    def _bucket(self, latitude: float, longitude: float) -> tuple[int, int]:
+        rows, cols = self._bucket_shape
+        row = int((latitude - self._origin[0]) // self._step[0])
+        col = int((longitude - self._origin[1]) // self._step[1])
+        return min(max(row, 0), rows - 1), min(max(col, 0), cols - 1)
+
+    def _contains(self, position: int, latitude: float, longitude: float) -> bool:
+        min_lat, max_lat, min_lng, max_lng = self._bounds[position]
+        return min_lat <= latitude <= max_lat and min_lng <= longitude <= max_lng
+
+    def _scan(self, positions: np.ndarray, latitude: float, longitude: float) -> int:
+        """Last of ``positions`` whose bounds contain the point, or -1."""
+        hits = positions[
+            (self.min_lat[positions] <= latitude)
+            & (self.max_lat[positions] >= latitude)
+            & (self.min_lng[positions] <= longitude)
+            & (self.max_lng[positions] >= longitude)
+        ]
+        return int(hits[-1]) if len(hits) else -1
+
+    def _city_lookup(self, city: _CityCells, latitude: float, longitude: float) -> int:
+        position = city.cell_position(latitude, longitude)
+        if position >= 0 and not self._contains(position, latitude, longitude):
+            # Float rounding put the point just across a block border.
+            position = self._scan(city.positions, latitude, longitude)
+        return position
+
+    def _loose_lookup(self, latitude: float, longitude: float) -> int:
+        match = -1
+        for position in self._buckets.get(self._bucket(latitude, longitude), ()):
+            if self._contains(position, latitude, longitude):
+                match = position
+        return match
+
+    def _position(self, latitude: float, longitude: float) -> int:
+        if not (math.isfinite(latitude) and math.isfinite(longitude)):
+            return -1
+        for city in self._city_buckets.get(_degree_bucket(latitude, longitude), ()):
+            position = self._city_lookup(city, latitude, longitude)
+            if position >= 0:
+                return position
+        return self._loose_lookup(latitude, longitude) if self._buckets else -1
+
+    def lookup(self, latitude: float, longitude: float) -> RegionSnapshot | None:
+        position = self._position(latitude, longitude)
+        return self.regions[position] if position >= 0 else None
+
+    def lookup_positions(self, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+        """Vectorized lookup: index into ``regions`` for each point, -1 where none matches.
+
+        Each city is one NumPy pass over the points still unresolved; points outside
+        every city then go through the bucket grid.
+        """
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        positions = np.full(latitudes.shape, -1, dtype=np.int64)
+        if not self.regions or not len(latitudes):
+            return positions
+        open_points = np.flatnonzero(np.isfinite(latitudes) & np.isfinite(longitudes))
+        for city in self._cities:
+            if not len(open_points):
+                break
+            lat_open, lng_open = latitudes[open_points], longitudes[open_points]
+            candidates = city.cell_positions(lat_open, lng_open)
+            found = candidates >= 0
+            safe = np.where(found, candidates, 0)
+            confirmed = found & (
+                (self.min_lat[safe] <= lat_open)
+                & (self.max_lat[safe] >= lat_open)
+                & (self.min_lng[safe] <= lng_open)
+                & (self.max_lng[safe] >= lng_open)
+            )
+            positions[open_points[confirmed]] = candidates[confirmed]
+            for i in open_points[found & ~confirmed].tolist():
+                positions[i] = self._scan(city.positions, float(latitudes[i]), float(longitudes[i]))
+            open_points = open_points[positions[open_points] < 0]
+        if self._buckets:
+            for i in open_points.tolist():
+                positions[i] = self._loose_lookup(float(latitudes[i]), float(longitudes[i]))
+        return positions
+
+    def lookup_many(self, latitudes: Sequence[float], longitudes: Sequence[float]) -> list[RegionSnapshot | None]:
+        positions = self.lookup_positions(np.asarray(latitudes, dtype=np.float64), np.asarray(longitudes, dtype=np.float64))
+        return [self.regions[position] if position >= 0 else None for position in positions.tolist()]
+
+    def locate(self, latitude: float, longitude: float, subdivisions: int = 1) -> RegionCell | None:
+        """The point's region, city and sub-cell when each block is split ``subdivisions`` ways per axis."""
+        position = self._position(latitude, longitude)
+        if position < 0:
+            return None
+        min_lat, max_lat, min_lng, max_lng = self._bounds[position]
+        divisions = max(1, subdivisions)
+        sub_row = min(int((latitude - min_lat) / (max_lat - min_lat) * divisions), divisions - 1) + 1
+        sub_col = min(int((longitude - min_lng) / (max_lng - min_lng) * divisions), divisions - 1) + 1
+        city = self._city_of_position.get(position)
+        return RegionCell(self.regions[position], city.code if city else None, sub_row, sub_col)
+
+    def neighbors(self, region: RegionSnapshot, radius: int = 1) -> list[RegionSnapshot]:
+        """Blocks of the same city within ``radius`` rows and columns, row-major; [] off-grid."""
+        city = self._city_by_code.get((parse_cell_code(region.code) or ("",))[0])
+        if city is None:
+            return []
+        found = []
+        for row in range(region.row_index - radius, region.row_index + radius + 1):
+            for col in range(region.col_index - radius, region.col_index + radius + 1):
+                if (row, col) == (region.row_index, region.col_index):
+                    continue
+                position = city.block(row, col)
+                if position >= 0:
+                    found.append(self.regions[position])
+        return found
+
+    def by_code(self, code: str) -> RegionSnapshot | None:
+        return self._by_code.get(code)
+
+
+_index: RegionIndex | None = None
+_checked_at = 0.0
+
+
+def invalidate_region_index() -> None:
+    """Drop this worker's index; the next lookup reloads it."""
+    global _index
+    _index = None
+
+
+async def get_region_index(session: AsyncSession, *, max_age_seconds: float | None = None) -> RegionIndex | None:
+    """This worker's region index, reloaded if the regions changed since it was built.
+
+    The change version is checked at most every ``max_age_seconds`` (default
+    ``REGION_INDEX_REFRESH_SECONDS``). Returns None when the index is disabled (refresh
+    interval ``0``), in which case callers query the table directly.
+    """
+    global _index, _checked_at
+    refresh_seconds = get_settings().region_index_refresh_seconds
+    if refresh_seconds <= 0:
+        return None
+    max_age = refresh_seconds if max_age_seconds is None else max_age_seconds
+    now = time.monotonic()
+    index = _index
+    if index is not None and now - _checked_at < max_age:
+        region_index_counters.hits += 1
+        return index
+
+    version = await get_change_version(session, REGION_SET_SCOPE)
+    _checked_at = now
+    if index is not None and index.version == version:
+        region_index_counters.hits += 1
+        return index
+    region_index_counters.misses += 1
+    index = _index = RegionIndex(await load_regions(), version)
+    region_index_counters.stores += 1
+    return index
@@ -2,17 +2,8 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models.region import Region
-
-DAVIS_ZIP_REGION_FALLBACK: dict[str, str] = {
-    "94102": "SF-2-2",
-    "94103": "SF-2-3",
-    "94107": "SF-3-3",
-    "94109": "SF-1-2",
-    "94110": "SF-3-2",
-    "94114": "SF-2-1",
-    "94117": "SF-2-1",
-    "94118": "SF-1-1",
-}
+from app.service.city_grid import get_zip_prefix_table
+from app.service.region_index import RegionIndex, RegionSnapshot, get_region_index, invalidate_region_index
 
 
 async def find_region_by_lat_lng(session: AsyncSession, latitude: float, longitude: float) -> Region | None:
@@ -27,10 +18,42 @@ async def find_region_by_lat_lng(session: AsyncSession, latitude: float, longitu
 
 
 async def find_region_by_zip_fallback(session: AsyncSession, zip_code: str | None) -> Region | None:
-    if not zip_code:
-        return None
-    code = DAVIS_ZIP_REGION_FALLBACK.get(zip_code.strip())
+    code = get_zip_prefix_table().lookup(zip_code)
     if not code:
         return None
     result = await session.execute(select(Region).where(Region.code == code))
     return result.scalar_one_or_none()
+
+
+async def assign_region(
+    session: AsyncSession,
+    latitude: float | None,
+    longitude: float | None,
+    zip_code: str | None,
+) -> Region | RegionSnapshot | None:
+    """Region for a business: by coordinates, then by the ZIP fallback table.
+
+    Answered from this worker's in-memory index, which hands back ``RegionSnapshot`` copies
+    rather than session-bound rows. The table is only queried when the index is disabled,
+    or to confirm a coordinate miss (a region added since the last refresh).
+    """
+    index = await get_region_index(session)
+    if index is None:
+        region = None
+        if latitude is not None and longitude is not None:
+            region = await find_region_by_lat_lng(session, latitude, longitude)
+        return region or await find_region_by_zip_fallback(session, zip_code)
+
+    region = None
+    if latitude is not None and longitude is not None:
+        region = index.lookup(latitude, longitude)
+        if region is None:
+            region = await find_region_by_lat_lng(session, latitude, longitude)
+            if region is not None:
+                invalidate_region_index()
+    return region or zip_fallback_region(index, zip_code)
+
+
+def zip_fallback_region(index: RegionIndex, zip_code: str | None) -> RegionSnapshot | None:
+    code = get_zip_prefix_table().lookup(zip_code)
+    return index.by_code(code) if code else None
@@ -0,0 +1,437 @@
+"""Offline driving routes over a road graph extracted from OpenStreetMap.
+
+The graph is a directed CSR adjacency: node ``i``'s outgoing edges are
+``indices[indptr[i]:indptr[i + 1]]`` with parallel ``edge_meters`` / ``edge_seconds``.
+Coordinates and weights are float32, so a city extract of a few hundred thousand edges is
+a few MB on disk. Build the file once with ``python -m app.db.build_road_graph``.
+
+Point-to-point queries use bidirectional A* on travel time. Both searches use the averaged
+potential ``(h_target(v) - h_source(v)) / 2``, where ``h`` is straight-line distance over the
+fastest edge speed in the graph, so the search can stop as soon as the two frontier keys
+sum to the best meeting cost.
+
+Stop-to-stop matrices use the contraction hierarchy built alongside the graph (see
+``app.service.contraction_hierarchy``). A graph file saved without one falls back to one
+Dijkstra per source that stops once every target is settled.
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import math
+from pathlib import Path
+import re
+import threading
+from typing import IO
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.service.contraction_hierarchy import ARRAY_NAMES as HIERARCHY_ARRAYS, ContractionHierarchy, contract_graph
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_METERS = 6_371_008.8
+METERS_PER_MILE = 1609.344
+# Stops farther than this from any road node are outside the extract.
+MAX_SNAP_METERS = 2000.0
+# Shrinks the A* heuristic slightly so float32 rounding cannot make it overestimate.
+HEURISTIC_SLACK = 0.999
+
+# Default free-flow speeds (km/h) for drivable OSM highway classes without a usable maxspeed.
+HIGHWAY_SPEEDS_KPH = {
+    "motorway": 100.0,
+    "motorway_link": 60.0,
+    "trunk": 80.0,
+    "trunk_link": 50.0,
+    "primary": 60.0,
+    "primary_link": 45.0,
+    "secondary": 50.0,
+    "secondary_link": 40.0,
+    "tertiary": 40.0,
+    "tertiary_link": 35.0,
+    "unclassified": 30.0,
+    "residential": 30.0,
+    "living_street": 10.0,
+    "service": 15.0,
+}
+ONEWAY_BY_DEFAULT = {"motorway", "motorway_link", "trunk_link"}
+_MAXSPEED_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(mph)?\s*$", re.IGNORECASE)
+
+RoadRoute = tuple[list[list[float]], float, float]
+
+
+def haversine_meters(lat1, lng1, lat2, lng2):
+    """Great-circle distance in meters; accepts scalars or NumPy arrays (degrees)."""
+    lat1, lng1, lat2, lng2 = (np.radians(np.asarray(value, dtype=np.float64)) for value in (lat1, lng1, lat2, lng2))
+    a = np.sin((lat2 - lat1) / 2.0) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2.0) ** 2
+    return 2.0 * EARTH_RADIUS_METERS * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class _Frontier:
+    """One direction of the bidirectional search; ``sign`` applies the shared potential."""
+
+    __slots__ = ("indptr", "indices", "edge_meters", "edge_seconds", "heap", "seconds", "meters", "parent", "settled", "sign")
+
+    def __init__(self, indptr, indices, edge_meters, edge_seconds, start: int, start_key: float, sign: float) -> None:
+        self.indptr = indptr
+        self.indices = indices
+        self.edge_meters = edge_meters
+        self.edge_seconds = edge_seconds
+        self.heap = [(start_key, start)]
+        self.seconds = {start: 0.0}
+        self.meters = {start: 0.0}
+        self.parent = {start: -1}
+        self.settled: set[int] = set()
+        self.sign = sign
+
+
+class RoadGraph:
+    """Directed road graph in CSR form with shortest-path and matrix queries."""
+
+    def __init__(
+        self,
+        node_lat: np.ndarray,
+        node_lng: np.ndarray,
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        edge_meters: np.ndarray,
+        edge_seconds: np.ndarray,
+        hierarchy: ContractionHierarchy | None = None,
+    ) -> None:
+        self.node_lat = np.asarray(node_lat, dtype=np.float32)
+        self.node_lng = np.asarray(node_lng, dtype=np.float32)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.edge_meters = np.asarray(edge_meters, dtype=np.float32)
+        self.edge_seconds = np.asarray(edge_seconds, dtype=np.float32)
+        node_count = len(self.node_lat)
+        if len(self.indptr) != node_count + 1 or self.indptr[-1] != len(self.indices):
+            raise ValueError("Road graph arrays are inconsistent")
+
+        # Reverse adjacency for the backward search: edges grouped by their head node.
+        sources = np.repeat(np.arange(node_count, dtype=np.int32), np.diff(self.indptr))
+        order = np.argsort(self.indices, kind="stable")
+        self.rev_indptr = np.concatenate(([0], np.cumsum(np.bincount(self.indices, minlength=node_count))))
+        self.rev_indices = sources[order]
+        self.rev_edge_meters = self.edge_meters[order]
+        self.rev_edge_seconds = self.edge_seconds[order]
+
+        speeds = self.edge_meters / np.maximum(self.edge_seconds, 1e-6)
+        self.max_speed_mps = float(speeds.max()) if len(speeds) else 1.0
+        self._search_lists: tuple[list, ...] | None = None
+        if hierarchy is not None and len(hierarchy.rank) != node_count:
+            raise ValueError("Contraction hierarchy does not match the road graph")
+        self.hierarchy = hierarchy
+
+    @property
+    def node_count(self) -> int:
+        return len(self.node_lat)
+
+    def _lists(self) -> tuple[list, ...]:
+        # Searches touch one element at a time, where Python lists are far faster than
+        # NumPy scalar indexing; build them once on first use.
+        if self._search_lists is None:
+            self._search_lists = tuple(
+                array.tolist()
+                for array in (
+                    self.node_lat,
+                    self.node_lng,
+                    self.indptr,
+                    self.indices,
+                    self.edge_meters,
+                    self.edge_seconds,
+                    self.rev_indptr,
+                    self.rev_indices,
+                    self.rev_edge_meters,
+                    self.rev_edge_seconds,
+                )
+            )
+        return self._search_lists
+
+    def nearest_nodes(self, points: list[tuple[float, float]]) -> list[int] | None:
+        """Closest graph node for each (lat, lng), or None if any point is off the map."""
+        nodes: list[int] = []
+        for lat, lng in points:
+            distances = haversine_meters(lat, lng, self.node_lat, self.node_lng)
+            node = int(np.argmin(distances))
+            if distances[node] > MAX_SNAP_METERS:
+                return None
+            nodes.append(node)
+        return nodes
+
+    def shortest_path(self, source: int, target: int) -> tuple[list[int], float, float] | None:
+        """Fastest path between two nodes as (nodes, meters, seconds); None if unreachable."""
+        if source == target:
+            return [source], 0.0, 0.0
+        lat, lng, indptr, indices, meters, seconds, rev_indptr, rev_indices, rev_meters, rev_seconds = self._lists()
+        inverse_speed = HEURISTIC_SLACK / self.max_speed_mps
+        cos_cache: dict[int, float] = {}
+
+        def straight_seconds(a: int, b: int) -> float:
+            cos_a = cos_cache.get(a)
+            if cos_a is None:
+                cos_a = cos_cache[a] = math.cos(math.radians(lat[a]))
+            cos_b = cos_cache.get(b)
+            if cos_b is None:
+                cos_b = cos_cache[b] = math.cos(math.radians(lat[b]))
+            h = math.sin(math.radians(lat[b] - lat[a]) / 2.0) ** 2 + cos_a * cos_b * math.sin(
+                math.radians(lng[b] - lng[a]) / 2.0
+            ) ** 2
+            return 2.0 * EARTH_RADIUS_METERS * math.asin(math.sqrt(min(1.0, h))) * inverse_speed
+
+        potentials: dict[int, float] = {}
+
+        def potential(node: int) -> float:
+            value = potentials.get(node)
+            if value is None:
+                value = potentials[node] = 0.5 * (straight_seconds(node, target) - straight_seconds(node, source))
+            return value
+
+        forward = _Frontier(indptr, indices, meters, seconds, source, potential(source), 1.0)
+        backward = _Frontier(rev_indptr, rev_indices, rev_meters, rev_seconds, target, -potential(target), -1.0)
+        best = math.inf
+        meeting = -1
+        while forward.heap and backward.heap:
+            if forward.heap[0][0] + backward.heap[0][0] >= best:
+                break
+            side, other = (forward, backward) if len(forward.heap) <= len(backward.heap) else (backward, forward)
+            _, node = heapq.heappop(side.heap)
+            if node in side.settled:
+                continue
+            side.settled.add(node)
+            node_seconds = side.seconds[node]
+            node_meters = side.meters[node]
+            for edge in range(side.indptr[node], side.indptr[node + 1]):
+                head = side.indices[edge]
+                candidate = node_seconds + side.edge_seconds[edge]
+                if candidate < side.seconds.get(head, math.inf):
+                    side.seconds[head] = candidate
+                    side.meters[head] = node_meters + side.edge_meters[edge]
+                    side.parent[head] = node
+                    heapq.heappush(side.heap, (candidate + side.sign * potential(head), head))
+                    through = other.seconds.get(head)
+                    if through is not None and candidate + through < best:
+                        best = candidate + through
+                        meeting = head
+
+        if meeting < 0:
+            return None
+        path: list[int] = []
+        node = meeting
+        while node != -1:
+            path.append(node)
+            node = forward.parent[node]
+        path.reverse()
+        node = backward.parent[meeting]
+        while node != -1:
+            path.append(node)
+            node = backward.parent[node]
+        return path, forward.meters[meeting] + backward.meters[meeting], best
+
+    def build_hierarchy(self) -> ContractionHierarchy:
+        """Contract the graph for fast matrices; takes a few minutes per 100k nodes."""
+        self.hierarchy = contract_graph(self.indptr, self.indices, self.edge_seconds, self.edge_meters)
+        return self.hierarchy
+
+    def travel_matrices(self, nodes: list[int]) -> tuple[np.ndarray, np.ndarray]:
+        """(meters, seconds) matrices between ``nodes`` along fastest paths; inf if unreachable."""
+        if self.hierarchy is not None:
+            return self.hierarchy.travel_matrices(nodes)
+        return self._dijkstra_matrices(nodes)
+
+    def _dijkstra_matrices(self, nodes: list[int]) -> tuple[np.ndarray, np.ndarray]:
+        _, _, indptr, indices, meters, seconds, *_ = self._lists()
+        size = len(nodes)
+        meters_matrix = np.full((size, size), np.inf)
+        seconds_matrix = np.full((size, size), np.inf)
+        positions: dict[int, list[int]] = {}
+        for position, node in enumerate(nodes):
+            positions.setdefault(node, []).append(position)
+
+        # Flat lists beat dicts here: a matrix search usually touches most of the extract.
+        # They are allocated once and only the entries a row touched are reset after it.
+        dist = [math.inf] * self.node_count
+        dist_m = [0.0] * self.node_count
+        for row, source in enumerate(nodes):
+            remaining = len(positions)
+            touched = [source]
+            dist[source] = dist_m[source] = 0.0
+            heap = [(0.0, source)]
+            while heap and remaining:
+                node_seconds, node = heapq.heappop(heap)
+                if node_seconds > dist[node]:
+                    continue
+                columns = positions.get(node)
+                if columns is not None:
+                    remaining -= 1
+                    for column in columns:
+                        meters_matrix[row, column] = dist_m[node]
+                        seconds_matrix[row, column] = node_seconds
+                node_meters = dist_m[node]
+                for edge in range(indptr[node], indptr[node + 1]):
+                    head = indices[edge]
+                    candidate = node_seconds + seconds[edge]
+                    if candidate < dist[head]:
+                        if dist[head] == math.inf:
+                            touched.append(head)
+                        dist[head] = candidate
+                        dist_m[head] = node_meters + meters[edge]
+                        heapq.heappush(heap, (candidate, head))
+            for node in touched:
+                dist[node] = math.inf
+        return meters_matrix, seconds_matrix
+
+    def route_through(self, points: list[tuple[float, float]]) -> RoadRoute | None:
+        """Drive (lat, lng) points in the given order: ([lng, lat] geometry, miles, minutes)."""
+        nodes = self.nearest_nodes(points)
+        if nodes is None:
+            return None
+        path: list[int] = []
+        total_meters = 0.0
+        total_seconds = 0.0
+        for source, target in zip(nodes, nodes[1:]):
+            leg = self.shortest_path(source, target)
+            if leg is None:
+                return None
+            leg_nodes, leg_meters, leg_seconds = leg
+            path.extend(leg_nodes[1:] if path else leg_nodes)
+            total_meters += leg_meters
+            total_seconds += leg_seconds
+        if not path:
+            path = nodes[:1]
+        lat, lng = self._lists()[:2]
+        geometry = [[lng[node], lat[node]] for node in path]
+        return geometry, total_meters / METERS_PER_MILE, total_seconds / 60.0
+
+    def save(self, path: str | Path) -> None:
+        hierarchy = {}
+        if self.hierarchy is not None:
+            hierarchy = {f"ch_{name}": array for name, array in self.hierarchy.arrays().items()}
+        np.savez_compressed(
+            path,
+            node_lat=self.node_lat,
+            node_lng=self.node_lng,
+            indptr=self.indptr,
+            indices=self.indices,
+            edge_meters=self.edge_meters,
+            edge_seconds=self.edge_seconds,
+            **hierarchy,
+        )
+
+
+def load_road_graph(path: str | Path) -> RoadGraph:
+    with np.load(path) as data:
+        hierarchy = None
+        if "ch_rank" in data.files:
+            hierarchy = ContractionHierarchy(*(data[f"ch_{name}"] for name in HIERARCHY_ARRAYS))
+        return RoadGraph(
+            data["node_lat"],
+            data["node_lng"],
+            data["indptr"],
+            data["indices"],
+            data["edge_meters"],
+            data["edge_seconds"],
+            hierarchy,
+        )
+
+
+def _speed_mps(tags: dict[str, str]) -> float:
+    match = _MAXSPEED_RE.match(tags.get("maxspeed", ""))
+    if match:
+        value = float(match.group(1))
+        kph = value * 1.609344 if match.group(2) else value
+    else:
+        kph = HIGHWAY_SPEEDS_KPH[tags["highway"]]
+    return max(kph, 5.0) / 3.6
+
+
+def build_road_graph_from_osm(source: str | Path | IO[bytes], *, contract: bool = True) -> RoadGraph:
+    """Build a drivable graph from an OSM XML extract (``.osm``; convert PBF with osmium first).
+
+    ``contract`` also builds the contraction hierarchy used for travel matrices.
+    """
+    coordinates: dict[int, tuple[float, float]] = {}
+    ways: list[tuple[list[int], dict[str, str]]] = []
+    for _, element in ET.iterparse(source, events=("end",)):
+        if element.tag == "node":
+            coordinates[int(element.get("id"))] = (float(element.get("lat")), float(element.get("lon")))
+            element.clear()
+        elif element.tag == "way":
+            tags = {tag.get("k"): tag.get("v") for tag in element.iter("tag")}
+            if tags.get("highway") in HIGHWAY_SPEEDS_KPH and tags.get("access") not in {"no", "private"}:
+                ways.append(([int(nd.get("ref")) for nd in element.iter("nd")], tags))
+            element.clear()
+
+    node_index: dict[int, int] = {}
+    tails: list[int] = []
+    heads: list[int] = []
+    speeds: list[float] = []
+    for refs, tags in ways:
+        refs = [ref for ref in refs if ref in coordinates]
+        oneway = tags.get("oneway", "")
+        forward = oneway != "-1"
+        backward = oneway == "-1" or not (
+            oneway in {"yes", "true", "1"}
+            or tags.get("junction") == "roundabout"
+            or (tags["highway"] in ONEWAY_BY_DEFAULT and oneway != "no")
+        )
+        speed = _speed_mps(tags)
+        for a, b in zip(refs, refs[1:]):
+            a_index = node_index.setdefault(a, len(node_index))
+            b_index = node_index.setdefault(b, len(node_index))
+            if forward:
+                tails.append(a_index)
+                heads.append(b_index)
+                speeds.append(speed)
+            if backward:
+                tails.append(b_index)
+                heads.append(a_index)
+                speeds.append(speed)
+
+    node_lat = np.empty(len(node_index), dtype=np.float64)
+    node_lng = np.empty(len(node_index), dtype=np.float64)
+    for osm_id, index in node_index.items():
+        node_lat[index], node_lng[index] = coordinates[osm_id]
+    tail_array = np.asarray(tails, dtype=np.int64)
+    head_array = np.asarray(heads, dtype=np.int32)
+    # Lengths come from the stored float32 coordinates so the A* heuristic stays admissible.
+    lat32 = node_lat.astype(np.float32)
+    lng32 = node_lng.astype(np.float32)
+    edge_meters = haversine_meters(lat32[tail_array], lng32[tail_array], lat32[head_array], lng32[head_array])
+    edge_seconds = edge_meters / np.asarray(speeds, dtype=np.float64)
+
+    order = np.argsort(tail_array, kind="stable")
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(tail_array, minlength=len(node_index)))))
+    graph = RoadGraph(lat32, lng32, indptr, head_array[order], edge_meters[order], edge_seconds[order])
+    if contract:
+        graph.build_hierarchy()
+    return graph
+
+
+_graph_lock = threading.Lock()
+_loaded: dict[str, RoadGraph | None] = {}
+
+
+def get_road_graph() -> RoadGraph | None:
+    """The graph at ``ROAD_GRAPH_PATH``, loaded once per process; None if unset or unreadable."""
+    path = get_settings().road_graph_path
+    if not path:
+        return None
+    with _graph_lock:
+        if path not in _loaded:
+            try:
+                _loaded[path] = load_road_graph(path)
+            except (OSError, KeyError, ValueError) as exc:
+                logger.warning("Road graph %s could not be loaded: %s", path, exc)
+                _loaded[path] = None
+            else:
+                if _loaded[path].hierarchy is None:
+                    logger.warning(
+                        "Road graph %s has no contraction hierarchy; travel matrices will be slow. "
+                        "Rebuild it with python -m app.db.build_road_graph",
+                        path,
+                    )
+        return _loaded[path]
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+import hashlib
+import json
+
+from sqlalchemy import func, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache_metrics import cache_counters
+from app.core.config import get_settings
+from app.db.models.route_cache_entry import RouteCacheEntry
+
+route_cache_counters = cache_counters("route_cache")
+
+
+def route_cache_key(origin: tuple[float, float], destinations: list[tuple[float, float]]) -> str:
+    """Canonical key for a stop set: rounded origin plus the sorted, rounded destinations.
+
+    Rounding (``ROUTE_CACHE_COORDINATE_DECIMALS``, 4 is about 10 m) lets re-geocoded or
+    slightly moved stops reuse a route; sorting makes the key independent of join order.
+    """
+    decimals = get_settings().route_cache_coordinate_decimals
+
+    def rounded(point: tuple[float, float]) -> list[float]:
+        return [round(float(point[0]), decimals), round(float(point[1]), decimals)]
+
+    canonical = json.dumps(
+        {"mode": "driving", "origin": rounded(origin), "stops": sorted(rounded(point) for point in destinations)},
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+async def get_cached_route(session: AsyncSession, cache_key: str) -> tuple[str, float, float] | None:
+    """Return (encoded_polyline, miles, minutes) for a live entry, counting the hit on the row."""
+    result = await session.execute(
+        update(RouteCacheEntry)
+        .where(RouteCacheEntry.cache_key == cache_key, RouteCacheEntry.expires_at > func.now())
+        .values(hit_count=RouteCacheEntry.hit_count + 1)
+        .returning(RouteCacheEntry.encoded_polyline, RouteCacheEntry.total_miles, RouteCacheEntry.total_minutes)
+        .execution_options(synchronize_session=False)
+    )
+    row = result.first()
+    if row is None:
+        route_cache_counters.misses += 1
+        return None
+    route_cache_counters.hits += 1
+    return str(row[0]), float(row[1]), float(row[2])
+
+
+async def store_cached_route(
+    session: AsyncSession,
+    cache_key: str,
+    *,
+    encoded_polyline: str,
+    total_miles: float,
+    total_minutes: float,
+    stop_count: int,
+) -> None:
+    """Insert or refresh an entry in the caller's transaction; the caller commits."""
+    expires_at = datetime.now(UTC) + timedelta(seconds=get_settings().route_cache_ttl_seconds)
+    stmt = pg_insert(RouteCacheEntry).values(
+        cache_key=cache_key,
+        encoded_polyline=encoded_polyline,
+        total_miles=total_miles,
+        total_minutes=total_minutes,
+        stop_count=stop_count,
+        hit_count=0,
+        expires_at=expires_at,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[RouteCacheEntry.cache_key],
+        set_={
+            "encoded_polyline": stmt.excluded.encoded_polyline,
+            "total_miles": stmt.excluded.total_miles,
+            "total_minutes": stmt.excluded.total_minutes,
+            "stop_count": stmt.excluded.stop_count,
+            "hit_count": 0,
+            "expires_at": stmt.excluded.expires_at,
+            "updated_at": func.now(),
+        },
+    )
+    await session.execute(stmt)
+    route_cache_counters.stores += 1
@@ -0,0 +1,134 @@
+"""Route geometry: Google encoded polylines and zoom-dependent simplification.
+
+Routes are stored as the encoded polyline Directions returns (about 2-6 bytes per point)
+and only expanded into ``[lng, lat]`` lists when a caller asks for geometry. Readers pass
+a map zoom level; points that would sit within a pixel of the simplified line at that zoom
+are dropped with Douglas-Peucker before the list is returned.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+# Web Mercator tiles are 256 px wide and span 360 degrees of longitude at zoom 0.
+TILE_SIZE_PX = 256
+MAX_ZOOM = 22
+
+
+def decode_polyline(encoded: str) -> list[list[float]]:
+    points: list[list[float]] = []
+    index = 0
+    lat = 0
+    lng = 0
+    length = len(encoded)
+    while index < length:
+        shift = 0
+        result = 0
+        while True:
+            b = ord(encoded[index]) - 63
+            index += 1
+            result |= (b & 0x1F) << shift
+            shift += 5
+            if b < 0x20:
+                break
+        dlat = ~(result >> 1) if result & 1 else (result >> 1)
+        lat += dlat
+
+        shift = 0
+        result = 0
+        while True:
+            b = ord(encoded[index]) - 63
+            index += 1
+            result |= (b & 0x1F) << shift
+            shift += 5
+            if b < 0x20:
+                break
+        dlng = ~(result >> 1) if result & 1 else (result >> 1)
+        lng += dlng
+        points.append([lng / 1e5, lat / 1e5])
+    return points
+
+
+def encode_polyline(points: list[list[float]]) -> str:
+    """Inverse of ``decode_polyline`` for [lng, lat] points at 1e-5 precision."""
+
+    def encode_value(value: int) -> str:
+        value = ~(value << 1) if value < 0 else value << 1
+        chunks: list[str] = []
+        while value >= 0x20:
+            chunks.append(chr((0x20 | (value & 0x1F)) + 63))
+            value >>= 5
+        chunks.append(chr(value + 63))
+        return "".join(chunks)
+
+    encoded: list[str] = []
+    prev_lat = 0
+    prev_lng = 0
+    for lng, lat in points:
+        lat_e5 = int(round(lat * 1e5))
+        lng_e5 = int(round(lng * 1e5))
+        encoded.append(encode_value(lat_e5 - prev_lat))
+        encoded.append(encode_value(lng_e5 - prev_lng))
+        prev_lat, prev_lng = lat_e5, lng_e5
+    return "".join(encoded)
+
+
+def tolerance_for_zoom(zoom: int) -> float:
+    """Degrees covered by one screen pixel at ``zoom`` (the simplification tolerance)."""
+    zoom = min(max(int(zoom), 0), MAX_ZOOM)
+    return 360.0 / (TILE_SIZE_PX * (2**zoom))
+
+
+def simplify_points(points: list[list[float]], tolerance: float) -> list[list[float]]:
+    """Douglas-Peucker simplification of a [lng, lat] line; endpoints are always kept.
+
+    Uses an explicit stack (long routes would exhaust recursion) and evaluates each
+    segment's perpendicular distances in one vectorized pass.
+    """
+    if tolerance <= 0 or len(points) <= 2:
+        return [list(point) for point in points]
+
+    coords = np.asarray(points, dtype=np.float64)
+    keep = np.zeros(len(coords), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(coords) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        segment = coords[end] - coords[start]
+        offsets = coords[start + 1 : end] - coords[start]
+        segment_length = float(np.hypot(segment[0], segment[1]))
+        if segment_length == 0.0:
+            distances = np.hypot(offsets[:, 0], offsets[:, 1])
+        else:
+            distances = np.abs(segment[0] * offsets[:, 1] - segment[1] * offsets[:, 0]) / segment_length
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            split = start + 1 + farthest
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return coords[keep].tolist()
+
+
+def route_points_for_read(
+    encoded_polyline: str | None,
+    legacy_points: list[list[float]] | None = None,
+    *,
+    zoom: int | None = None,
+) -> list[list[float]] | None:
+    """Expand stored route geometry for a response, simplified for ``zoom`` when given.
+
+    Orders planned before geometry moved to ``delivery_routes.route_polyline`` still carry
+    their points inline; those are passed as ``legacy_points``.
+    """
+    if encoded_polyline:
+        points = decode_polyline(encoded_polyline)
+    elif legacy_points:
+        points = legacy_points
+    else:
+        return None
+    if zoom is None:
+        return points
+    return simplify_points(points, tolerance_for_zoom(zoom))
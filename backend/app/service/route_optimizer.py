@@ -0,0 +1,145 @@
+"""Offline stop ordering: vectorized haversine distances plus 2-opt / Or-opt local search.
+
+Tours are open paths that start at the origin (index 0 of the matrix) and end at the last
+stop, matching how a supplier's delivery route is costed: there is no return leg.
+"""
+
+from __future__ import annotations
+
+import time
+
+import numpy as np
+
+EARTH_RADIUS_MILES = 3958.8
+OR_OPT_MAX_SEGMENT = 3
+# Ignore "improvements" smaller than this (miles) so float noise cannot cause endless swaps.
+IMPROVEMENT_EPSILON = 1e-9
+
+
+def haversine_matrix(points: np.ndarray) -> np.ndarray:
+    """Pairwise great-circle distances in miles for an (n, 2) array of [lat, lng] degrees."""
+    radians = np.radians(np.asarray(points, dtype=np.float64))
+    lat = radians[:, 0][:, None]
+    lng = radians[:, 1][:, None]
+    dlat = lat.T - lat
+    dlng = lng.T - lng
+    a = np.sin(dlat / 2.0) ** 2 + np.cos(lat) * np.cos(lat.T) * np.sin(dlng / 2.0) ** 2
+    return 2.0 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def tour_length(tour: list[int] | np.ndarray, matrix: np.ndarray) -> float:
+    tour = np.asarray(tour)
+    if len(tour) < 2:
+        return 0.0
+    return float(matrix[tour[:-1], tour[1:]].sum())
+
+
+def nearest_neighbor_tour(matrix: np.ndarray, start: int = 0) -> list[int]:
+    n = matrix.shape[0]
+    visited = np.zeros(n, dtype=bool)
+    visited[start] = True
+    tour = [start]
+    current = start
+    for _ in range(n - 1):
+        distances = np.where(visited, np.inf, matrix[current])
+        current = int(np.argmin(distances))
+        visited[current] = True
+        tour.append(current)
+    return tour
+
+
+def two_opt(tour: list[int], matrix: np.ndarray, deadline: float) -> list[int]:
+    """Reverse segments while that shortens the path; the first node stays fixed.
+
+    Road matrices are not symmetric (one-way streets), so reversing a segment also changes
+    the cost of the edges inside it; that difference is part of each move's delta.
+    """
+    path = np.asarray(tour)
+    n = len(path)
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        for i in range(1, n - 1):
+            a, b = path[i - 1], path[i]
+            c = path[i + 1 :]
+            # Successor of each candidate segment end; the final stop has none (open path).
+            d = np.append(path[i + 2 :], -1)
+            tail_old = np.where(d >= 0, matrix[c, np.maximum(d, 0)], 0.0)
+            tail_new = np.where(d >= 0, matrix[b, np.maximum(d, 0)], 0.0)
+            # Change in the segment's own edges when it is driven backwards, for each end.
+            inner = np.cumsum(matrix[path[i + 1 :], path[i:-1]] - matrix[path[i:-1], path[i + 1 :]])
+            delta = matrix[a, c] + tail_new - matrix[a, b] - tail_old + inner
+            best = int(np.argmin(delta))
+            if delta[best] < -IMPROVEMENT_EPSILON:
+                j = i + 1 + best
+                path[i : j + 1] = path[i : j + 1][::-1].copy()
+                improved = True
+            if time.perf_counter() >= deadline:
+                break
+    return path.tolist()
+
+
+def or_opt(tour: list[int], matrix: np.ndarray, deadline: float) -> list[int]:
+    """Move runs of 1-3 consecutive stops to a cheaper spot in the path."""
+    path = list(tour)
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        for length in range(1, OR_OPT_MAX_SEGMENT + 1):
+            i = 1
+            while i + length <= len(path):
+                segment = path[i : i + length]
+                prev_node = path[i - 1]
+                next_node = path[i + length] if i + length < len(path) else None
+                removal_gain = matrix[prev_node, segment[0]] + (
+                    matrix[segment[-1], next_node] - matrix[prev_node, next_node] if next_node is not None else 0.0
+                )
+                rest = np.asarray(path[:i] + path[i + length :])
+                after = np.append(rest[1:], -1)
+                has_after = after >= 0
+                insert_cost = (
+                    matrix[rest, segment[0]]
+                    + np.where(has_after, matrix[segment[-1], np.maximum(after, 0)], 0.0)
+                    - np.where(has_after, matrix[rest, np.maximum(after, 0)], 0.0)
+                )
+                # Re-inserting where it came from is a no-op.
+                insert_cost[i - 1] = np.inf
+                best = int(np.argmin(insert_cost))
+                if insert_cost[best] - removal_gain < -IMPROVEMENT_EPSILON:
+                    rest_list = rest.tolist()
+                    path = rest_list[: best + 1] + segment + rest_list[best + 1 :]
+                    improved = True
+                else:
+                    i += 1
+                if time.perf_counter() >= deadline:
+                    return path
+    return path
+
+
+def optimize_stop_order(
+    origin: tuple[float, float],
+    stops: list[tuple[float, float]],
+    *,
+    time_budget_seconds: float,
+    matrix: np.ndarray | None = None,
+) -> tuple[list[int], float]:
+    """Order ``stops`` for a path from ``origin``; returns (stop indexes in visit order, miles).
+
+    Starts from nearest neighbour, then alternates 2-opt and Or-opt until neither helps or
+    the time budget runs out, so the result is always at least as short as nearest neighbour.
+    ``matrix`` overrides the haversine distances (e.g. road miles); row/column 0 is the origin.
+    """
+    if not stops:
+        return [], 0.0
+    deadline = time.perf_counter() + max(0.0, time_budget_seconds)
+    if matrix is None:
+        matrix = haversine_matrix(np.array([origin, *stops], dtype=np.float64))
+    tour = nearest_neighbor_tour(matrix)
+    best_length = tour_length(tour, matrix)
+    while time.perf_counter() < deadline:
+        candidate = or_opt(two_opt(tour, matrix, deadline), matrix, deadline)
+        candidate_length = tour_length(candidate, matrix)
+        if candidate_length >= best_length - IMPROVEMENT_EPSILON:
+            break
+        tour, best_length = candidate, candidate_length
+    return [node - 1 for node in tour[1:]], best_length
@@ -1,49 +1,115 @@
 from datetime import UTC, datetime
+import logging
 
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
 
 from app.db.models.buying_group import BuyingGroup
+from app.db.models.delivery_route import DeliveryRoute
 from app.db.models.product import Product
 from app.db.models.supplier_confirmed_order import SupplierConfirmedOrder
 from app.db.models.supplier_product import SupplierProduct
+from app.db.session import SessionLocal
+from app.service.change_version_service import bump_change_versions
+from app.service.delivery_planning_service import plan_supplier_delivery_day
+from app.service.group_cache import group_listing_cache
+from app.service.route_geometry import route_points_for_read
 
+logger = logging.getLogger(__name__)
 
-async def reconcile_completed_orders(
-    session: AsyncSession,
-    rows: list[tuple[SupplierConfirmedOrder, BuyingGroup | None, Product | None, SupplierProduct | None]],
-) -> None:
-    now_utc = datetime.now(UTC)
-    changed = False
-    for order, group, _, _ in rows:
-        if order.status == "confirmed" and order.estimated_end_at is not None and order.estimated_end_at <= now_utc:
-            order.status = "completed"
-            changed = True
-            if group is not None and group.status == "confirmed":
-                group.status = "completed"
-                changed = True
-    if changed:
-        await session.commit()
+
+async def complete_due_orders(session: AsyncSession, now_utc: datetime | None = None) -> list[str]:
+    """Mark confirmed orders whose delivery window has ended as completed, with their groups.
+
+    Returns the ids of the groups that were touched.
+    """
+    now_utc = now_utc or datetime.now(UTC)
+    result = await session.execute(
+        update(SupplierConfirmedOrder)
+        .where(
+            SupplierConfirmedOrder.status == "confirmed",
+            SupplierConfirmedOrder.estimated_end_at.is_not(None),
+            SupplierConfirmedOrder.estimated_end_at <= now_utc,
+        )
+        .values(status="completed")
+        .returning(SupplierConfirmedOrder.group_id)
+    )
+    group_ids = sorted({str(group_id) for (group_id,) in result.all()})
+    if not group_ids:
+        await session.rollback()
+        return []
+
+    region_result = await session.execute(
+        update(BuyingGroup)
+        .where(BuyingGroup.id.in_(group_ids), BuyingGroup.status == "confirmed")
+        .values(status="completed")
+        .returning(BuyingGroup.region_id)
+    )
+    region_ids = {int(region_id) for (region_id,) in region_result.all() if region_id is not None}
+    await bump_change_versions(session, region_ids=region_ids, group_ids=group_ids)
+    await session.commit()
+    group_listing_cache.invalidate_regions(region_ids)
+    return group_ids
+
+
+async def run_order_lifecycle_tick() -> None:
+    async with SessionLocal() as session:
+        completed_group_ids = await complete_due_orders(session)
+    if completed_group_ids:
+        logger.info("Completed %s delivered group order(s)", len(completed_group_ids))
+
+
+async def plan_order_route(session: AsyncSession, order_id: str) -> bool:
+    """Plan delivery for a newly confirmed order (background job).
+
+    The order is routed together with the supplier's other confirmed orders for the same
+    start slot, so every confirmation re-plans that slot's shared truck trips.
+    """
+    order = await session.get(SupplierConfirmedOrder, order_id)
+    if order is None or order.status != "confirmed" or order.scheduled_start_at is None:
+        return False
+    trip_count = await plan_supplier_delivery_day(
+        session,
+        supplier_business_id=order.supplier_business_id,
+        scheduled_start_at=order.scheduled_start_at,
+    )
+    return trip_count > 0
 
 
 async def list_supplier_confirmed_orders(
-    session: AsyncSession, supplier_business_id: str | None = None
+    session: AsyncSession,
+    supplier_business_id: str | None = None,
+    *,
+    include_route: bool = False,
+    route_zoom: int | None = None,
 ) -> list[dict[str, object]]:
+    """Supplier-facing order list; route geometry is only loaded with ``include_route``."""
+    columns = [SupplierConfirmedOrder, BuyingGroup, Product, SupplierProduct]
+    if include_route:
+        columns.append(DeliveryRoute.route_polyline)
     stmt = (
-        select(SupplierConfirmedOrder, BuyingGroup, Product, SupplierProduct)
+        select(*columns)
         .outerjoin(BuyingGroup, BuyingGroup.id == SupplierConfirmedOrder.group_id)
         .outerjoin(Product, Product.id == BuyingGroup.product_id)
         .outerjoin(SupplierProduct, SupplierProduct.id == SupplierConfirmedOrder.supplier_product_id)
         .order_by(SupplierConfirmedOrder.created_at.desc())
     )
+    if include_route:
+        stmt = stmt.outerjoin(DeliveryRoute, DeliveryRoute.id == SupplierConfirmedOrder.delivery_route_id)
+    else:
+        # The legacy inline points can be large; leave them unloaded when they won't be returned.
+        stmt = stmt.options(defer(SupplierConfirmedOrder.route_points))
     if supplier_business_id:
         stmt = stmt.where(SupplierConfirmedOrder.supplier_business_id == supplier_business_id)
     result = await session.execute(stmt)
     rows = result.all()
-    await reconcile_completed_orders(session, rows)
 
     payload: list[dict[str, object]] = []
-    for order, group, product, supplier_product in rows:
+    for order, group, product, supplier_product, *route_columns in rows:
+        route_points = None
+        if include_route:
+            route_points = route_points_for_read(route_columns[0], order.route_points, zoom=route_zoom)
         product_name = None
         if supplier_product is not None:
             product_name = supplier_product.name
@@ -66,7 +132,8 @@ async def list_supplier_confirmed_orders(
                 "estimated_end_at": order.estimated_end_at,
                 "route_total_miles": order.route_total_miles,
                 "route_total_minutes": order.route_total_minutes,
-                "route_points": order.route_points,
+                "route_points": route_points,
+                "delivery_route_id": order.delivery_route_id,
                 "group_display_name": group_display_name,
                 "product_name": product_name,
                 "created_at": order.created_at,
@@ -7,8 +7,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models.business import Business
 from app.db.models.buying_group import BuyingGroup
-from app.db.models.group_commitment import GroupCommitment
+from app.db.models.group_rollup import GroupRollup
 from app.db.models.supplier_product import SupplierProduct
+from app.service.change_version_service import bump_change_versions
+from app.service.group_cache import group_listing_cache
+from app.service.group_capacity_service import get_supplier_product_region_ids, reconcile_capacity_statuses
 
 
 async def create_supplier_product(
@@ -53,6 +56,35 @@ async def create_supplier_product(
     return item
 
 
+async def update_supplier_product_inventory(
+    session: AsyncSession,
+    *,
+    supplier_product_id: str,
+    supplier_business_id: str,
+    available_units: int,
+) -> SupplierProduct:
+    item = await session.get(SupplierProduct, supplier_product_id)
+    if not item:
+        raise ValueError("Supplier product not found")
+    if item.supplier_business_id != supplier_business_id:
+        raise ValueError("Only the owning supplier can update this product")
+    if available_units < 0:
+        raise ValueError("available_units must be 0 or greater")
+
+    item.available_units = available_units
+    item.status = "active" if available_units > 0 else "sold_out"
+    item.updated_at = datetime.now(UTC)
+    await session.flush()
+    # Restocks reopen capacity_reached groups; shrinking stock can fill active ones.
+    await reconcile_capacity_statuses(session, item.id)
+    region_ids = await get_supplier_product_region_ids(session, item.id)
+    await bump_change_versions(session, region_ids=region_ids, supplier_product_ids=[item.id])
+    await session.commit()
+    await session.refresh(item)
+    group_listing_cache.invalidate_regions(region_ids)
+    return item
+
+
 async def list_supplier_products(session: AsyncSession, supplier_business_id: str | None = None) -> list[SupplierProduct]:
     stmt = select(SupplierProduct).where(SupplierProduct.status == "active").order_by(SupplierProduct.created_at.desc())
     if supplier_business_id:
@@ -73,9 +105,9 @@ async def get_reserved_units_by_supplier_product(
     stmt = (
         select(
             BuyingGroup.supplier_product_id,
-            func.coalesce(func.sum(GroupCommitment.units), 0).label("reserved_units"),
+            func.coalesce(func.sum(GroupRollup.current_units), 0).label("reserved_units"),
         )
-        .join(GroupCommitment, GroupCommitment.group_id == BuyingGroup.id)
+        .join(GroupRollup, GroupRollup.group_id == BuyingGroup.id)
         .where(
             BuyingGroup.status.in_(["active", "capacity_reached"]),
             BuyingGroup.supplier_product_id.in_(supplier_product_ids),
@@ -0,0 +1,48 @@
+"""Shared setup for benchmarks that run against a throwaway Postgres database."""
+
+from __future__ import annotations
+
+import os
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db.base import Base
+from app.db.seed import seed_products, seed_regions
+
+SCRATCH_TABLES = (
+    "background_jobs",
+    "change_versions",
+    "geocode_cache",
+    "route_cache",
+    "group_rollups",
+    "group_commitments",
+    "supplier_confirmed_orders",
+    "delivery_routes",
+    "buying_groups",
+    "supplier_products",
+    "businesses",
+)
+
+
+def scratch_database_url() -> str:
+    database_url = os.environ.get("BENCH_DATABASE_URL")
+    if not database_url:
+        raise SystemExit("Set BENCH_DATABASE_URL to a scratch Postgres database (its tables are truncated).")
+    return database_url
+
+
+async def open_scratch_db(**engine_kwargs: object) -> tuple[AsyncEngine, async_sessionmaker[AsyncSession]]:
+    """Create the schema and seed catalog data; returns the engine and a session factory."""
+    engine = create_async_engine(scratch_database_url(), **engine_kwargs)
+    sessions = async_sessionmaker(bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with sessions() as session:
+        await seed_regions(session)
+        await seed_products(session)
+    return engine, sessions
+
+
+async def truncate_scratch_tables(session: AsyncSession) -> None:
+    await session.execute(text(f"TRUNCATE {', '.join(SCRATCH_TABLES)} CASCADE"))
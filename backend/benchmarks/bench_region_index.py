@@ -0,0 +1,82 @@
+"""Time lat/lng -> region lookups on the in-memory index.
+
+Builds the seeded San Francisco grid (or an N x N grid with ``--grid``) and compares a
+linear scan over every region's bounds (what the per-business SQL query does inside
+Postgres), scalar ``RegionIndex.lookup`` calls and one vectorized ``lookup_many`` call.
+Needs no database.
+
+Usage (from backend/):
+    python -m benchmarks.bench_region_index [--grid 4] [--points 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.service.region_index import RegionIndex
+
+
+def grid_regions(size: int) -> list[SimpleNamespace]:
+    lat_step = 0.1 / size
+    lng_step = 0.13 / size
+    return [
+        SimpleNamespace(
+            id=row * size + col + 1,
+            code=f"SF-{row + 1}-{col + 1}",
+            row_index=row + 1,
+            col_index=col + 1,
+            min_lat=37.72 + row * lat_step,
+            max_lat=37.72 + (row + 1) * lat_step,
+            min_lng=-122.48 + col * lng_step,
+            max_lng=-122.48 + (col + 1) * lng_step,
+        )
+        for row in range(size)
+        for col in range(size)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--grid", type=int, default=4)
+    parser.add_argument("--points", type=int, default=100_000)
+    args = parser.parse_args()
+
+    regions = grid_regions(args.grid)
+    index = RegionIndex(regions)
+    rng = np.random.default_rng(1)
+    latitudes = rng.uniform(37.70, 37.84, args.points)
+    longitudes = rng.uniform(-122.50, -122.33, args.points)
+    pairs = list(zip(latitudes.tolist(), longitudes.tolist()))
+
+    started = time.perf_counter()
+    scanned = [
+        next(
+            (r for r in regions if r.min_lat <= lat <= r.max_lat and r.min_lng <= lng <= r.max_lng),
+            None,
+        )
+        for lat, lng in pairs
+    ]
+    scan_ms = (time.perf_counter() - started) * 1000.0
+
+    started = time.perf_counter()
+    scalar = [index.lookup(lat, lng) for lat, lng in pairs]
+    scalar_ms = (time.perf_counter() - started) * 1000.0
+
+    started = time.perf_counter()
+    batch = index.lookup_many(latitudes, longitudes)
+    batch_ms = (time.perf_counter() - started) * 1000.0
+
+    mismatches = sum(a is not b for a, b in zip(scalar, batch))
+    print(f"{len(regions)} regions, {args.points} points (grid arithmetic: {index.is_grid})")
+    print(f"linear scan  {scan_ms:9.1f} ms  {scan_ms * 1000 / args.points:6.2f} us/point")
+    print(f"lookup       {scalar_ms:9.1f} ms  {scalar_ms * 1000 / args.points:6.2f} us/point")
+    print(f"lookup_many  {batch_ms:9.1f} ms  {batch_ms * 1000 / args.points:6.2f} us/point")
+    print(f"scan/lookup disagreements: {sum(a is not b for a, b in zip(scanned, scalar))}, scalar/batch: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
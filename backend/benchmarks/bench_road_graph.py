@@ -0,0 +1,102 @@
+"""Time offline road-graph queries on a synthetic city grid.
+
+Builds an N x N jittered street grid (default 300 x 300, about 90k nodes and 350k directed
+edges, roughly San Francisco's drivable network) and its contraction hierarchy (a few
+minutes at that size). It then reports bidirectional A* against a plain one-to-one Dijkstra,
+and stop-to-stop matrices from the hierarchy against one Dijkstra per stop. Pass ``--graph``
+to time a real file built with ``python -m app.db.build_road_graph`` instead. Exits non-zero
+if a hierarchy matrix takes longer than ``--max-matrix-ms``. Needs no database.
+
+Usage (from backend/):
+    python -m benchmarks.bench_road_graph [--grid 300] [--queries 50] [--stops 10,30] [--max-matrix-ms 500]
+        [--graph road_graph.npz]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from app.service.road_graph import RoadGraph, haversine_meters, load_road_graph
+
+
+def synthetic_grid(size: int, seed: int = 1) -> RoadGraph:
+    rng = np.random.default_rng(seed)
+    rows, columns = np.divmod(np.arange(size * size), size)
+    lat = (37.70 + rows * 0.0005 + rng.uniform(-0.0001, 0.0001, size * size)).astype(np.float32)
+    lng = (-122.51 + columns * 0.0005 + rng.uniform(-0.0001, 0.0001, size * size)).astype(np.float32)
+    node = np.arange(size * size)
+    east = node[columns < size - 1]
+    north = node[rows < size - 1]
+    tails = np.concatenate([east, east + 1, north, north + size])
+    heads = np.concatenate([east + 1, east, north + size, north])
+    meters = haversine_meters(lat[tails], lng[tails], lat[heads], lng[heads])
+    # Every tenth row/column is an arterial.
+    arterial = ((rows[tails] % 10 == 0) & (rows[heads] % 10 == 0)) | ((columns[tails] % 10 == 0) & (columns[heads] % 10 == 0))
+    seconds = meters / np.where(arterial, 15.0, 8.0)
+    order = np.argsort(tails, kind="stable")
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(tails, minlength=size * size))))
+    return RoadGraph(lat, lng, indptr, heads[order], meters[order], seconds[order])
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - started) * 1000.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--grid", type=int, default=300)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--stops", default="10,30")
+    parser.add_argument("--max-matrix-ms", type=float, default=500.0)
+    parser.add_argument("--graph", default="")
+    args = parser.parse_args()
+
+    graph, build_ms = _timed(lambda: load_road_graph(args.graph) if args.graph else synthetic_grid(args.grid))
+    graph._lists()
+    print(f"graph: {graph.node_count} nodes, {len(graph.indices)} edges, ready in {build_ms:.0f} ms")
+    if graph.hierarchy is None:
+        hierarchy, contract_ms = _timed(graph.build_hierarchy)
+        print(f"contraction hierarchy: {len(hierarchy.up_indices) + len(hierarchy.down_indices)} edges in {contract_ms / 1000:.0f} s")
+    graph.hierarchy._lists()
+
+    rng = random.Random(7)
+    pairs = [(rng.randrange(graph.node_count), rng.randrange(graph.node_count)) for _ in range(args.queries)]
+    astar_ms = []
+    dijkstra_ms = []
+    for source, target in pairs:
+        astar, elapsed = _timed(lambda: graph.shortest_path(source, target))
+        astar_ms.append(elapsed)
+        (_, seconds), elapsed = _timed(lambda: graph._dijkstra_matrices([source, target]))
+        dijkstra_ms.append(elapsed / 2.0)
+        assert astar is None or abs(astar[2] - seconds[0, 1]) < 1e-3
+    print(
+        f"point-to-point over {len(pairs)} queries: bidirectional A* median {statistics.median(astar_ms):.1f} ms, "
+        f"Dijkstra median {statistics.median(dijkstra_ms):.1f} ms"
+    )
+
+    over_budget = False
+    for stop_count in [int(value) for value in args.stops.split(",") if value]:
+        nodes = rng.sample(range(graph.node_count), stop_count + 1)
+        (_, dijkstra_seconds), dijkstra_elapsed = _timed(lambda: graph._dijkstra_matrices(nodes))
+        (_, seconds), elapsed = _timed(lambda: graph.travel_matrices(nodes))
+        assert np.allclose(seconds, dijkstra_seconds, equal_nan=True)
+        print(
+            f"{stop_count} stops + origin: hierarchy matrix in {elapsed:.0f} ms, "
+            f"Dijkstra per stop {dijkstra_elapsed:.0f} ms"
+        )
+        over_budget = over_budget or elapsed > args.max_matrix_ms
+    if over_budget:
+        print(f"FAIL: a matrix took longer than {args.max_matrix_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
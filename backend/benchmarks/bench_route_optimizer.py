@@ -0,0 +1,86 @@
+"""Compare the previous pure-Python nearest-neighbour fallback with the local route optimizer.
+
+Reports tour length and runtime at 5, 50 and 500 stops (random cafés around San Francisco).
+Needs no database.
+
+Usage (from backend/):
+    python -m benchmarks.bench_route_optimizer [--sizes 5,50,500] [--budget 0.25] [--trials 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import statistics
+import time
+
+import numpy as np
+
+from app.service.route_optimizer import haversine_matrix, nearest_neighbor_tour, optimize_stop_order, tour_length
+
+SUPPLIER = (37.7749, -122.4194)
+
+
+def _legacy_haversine_miles(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    r = 3958.8
+    lat1r, lng1r = math.radians(lat1), math.radians(lng1)
+    lat2r, lng2r = math.radians(lat2), math.radians(lng2)
+    a = math.sin((lat2r - lat1r) / 2) ** 2 + math.cos(lat1r) * math.cos(lat2r) * math.sin((lng2r - lng1r) / 2) ** 2
+    return 2 * r * math.asin(math.sqrt(a))
+
+
+def _legacy_nearest_neighbor(stops: list[tuple[float, float]]) -> float:
+    """The fallback as it was: per-step min() over scalar haversine calls; returns miles."""
+    remaining = stops[:]
+    current = SUPPLIER
+    total = 0.0
+    while remaining:
+        idx = min(
+            range(len(remaining)),
+            key=lambda i: _legacy_haversine_miles(current[0], current[1], remaining[i][0], remaining[i][1]),
+        )
+        nxt = remaining.pop(idx)
+        total += _legacy_haversine_miles(current[0], current[1], nxt[0], nxt[1])
+        current = nxt
+    return total
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - started) * 1000.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="5,50,500")
+    parser.add_argument("--budget", type=float, default=0.25, help="optimizer time budget in seconds")
+    parser.add_argument("--trials", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    print(f"{'stops':>6} {'method':<30} {'miles':>9} {'vs legacy':>10} {'ms':>9}")
+    for size in (int(value) for value in args.sizes.split(",")):
+        results: dict[str, list[tuple[float, float]]] = {"legacy nearest neighbour": [], "vectorized nearest neighbour": [], "2-opt + Or-opt": []}
+        for _ in range(args.trials):
+            stops = [(SUPPLIER[0] + rng.uniform(-0.06, 0.06), SUPPLIER[1] + rng.uniform(-0.06, 0.06)) for _ in range(size)]
+            results["legacy nearest neighbour"].append(_timed(lambda: _legacy_nearest_neighbor(stops)))
+
+            def vectorized() -> float:
+                matrix = haversine_matrix(np.array([SUPPLIER, *stops]))
+                return tour_length(nearest_neighbor_tour(matrix), matrix)
+
+            results["vectorized nearest neighbour"].append(_timed(vectorized))
+            results["2-opt + Or-opt"].append(
+                _timed(lambda: optimize_stop_order(SUPPLIER, stops, time_budget_seconds=args.budget)[1])
+            )
+        legacy_miles = statistics.mean(miles for miles, _ in results["legacy nearest neighbour"])
+        for method, samples in results.items():
+            miles = statistics.mean(m for m, _ in samples)
+            ms = statistics.median(t for _, t in samples)
+            print(f"{size:>6} {method:<30} {miles:>9.2f} {100.0 * (miles / legacy_miles - 1):>+9.1f}% {ms:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
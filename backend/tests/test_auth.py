@@ -0,0 +1,182 @@
+import time
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from cryptography.hazmat.primitives.asymmetric import ec
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+import httpx
+import jwt
+
+from app.core import auth
+from app.core.auth import get_current_user
+from app.core.config import Settings
+from app.core.token_cache import TokenCache
+
+SUPABASE_URL = "https://project.supabase.co"
+SECRET = "super-secret-jwt-token-with-at-least-32-characters"
+JWKS_URL = f"{SUPABASE_URL}/auth/v1/.well-known/jwks.json"
+
+
+def _claims(**overrides):
+    now = int(time.time())
+    claims = {
+        "sub": "user-123",
+        "email": "owner@example.com",
+        "role": "authenticated",
+        "aud": "authenticated",
+        "iss": f"{SUPABASE_URL}/auth/v1",
+        "iat": now,
+        "exp": now + 3600,
+        "app_metadata": {"provider": "email", "role": "supplier"},
+        "user_metadata": {"name": "Owner"},
+    }
+    claims.update(overrides)
+    return claims
+
+
+def _settings(**overrides):
+    values = {"supabase_url": SUPABASE_URL, "supabase_anon_key": "anon", "supabase_jwt_secret": SECRET}
+    values.update(overrides)
+    return Settings(**values)
+
+
+def _credentials(token):
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+def _jwk(private_key, kid):
+    public = jwt.algorithms.ECAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+    return {**public, "kid": kid, "alg": "ES256", "use": "sig"}
+
+
+def _response(status_code, payload, url=JWKS_URL):
+    return httpx.Response(status_code, json=payload, request=httpx.Request("GET", url))
+
+
+def _use_fresh_token_cache(test):
+    test.token_cache = TokenCache(max_entries=100, ttl_seconds=300, negative_ttl_seconds=30)
+    patcher = patch("app.core.auth.get_token_cache", return_value=test.token_cache)
+    patcher.start()
+    test.addCleanup(patcher.stop)
+
+
+class TestLocalVerification(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        jwks_cache = patch("app.core.auth._jwks_cache", new=auth._JwksCache())
+        jwks_cache.start()
+        self.addCleanup(jwks_cache.stop)
+        _use_fresh_token_cache(self)
+
+    async def _user(self, token, settings=None):
+        return await get_current_user(_credentials(token), settings or _settings())
+
+    async def test_hs256_token_is_verified_without_a_network_call(self):
+        client = AsyncMock()
+        token = jwt.encode(_claims(), SECRET, algorithm="HS256")
+
+        with patch("app.core.auth.get_http_client", return_value=client):
+            user = await self._user(token)
+
+        client.get.assert_not_called()
+        self.assertEqual((user.user_id, user.email, user.role), ("user-123", "owner@example.com", "supplier"))
+        self.assertEqual(user.claims["user_metadata"], {"name": "Owner"})
+        self.assertEqual(user.claims["aud"], "authenticated")
+
+    async def test_rejects_bad_signature_expiry_audience_issuer_and_unsigned_tokens(self):
+        tokens = [
+            jwt.encode(_claims(), "another-secret-that-is-also-32-bytes-long", algorithm="HS256"),
+            jwt.encode(_claims(exp=int(time.time()) - 120), SECRET, algorithm="HS256"),
+            jwt.encode(_claims(aud="anon-other"), SECRET, algorithm="HS256"),
+            jwt.encode(_claims(iss="https://elsewhere.supabase.co/auth/v1"), SECRET, algorithm="HS256"),
+            jwt.encode(_claims(), None, algorithm="none"),
+            "not-a-jwt",
+        ]
+        for token in tokens:
+            with self.subTest(token=token[:20]), self.assertRaises(HTTPException) as ctx:
+                await self._user(token)
+            self.assertEqual(ctx.exception.status_code, 401)
+
+    async def test_hs256_without_a_configured_secret_falls_back_to_supabase(self):
+        token = jwt.encode(_claims(), SECRET, algorithm="HS256")
+        user_url = f"{SUPABASE_URL}/auth/v1/user"
+        client = AsyncMock()
+        client.get.return_value = _response(200, {"id": "user-123", "role": "authenticated"}, user_url)
+
+        with patch("app.core.auth.get_http_client", return_value=client):
+            user = await self._user(token, _settings(supabase_jwt_secret=""))
+
+        self.assertEqual(user.user_id, "user-123")
+        self.assertEqual(client.get.await_args.args[0], user_url)
+
+    async def test_asymmetric_tokens_use_cached_jwks_and_refetch_for_a_new_key(self):
+        old_key, new_key = ec.generate_private_key(ec.SECP256R1()), ec.generate_private_key(ec.SECP256R1())
+        client = AsyncMock()
+        client.get.side_effect = [
+            _response(200, {"keys": [_jwk(old_key, "k1")]}),
+            _response(200, {"keys": [_jwk(old_key, "k1"), _jwk(new_key, "k2")]}),
+        ]
+        old_token = jwt.encode(_claims(), old_key, algorithm="ES256", headers={"kid": "k1"})
+        new_token = jwt.encode(_claims(sub="user-456"), new_key, algorithm="ES256", headers={"kid": "k2"})
+
+        with patch("app.core.auth.get_http_client", return_value=client):
+            first = await self._user(old_token)
+            second = await self._user(old_token)
+            # Within the re-fetch window an unknown kid is rejected without calling Supabase.
+            with self.assertRaises(HTTPException):
+                await self._user(new_token)
+            auth._jwks_cache.fetched_at -= 60
+            self.token_cache.clear()  # the rejection above is negatively cached
+            rotated = await self._user(new_token)
+
+        self.assertEqual((first.user_id, second.user_id, rotated.user_id), ("user-123", "user-123", "user-456"))
+        self.assertEqual(client.get.await_count, 2)
+        self.assertEqual(client.get.await_args.args[0], JWKS_URL)
+
+    async def test_stale_jwks_keeps_working_while_supabase_is_unreachable(self):
+        key = ec.generate_private_key(ec.SECP256R1())
+        client = AsyncMock()
+        client.get.side_effect = [_response(200, {"keys": [_jwk(key, "k1")]}), httpx.ConnectError("down")]
+        first = jwt.encode(_claims(), key, algorithm="ES256", headers={"kid": "k1"})
+        second = jwt.encode(_claims(sub="user-456"), key, algorithm="ES256", headers={"kid": "k1"})
+
+        with patch("app.core.auth.get_http_client", return_value=client):
+            await self._user(first)
+            auth._jwks_cache.fetched_at -= 3600
+            user = await self._user(second)
+
+        self.assertEqual(user.user_id, "user-456")
+        self.assertEqual(client.get.await_count, 2)
+
+    async def test_first_jwks_fetch_failure_is_service_unavailable(self):
+        key = ec.generate_private_key(ec.SECP256R1())
+        client = AsyncMock()
+        client.get.return_value = _response(500, {})
+        token = jwt.encode(_claims(), key, algorithm="ES256", headers={"kid": "k1"})
+
+        with patch("app.core.auth.get_http_client", return_value=client), self.assertRaises(HTTPException) as ctx:
+            await self._user(token)
+
+        self.assertEqual(ctx.exception.status_code, 503)
+
+
+class TestRemoteMode(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        _use_fresh_token_cache(self)
+
+    async def test_remote_mode_asks_supabase_and_maps_rejections_to_401(self):
+        user_url = f"{SUPABASE_URL}/auth/v1/user"
+        client = AsyncMock()
+        client.get.side_effect = [
+            _response(200, {"id": "user-789", "email": "a@example.com", "role": "authenticated"}, user_url),
+            _response(401, {"msg": "bad jwt"}, user_url),
+        ]
+
+        with patch("app.core.auth.get_http_client", return_value=client):
+            user = await get_current_user(_credentials("opaque-1"), _settings(supabase_auth_mode="remote"))
+            with self.assertRaises(HTTPException) as ctx:
+                await get_current_user(_credentials("opaque-2"), _settings(supabase_auth_mode="remote"))
+
+        self.assertEqual((user.user_id, user.role), ("user-789", "authenticated"))
+        self.assertEqual(client.get.await_args.kwargs["headers"]["apikey"], "anon")
+        self.assertEqual(ctx.exception.status_code, 401)
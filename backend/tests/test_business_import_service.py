@@ -0,0 +1,161 @@
+import io
+from types import SimpleNamespace
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from sqlalchemy.exc import IntegrityError
+
+from app.service.business_import_service import import_businesses, iter_csv_rows, iter_ndjson_rows
+from app.service.geocoding_service import GeocodingUnavailable
+from app.service.region_index import RegionIndex
+
+REGION = SimpleNamespace(
+    id=12, code="SF-2-3", row_index=2, col_index=3, min_lat=37.75, max_lat=37.78, min_lng=-122.43, max_lng=-122.40
+)
+SF_GEO = {
+    "latitude": 37.765,
+    "longitude": -122.418,
+    "locality": "San Francisco",
+    "admin_area_level_1": "CA",
+    "country": "US",
+    "postal_code": "94103",
+    "formatted_address": None,
+}
+CSV_UPLOAD = """name,business_type,address,city,state,zip,latitude,longitude
+Mission Cafe,cafe,2900 16th St,San Francisco,CA,94103,,
+Corner Deli,,1 Market St,San Francisco,CA,94105,,
+Bay Bakery,bakery,,,,,37.76,-122.41
+"""
+
+
+class _Session:
+    def __init__(self):
+        self.statements = []
+        self.commit_count = 0
+        self.rollback_count = 0
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+
+    async def commit(self):
+        self.commit_count += 1
+
+    async def rollback(self):
+        self.rollback_count += 1
+
+
+class _RejectingSession(_Session):
+    """Fails any INSERT that carries the business named ``reject``."""
+
+    def __init__(self, reject):
+        super().__init__()
+        self.reject = reject
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        if self.reject in stmt.compile().params.values():
+            raise IntegrityError(str(stmt), {}, Exception("rejected"))
+
+
+def _settings(batch_size=200):
+    return SimpleNamespace(business_import_batch_size=batch_size, geocode_cache_ttl_seconds=3600.0)
+
+
+class TestBusinessImportService(unittest.IsolatedAsyncioTestCase):
+    async def _run(self, session, rows, *, geocode, cached=None, batch_size=200):
+        with patch("app.service.business_import_service.get_settings", return_value=_settings(batch_size)), patch(
+            "app.service.business_import_service.get_region_index", new=AsyncMock(return_value=RegionIndex([REGION]))
+        ), patch(
+            "app.service.business_import_service.get_cached_geocodes", new=AsyncMock(return_value=cached or {})
+        ), patch("app.service.business_import_service.store_cached_geocodes", new=AsyncMock()) as store, patch(
+            "app.service.business_import_service.geocode_address", new=geocode
+        ):
+            results = [result async for result in import_businesses(session, rows)]
+        return results, store
+
+    async def test_csv_rows_are_validated_geocoded_and_inserted_in_one_statement(self):
+        session = _Session()
+        geocode = AsyncMock(return_value=SF_GEO)
+
+        results, store = await self._run(session, iter_csv_rows(io.StringIO(CSV_UPLOAD)), geocode=geocode)
+
+        self.assertEqual([result.get("status") for result in results[:3]], ["created", "error", "created"])
+        self.assertEqual(results[0]["region_id"], 12)
+        self.assertIn("business_type is required", results[1]["error"])
+        self.assertEqual(results[3], {"summary": {"created": 2, "failed": 1}})
+        geocode.assert_awaited_once()
+        self.assertEqual(list(store.await_args.args[1].values()), [SF_GEO])
+        (insert_stmt,) = session.statements
+        self.assertEqual(len(insert_stmt.compile().params), 2 * 14)
+        self.assertEqual(session.commit_count, 1)
+
+    async def test_shared_addresses_are_geocoded_once_and_batches_commit_separately(self):
+        session = _Session()
+        geocode = AsyncMock(return_value=SF_GEO)
+        rows = [
+            (n, {"name": f"Cafe {n}", "business_type": "cafe", "address": "2900 16th Street", "zip": "94103"}, None)
+            for n in range(1, 6)
+        ]
+
+        results, _ = await self._run(session, rows, geocode=geocode, batch_size=2)
+
+        self.assertEqual([result["row"] for result in results[:-1]], [1, 2, 3, 4, 5])
+        self.assertEqual(results[-1], {"summary": {"created": 5, "failed": 0}})
+        # One lookup per batch for the shared building, three batches of 2 / 2 / 1 rows.
+        self.assertEqual(geocode.await_count, 3)
+        self.assertEqual(session.commit_count, 3)
+
+    async def test_cached_and_unavailable_geocodes_fall_back_like_single_creates(self):
+        session = _Session()
+        geocode = AsyncMock(side_effect=GeocodingUnavailable("timeout"))
+        rows = [
+            (1, {"business_type": "cafe", "address": "2900 16th St", "city": "San Francisco", "zip": "94103"}, None),
+            (2, {"business_type": "cafe", "address": "99 Unknown Rd", "zip": "10001"}, None),
+        ]
+        cached = {"2900 16th st san francisco 94103 us": (True, SF_GEO)}
+
+        results, store = await self._run(session, rows, geocode=geocode, cached=cached)
+
+        self.assertEqual(results[0]["status"], "created")
+        self.assertEqual(results[1], {"row": 2, "status": "error", "error": "Could not assign region from address/coordinates"})
+        geocode.assert_awaited_once()
+        store.assert_not_awaited()
+
+    async def test_ndjson_reports_bad_lines_with_their_row_numbers(self):
+        upload = io.StringIO('{"business_type": "cafe", "latitude": 37.76, "longitude": -122.41}\n\nnot json\n[1, 2]\n')
+
+        rows = list(iter_ndjson_rows(upload))
+
+        self.assertEqual([(row, error) for row, _, error in rows], [(1, None), (2, "Line is not valid JSON"), (3, "Line must be a JSON object")])
+
+    async def test_oversized_fields_are_rejected_per_row_before_the_insert(self):
+        session = _Session()
+        rows = [
+            (1, {"business_type": "cafe", "state": "C" * 51, "latitude": 37.76, "longitude": -122.41}, None),
+            (2, {"business_type": "cafe", "zip": "9" * 21, "latitude": 37.76, "longitude": -122.41}, None),
+            (3, {"business_type": "cafe", "state": "CA", "latitude": 37.76, "longitude": -122.41}, None),
+        ]
+
+        results, _ = await self._run(session, rows, geocode=AsyncMock())
+
+        self.assertEqual([result.get("status") for result in results[:3]], ["error", "error", "created"])
+        self.assertTrue(results[0]["error"].startswith("state:"))
+        self.assertTrue(results[1]["error"].startswith("zip:"))
+        self.assertEqual(len(session.statements), 1)
+
+    async def test_a_failed_batch_is_retried_row_by_row_so_only_the_bad_row_fails(self):
+        session = _RejectingSession("Broken Row")
+        rows = [
+            (n, {"name": name, "business_type": "cafe", "latitude": 37.76, "longitude": -122.41}, None)
+            for n, name in enumerate(["Good One", "Broken Row", "Good Two"], start=1)
+        ]
+
+        with self.assertLogs("app.service.business_import_service", level="ERROR"):
+            results, _ = await self._run(session, rows, geocode=AsyncMock())
+
+        self.assertEqual([result.get("status") for result in results[:3]], ["created", "error", "created"])
+        self.assertEqual(results[1]["error"], "Could not save this row")
+        self.assertEqual(results[3], {"summary": {"created": 2, "failed": 1}})
+        # The batch INSERT, then one INSERT per row.
+        self.assertEqual(len(session.statements), 4)
+        self.assertEqual((session.commit_count, session.rollback_count), (2, 2))
@@ -31,9 +31,8 @@ class TestBusinessService(unittest.IsolatedAsyncioTestCase):
             "postal_code": "95814",
         }
 
-        with patch("app.service.business_service.geocode_address", return_value=geo), \
-             patch("app.service.business_service.find_region_by_lat_lng", new=AsyncMock(return_value=None)), \
-             patch("app.service.business_service.find_region_by_zip_fallback", new=AsyncMock(return_value=None)):
+        with patch("app.service.business_service.cached_geocode_address", new=AsyncMock(return_value=geo)), \
+             patch("app.service.business_service.assign_region", new=AsyncMock(return_value=None)):
             with self.assertRaises(ValueError) as ctx:
                 await create_business(
                     session,
@@ -64,9 +63,8 @@ class TestBusinessService(unittest.IsolatedAsyncioTestCase):
             "postal_code": "94103",
         }
 
-        with patch("app.service.business_service.geocode_address", return_value=geo), \
-             patch("app.service.business_service.find_region_by_lat_lng", new=AsyncMock(return_value=region)), \
-             patch("app.service.business_service.find_region_by_zip_fallback", new=AsyncMock(return_value=None)):
+        with patch("app.service.business_service.cached_geocode_address", new=AsyncMock(return_value=geo)), \
+             patch("app.service.business_service.assign_region", new=AsyncMock(return_value=region)):
             business = await create_business(
                 session,
                 name="Mission Cafe",
@@ -99,9 +97,8 @@ class TestBusinessService(unittest.IsolatedAsyncioTestCase):
             "postal_code": "SW1A",
         }
 
-        with patch("app.service.business_service.geocode_address", return_value=geo), \
-             patch("app.service.business_service.find_region_by_lat_lng", new=AsyncMock(return_value=None)), \
-             patch("app.service.business_service.find_region_by_zip_fallback", new=AsyncMock(return_value=None)):
+        with patch("app.service.business_service.cached_geocode_address", new=AsyncMock(return_value=geo)), \
+             patch("app.service.business_service.assign_region", new=AsyncMock(return_value=None)):
             with self.assertRaises(ValueError) as ctx:
                 await create_business(
                     session,
@@ -131,9 +128,8 @@ class TestBusinessService(unittest.IsolatedAsyncioTestCase):
             "postal_code": "10001",
         }
 
-        with patch("app.service.business_service.geocode_address", return_value=geo), \
-             patch("app.service.business_service.find_region_by_lat_lng", new=AsyncMock(return_value=None)), \
-             patch("app.service.business_service.find_region_by_zip_fallback", new=AsyncMock(return_value=None)):
+        with patch("app.service.business_service.cached_geocode_address", new=AsyncMock(return_value=geo)), \
+             patch("app.service.business_service.assign_region", new=AsyncMock(return_value=None)):
             supplier = await create_business(
                 session,
                 name="Supplier Co",
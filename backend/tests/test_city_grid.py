@@ -0,0 +1,99 @@
+import json
+import math
+import os
+import tempfile
+import unittest
+
+from app.service.city_grid import (
+    DEFAULT_CITY_GRIDS,
+    CityGridSpec,
+    ZipPrefixTable,
+    load_city_grids,
+    load_zip_prefix_table,
+    parse_cell_code,
+)
+
+
+def _legacy_sf_regions():
+    # The layout seed_regions generated before cities were configurable.
+    center_lat, center_lng, half_span = 37.7749, -122.4194, 3.5
+    min_lat = center_lat - half_span / 69.0
+    max_lat = center_lat + half_span / 69.0
+    lng_half = half_span / (69.172 * math.cos(math.radians(center_lat)))
+    min_lng, max_lng = center_lng - lng_half, center_lng + lng_half
+    lat_step, lng_step = (max_lat - min_lat) / 4, (max_lng - min_lng) / 4
+    return [
+        (f"SF-{row + 1}-{col + 1}", min_lat + row * lat_step, min_lat + (row + 1) * lat_step, min_lng + col * lng_step, min_lng + (col + 1) * lng_step)
+        for row in range(4)
+        for col in range(4)
+    ]
+
+
+class TestCityGrid(unittest.TestCase):
+    def _write(self, suffix, content):
+        handle = tempfile.NamedTemporaryFile("w", suffix=suffix, delete=False, encoding="utf-8")
+        handle.write(content)
+        handle.close()
+        self.addCleanup(os.unlink, handle.name)
+        return handle.name
+
+    def test_default_city_keeps_the_original_sf_codes_and_bounds(self):
+        rows = DEFAULT_CITY_GRIDS[0].region_rows()
+
+        self.assertEqual(
+            [(row["code"], row["min_lat"], row["max_lat"], row["min_lng"], row["max_lng"]) for row in rows],
+            _legacy_sf_regions(),
+        )
+        self.assertEqual(rows[5]["name"], "SF Block 2-2")
+
+    def test_cities_load_from_center_or_bounds(self):
+        path = self._write(
+            ".json",
+            json.dumps(
+                [
+                    {"code": "SF", "center_lat": 37.7749, "center_lng": -122.4194, "half_span_miles": 3.5, "block_miles": 2},
+                    {"code": "OAK", "name": "Oakland", "min_lat": 37.75, "max_lat": 37.85, "min_lng": -122.30, "max_lng": -122.15, "block_miles": 2},
+                ]
+            ),
+        )
+
+        sf, oakland = load_city_grids(path)
+
+        self.assertEqual((sf.rows, sf.cols), (4, 4))
+        # 0.1 deg of latitude is 6.9 mi and 0.15 deg of longitude about 8.2 mi here.
+        self.assertEqual((oakland.rows, oakland.cols), (4, 5))
+        self.assertEqual(oakland.region_rows()[-1]["code"], "OAK-4-5")
+        self.assertEqual(oakland.block_bounds(4, 5)[1::2], (37.85, -122.15))
+
+    def test_invalid_city_entries_are_rejected(self):
+        with self.assertRaises(ValueError):
+            CityGridSpec.from_dict({"code": "sf-north", "center_lat": 37.7, "center_lng": -122.4, "half_span_miles": 1, "block_miles": 1})
+        with self.assertRaises(ValueError):
+            CityGridSpec.from_dict({"code": "SF", "block_miles": 1})
+        duplicate = {"code": "SF", "center_lat": 37.7, "center_lng": -122.4, "half_span_miles": 1, "block_miles": 1}
+        with self.assertRaises(ValueError):
+            load_city_grids(self._write(".json", json.dumps([duplicate, duplicate])))
+
+    def test_cell_codes_parse_back_to_city_row_and_col(self):
+        self.assertEqual(parse_cell_code("OAK-12-3"), ("OAK", 12, 3))
+        self.assertIsNone(parse_cell_code("downtown"))
+
+    def test_zip_table_matches_the_longest_prefix(self):
+        table = ZipPrefixTable({"941": "SF-2-2", "94103": "SF-2-3", "9461": "OAK-1-1"})
+
+        self.assertEqual(table.lookup("94103-1234"), "SF-2-3")
+        self.assertEqual(table.lookup(" 94122 "), "SF-2-2")
+        self.assertEqual(table.lookup("94611"), "OAK-1-1")
+        self.assertIsNone(table.lookup("10001"))
+        self.assertIsNone(table.lookup("9"))
+        self.assertIsNone(table.lookup(None))
+        with self.assertRaises(ValueError):
+            ZipPrefixTable({"94": "SF-1-1"})
+
+    def test_zip_table_loads_from_csv(self):
+        path = self._write(".csv", "zip_prefix,region_code\n946,OAK-2-2\n94103,SF-2-3\n")
+
+        table = load_zip_prefix_table(path)
+
+        self.assertEqual((len(table), table.lookup("94607")), (2, "OAK-2-2"))
+        self.assertEqual(load_zip_prefix_table().lookup("94118"), "SF-1-1")
@@ -0,0 +1,201 @@
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from app.service.delivery_planning_service import plan_delivery_trips, plan_supplier_delivery_day
+from app.service.route_geometry import decode_polyline
+
+WAREHOUSE = (37.75, -122.45)
+# Two neighbourhoods: orders a/b sit together north-east, c sits far south-west.
+ORDER_STOPS = {
+    "a": [(37.80, -122.40), (37.801, -122.401)],
+    "b": [(37.802, -122.402), (37.80, -122.403)],
+    "c": [(37.70, -122.50)],
+}
+
+
+class _ExecResult:
+    def __init__(self, rows=None):
+        self._rows = rows or []
+
+    def all(self):
+        return self._rows
+
+    def scalars(self):
+        return self
+
+
+class _Session:
+    def __init__(self, gets, executes):
+        self._gets = gets
+        self._executes = executes
+        self.added = []
+        self.statements = []
+        self.commit_count = 0
+        self.rollback_count = 0
+
+    async def get(self, model, key):
+        return self._gets.get((model.__name__, key))
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        return self._executes.pop(0) if self._executes else _ExecResult()
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def flush(self):
+        return None
+
+    async def commit(self):
+        self.commit_count += 1
+
+    async def rollback(self):
+        self.rollback_count += 1
+
+    def locked_statements(self):
+        return [stmt for stmt in self.statements if getattr(stmt, "_for_update_arg", None) is not None]
+
+
+def _slot(order_ids):
+    orders = [
+        SimpleNamespace(id=order_id, group_id=f"g-{order_id}", total_units=100, delivery_route_id=None)
+        for order_id in order_ids
+    ]
+    stop_rows = [(f"g-{order_id}", lat, lng) for order_id in order_ids for lat, lng in ORDER_STOPS[order_id]]
+    return orders, stop_rows
+
+
+class TestDeliveryPlanning(unittest.IsolatedAsyncioTestCase):
+    async def test_nearby_orders_share_a_trip(self):
+        trips = plan_delivery_trips(
+            WAREHOUSE,
+            ORDER_STOPS,
+            {"a": 100, "b": 100, "c": 100},
+            truck_unit_capacity=None,
+            time_budget_seconds=1.0,
+        )
+
+        order_sets = [order_ids for order_ids, _ in trips]
+        self.assertIn(["a", "b"], order_sets)
+        self.assertEqual(sorted(order_id for order_ids in order_sets for order_id in order_ids), ["a", "b", "c"])
+
+    async def test_truck_capacity_keeps_orders_apart(self):
+        trips = plan_delivery_trips(
+            WAREHOUSE,
+            ORDER_STOPS,
+            {"a": 600, "b": 600, "c": 100},
+            truck_unit_capacity=1000,
+            time_budget_seconds=1.0,
+        )
+
+        for order_ids, _ in trips:
+            self.assertLessEqual(sum({"a": 600, "b": 600, "c": 100}[order_id] for order_id in order_ids), 1000)
+        self.assertNotIn(["a", "b"], [order_ids for order_ids, _ in trips])
+
+    async def test_batched_miles_never_exceed_separate_tours(self):
+        separate = plan_delivery_trips(WAREHOUSE, ORDER_STOPS, {"a": 1, "b": 1, "c": 1}, truck_unit_capacity=1, time_budget_seconds=1.0)
+        batched = plan_delivery_trips(WAREHOUSE, ORDER_STOPS, {"a": 1, "b": 1, "c": 1}, truck_unit_capacity=None, time_budget_seconds=1.0)
+
+        self.assertEqual(len(separate), 3)
+        self.assertLess(sum(miles for _, miles in batched), sum(miles for _, miles in separate))
+
+    async def test_plan_supplier_delivery_day_writes_shared_route_to_orders(self):
+        start = datetime(2026, 3, 2, 16, 0, tzinfo=UTC)
+        supplier = SimpleNamespace(latitude=WAREHOUSE[0], longitude=WAREHOUSE[1], truck_unit_capacity=None)
+        orders, stop_rows = _slot(("a", "b"))
+        session = _Session(
+            gets={("Business", "s1"): supplier},
+            executes=[
+                _ExecResult(orders),
+                _ExecResult(stop_rows),
+                _ExecResult(orders),
+                _ExecResult(),
+                _ExecResult([(4,)]),
+                _ExecResult(),
+            ],
+        )
+        locks_held_while_routing = []
+
+        async def compute_route(**_kwargs):
+            locks_held_while_routing.append(len(session.locked_statements()))
+            return [[-122.45, 37.75], [-122.40, 37.80]], 6.5, 42.0
+
+        route = AsyncMock(side_effect=compute_route)
+        settings = SimpleNamespace(default_truck_unit_capacity=0, delivery_planning_time_budget_seconds=1.0)
+
+        with patch("app.service.delivery_planning_service.compute_delivery_route", new=route), patch(
+            "app.service.delivery_planning_service.get_settings", return_value=settings
+        ):
+            trip_count = await plan_supplier_delivery_day(
+                session,
+                supplier_business_id="s1",
+                scheduled_start_at=start,
+                now_utc=start - timedelta(hours=12),
+            )
+
+        self.assertEqual(trip_count, 1)
+        (delivery_route,) = session.added
+        self.assertEqual((delivery_route.order_count, delivery_route.stop_count, delivery_route.total_units), (2, 4, 200))
+        self.assertGreater(delivery_route.unbatched_miles, 0)
+        self.assertEqual(decode_polyline(delivery_route.route_polyline), [[-122.45, 37.75], [-122.4, 37.8]])
+        self.assertIs(route.await_args.kwargs["session"], session)
+        for order in orders:
+            self.assertEqual(order.delivery_route_id, delivery_route.id)
+            self.assertEqual(order.route_total_miles, 6.5)
+            self.assertIsNone(order.route_points)
+            self.assertEqual(order.estimated_end_at, start + timedelta(minutes=42))
+        # Routed before any row was locked; the locked re-read matched, so one write followed.
+        self.assertEqual(locks_held_while_routing, [0])
+        self.assertEqual(len(session.locked_statements()), 1)
+        self.assertEqual(session.commit_count, 2)
+
+    async def test_plan_supplier_delivery_day_replans_when_the_slot_changes_before_the_lock(self):
+        start = datetime(2026, 3, 2, 16, 0, tzinfo=UTC)
+        supplier = SimpleNamespace(latitude=WAREHOUSE[0], longitude=WAREHOUSE[1], truck_unit_capacity=None)
+        first_orders, first_stops = _slot(("a",))
+        orders, stop_rows = _slot(("a", "b"))
+        session = _Session(
+            gets={("Business", "s1"): supplier},
+            executes=[
+                _ExecResult(first_orders),
+                _ExecResult(first_stops),
+                _ExecResult(orders),
+                _ExecResult(orders),
+                _ExecResult(stop_rows),
+                _ExecResult(orders),
+                _ExecResult(),
+                _ExecResult([(4,)]),
+                _ExecResult(),
+            ],
+        )
+        route = AsyncMock(return_value=([[-122.45, 37.75], [-122.40, 37.80]], 6.5, 42.0))
+        settings = SimpleNamespace(default_truck_unit_capacity=0, delivery_planning_time_budget_seconds=1.0)
+
+        with patch("app.service.delivery_planning_service.compute_delivery_route", new=route), patch(
+            "app.service.delivery_planning_service.get_settings", return_value=settings
+        ):
+            trip_count = await plan_supplier_delivery_day(
+                session,
+                supplier_business_id="s1",
+                scheduled_start_at=start,
+                now_utc=start - timedelta(hours=12),
+            )
+
+        self.assertEqual(trip_count, 1)
+        self.assertEqual(session.rollback_count, 1)
+        (delivery_route,) = session.added
+        self.assertEqual(delivery_route.order_count, 2)
+        self.assertEqual(route.await_count, 2)
+
+    async def test_plan_supplier_delivery_day_leaves_started_slots_alone(self):
+        start = datetime(2026, 3, 2, 16, 0, tzinfo=UTC)
+        session = _Session(gets={}, executes=[])
+
+        trip_count = await plan_supplier_delivery_day(
+            session, supplier_business_id="s1", scheduled_start_at=start, now_utc=start + timedelta(minutes=5)
+        )
+
+        self.assertEqual(trip_count, 0)
+        self.assertEqual(session.commit_count, 0)
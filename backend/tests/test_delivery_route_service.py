@@ -0,0 +1,297 @@
+import asyncio
+from types import SimpleNamespace
+import unittest
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import numpy as np
+
+from app.service.delivery_route_service import (
+    _fetch_directions_request,
+    _fetch_distance_matrix,
+    _fetch_fixed_order_directions,
+    _fetch_optimized_directions,
+    compute_delivery_route,
+)
+
+
+def _settings(**overrides):
+    values = {
+        "google_maps_api_key": "test-key",
+        "directions_request_timeout_seconds": 5.0,
+        "directions_max_concurrency": 3,
+        "directions_deadline_seconds": 5.0,
+        "route_cache_ttl_seconds": 3600.0,
+        "route_optimizer_time_budget_seconds": 0.1,
+        "routing_backend": "google",
+        "directions_mode": "matrix",
+        "directions_matrix_max_stops": 25,
+    }
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def _miles_apart(origin: str, destination: str) -> float:
+    return abs(float(origin.split(",")[0]) - float(destination.split(",")[0])) * 100
+
+
+STOPS = [(37.70 + i * 0.01, -122.40) for i in range(12)]
+
+
+class TestDeliveryRouteService(unittest.IsolatedAsyncioTestCase):
+    async def test_directions_request_parses_route_from_pooled_client(self):
+        seen = {}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen["params"] = dict(request.url.params)
+            return httpx.Response(
+                200,
+                json={
+                    "status": "OK",
+                    "routes": [
+                        {
+                            "overview_polyline": {"points": "_p~iF~ps|U_ulLnnqC"},
+                            "legs": [
+                                {"distance": {"value": 1609.344}, "duration": {"value": 600}},
+                                {"distance": {"value": 3218.688}, "duration": {"value": 300}},
+                            ],
+                        }
+                    ],
+                },
+            )
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        with patch("app.service.delivery_route_service.get_settings", return_value=_settings()), patch(
+            "app.service.delivery_route_service.get_http_client", return_value=client
+        ):
+            points, miles, minutes = await _fetch_directions_request(
+                origin_point=(37.7, -122.4),
+                destination_point=(37.8, -122.3),
+                waypoint_points=[(37.75, -122.35)],
+            )
+        await client.aclose()
+
+        self.assertEqual(points, [[-120.2, 38.5], [-120.95, 40.7]])
+        self.assertAlmostEqual(miles, 3.0)
+        self.assertAlmostEqual(minutes, 15.0)
+        self.assertEqual(seen["params"]["waypoints"], "optimize:true|37.75,-122.35")
+
+    async def test_directions_request_returns_empty_on_http_error(self):
+        client = httpx.AsyncClient(transport=httpx.MockTransport(lambda _request: httpx.Response(503)))
+        with patch("app.service.delivery_route_service.get_settings", return_value=_settings()), patch(
+            "app.service.delivery_route_service.get_http_client", return_value=client
+        ):
+            result = await _fetch_directions_request(
+                origin_point=(37.7, -122.4), destination_point=(37.8, -122.3), waypoint_points=[]
+            )
+        await client.aclose()
+
+        self.assertEqual(result, (None, None, None))
+
+    async def test_candidates_run_concurrently_under_cap(self):
+        active = 0
+        peak = 0
+        calls = []
+
+        async def fake_request(*, origin_point, destination_point, waypoint_points):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            calls.append(destination_point)
+            await asyncio.sleep(0.01)
+            active -= 1
+            # The third stop as final destination is the fastest route.
+            minutes = 10.0 if destination_point == STOPS[2] else 20.0
+            return [[destination_point[1], destination_point[0]]], 5.0, minutes
+
+        with patch("app.service.delivery_route_service.get_settings", return_value=_settings()), patch(
+            "app.service.delivery_route_service._fetch_directions_request", new=fake_request
+        ):
+            points, _, minutes = await _fetch_optimized_directions((37.6, -122.5), STOPS)
+
+        self.assertEqual(len(calls), 10)
+        self.assertEqual(peak, 3)
+        self.assertEqual(minutes, 10.0)
+        self.assertEqual(points, [[STOPS[2][1], STOPS[2][0]]])
+
+    async def test_deadline_keeps_best_finished_candidate_and_cancels_the_rest(self):
+        cancelled = 0
+
+        async def fake_request(*, origin_point, destination_point, waypoint_points):
+            nonlocal cancelled
+            slow = destination_point in STOPS[-2:]
+            try:
+                await asyncio.sleep(5.0 if slow else 0.0)
+            except asyncio.CancelledError:
+                cancelled += 1
+                raise
+            # The slow candidates would have been the better routes.
+            return [[0.0, 0.0]], 5.0, 1.0 if slow else 30.0
+
+        settings = _settings(directions_max_concurrency=10, directions_deadline_seconds=0.05)
+        with patch("app.service.delivery_route_service.get_settings", return_value=settings), patch(
+            "app.service.delivery_route_service._fetch_directions_request", new=fake_request
+        ):
+            _, _, minutes = await _fetch_optimized_directions((37.6, -122.5), STOPS)
+
+        self.assertEqual(minutes, 30.0)
+        self.assertEqual(cancelled, 2)
+
+    async def test_compute_delivery_route_falls_back_without_api_key(self):
+        with patch("app.service.delivery_route_service.get_settings", return_value=_settings(google_maps_api_key="")):
+            points, miles, minutes = await compute_delivery_route(
+                supplier_latitude=37.70,
+                supplier_longitude=-122.40,
+                destination_points=[(37.72, -122.40), (37.71, -122.40)],
+            )
+
+        self.assertEqual(points, [[-122.40, 37.70], [-122.40, 37.71], [-122.40, 37.72]])
+        self.assertGreater(miles, 0)
+        self.assertGreater(minutes, 0)
+
+    async def test_compute_delivery_route_serves_cache_hit_without_directions(self):
+        session = object()
+        fetch = AsyncMock()
+        with patch("app.service.delivery_route_service.get_settings", return_value=_settings()), patch(
+            "app.service.delivery_route_service.get_cached_route",
+            new=AsyncMock(return_value=("_p~iF~ps|U_ulLnnqC", 3.0, 15.0)),
+        ), patch("app.service.delivery_route_service._fetch_optimized_directions", new=fetch):
+            points, miles, minutes = await compute_delivery_route(
+                supplier_latitude=37.7,
+                supplier_longitude=-122.4,
+                destination_points=[(37.8, -122.3)],
+                session=session,
+            )
+
+        fetch.assert_not_awaited()
+        self.assertEqual((points, miles, minutes), ([[-120.2, 38.5], [-120.95, 40.7]], 3.0, 15.0))
+
+    async def test_compute_delivery_route_stores_directions_result_on_miss(self):
+        session = object()
+        store = AsyncMock()
+        route = ([[-120.2, 38.5], [-120.95, 40.7]], 3.0, 15.0)
+        with patch(
+            "app.service.delivery_route_service.get_settings", return_value=_settings(directions_mode="candidates")
+        ), patch("app.service.delivery_route_service.get_cached_route", new=AsyncMock(return_value=None)), patch(
+            "app.service.delivery_route_service._fetch_optimized_directions", new=AsyncMock(return_value=route)), patch(
+            "app.service.delivery_route_service.store_cached_route", new=store
+        ):
+            result = await compute_delivery_route(
+                supplier_latitude=37.7,
+                supplier_longitude=-122.4,
+                destination_points=[(37.8, -122.3)],
+                session=session,
+            )
+
+        self.assertEqual(result, route)
+        self.assertIs(store.await_args.args[0], session)
+        self.assertEqual(store.await_args.kwargs["encoded_polyline"], "_p~iF~ps|U_ulLnnqC")
+        self.assertEqual(store.await_args.kwargs["stop_count"], 1)
+
+    async def test_distance_matrix_is_fetched_in_tiles(self):
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            origins = request.url.params["origins"].split("|")
+            destinations = request.url.params["destinations"].split("|")
+            requests.append((len(origins), len(destinations)))
+            # One mile per 0.01 degrees of latitude between the two points.
+            rows = [
+                {"elements": [{"status": "OK", "distance": {"value": _miles_apart(o, d) * 1609.344}} for d in destinations]}
+                for o in origins
+            ]
+            return httpx.Response(200, json={"status": "OK", "rows": rows})
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        with patch("app.service.delivery_route_service.get_settings", return_value=_settings()), patch(
+            "app.service.delivery_route_service.get_http_client", return_value=client
+        ):
+            matrix = await _fetch_distance_matrix(STOPS)
+
+        self.assertEqual(sorted(requests), [(2, 2), (2, 10), (10, 2), (10, 10)])
+        self.assertEqual(matrix.shape, (12, 12))
+        self.assertAlmostEqual(matrix[0, 11], 11.0)
+        self.assertAlmostEqual(matrix[11, 0], 11.0)
+        self.assertEqual(matrix[5, 5], 0.0)
+
+    async def test_distance_matrix_gives_up_when_an_element_is_missing(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(
+                200, json={"status": "OK", "rows": [{"elements": [{"status": "ZERO_RESULTS"}, {"status": "OK"}]}] * 2}
+            )
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        with patch("app.service.delivery_route_service.get_settings", return_value=_settings()), patch(
+            "app.service.delivery_route_service.get_http_client", return_value=client
+        ):
+            self.assertIsNone(await _fetch_distance_matrix(STOPS[:2]))
+
+    async def test_fixed_order_directions_splits_long_tours_into_legs(self):
+        stops = [(37.70 + i * 0.001, -122.40) for i in range(30)]
+        calls = []
+
+        async def fake_request(*, origin_point, destination_point, waypoint_points, optimize_waypoints):
+            calls.append((origin_point, destination_point, len(waypoint_points), optimize_waypoints))
+            return [[origin_point[1], origin_point[0]], [destination_point[1], destination_point[0]]], 2.0, 10.0
+
+        with patch("app.service.delivery_route_service.get_settings", return_value=_settings()), patch(
+            "app.service.delivery_route_service._fetch_directions_request", new=fake_request
+        ):
+            points, miles, minutes = await _fetch_fixed_order_directions((37.6, -122.5), stops)
+
+        self.assertEqual(
+            calls,
+            [((37.6, -122.5), stops[25], 25, False), (stops[25], stops[29], 3, False)],
+        )
+        self.assertEqual(points, [[-122.5, 37.6], [stops[25][1], stops[25][0]], [stops[29][1], stops[29][0]]])
+        self.assertEqual((miles, minutes), (4.0, 20.0))
+
+    async def test_matrix_mode_orders_locally_and_requests_one_fixed_route(self):
+        stops = [(37.71, -122.40), (37.72, -122.40), (37.73, -122.40)]
+        # Road distances make the farthest stop by air the natural first stop.
+        matrix = np.array(
+            [
+                [0.0, 9.0, 9.0, 1.0],
+                [9.0, 0.0, 1.0, 9.0],
+                [9.0, 1.0, 0.0, 1.0],
+                [1.0, 9.0, 1.0, 0.0],
+            ]
+        )
+        route = ([[-122.4, 37.7], [-122.4, 37.71]], 3.0, 12.0)
+        fixed = AsyncMock(return_value=route)
+        candidates = AsyncMock()
+        with patch("app.service.delivery_route_service.get_settings", return_value=_settings()), patch(
+            "app.service.delivery_route_service.get_road_graph", return_value=None
+        ), patch("app.service.delivery_route_service._fetch_distance_matrix", new=AsyncMock(return_value=matrix)), patch(
+            "app.service.delivery_route_service._fetch_fixed_order_directions", new=fixed
+        ), patch("app.service.delivery_route_service._fetch_optimized_directions", new=candidates):
+            result = await compute_delivery_route(
+                supplier_latitude=37.70,
+                supplier_longitude=-122.40,
+                destination_points=stops,
+            )
+
+        self.assertEqual(result, route)
+        candidates.assert_not_awaited()
+        fixed.assert_awaited_once_with((37.70, -122.40), [stops[2], stops[1], stops[0]])
+
+    async def test_matrix_mode_skips_the_distance_matrix_above_the_stop_cap(self):
+        route = ([[-122.4, 37.7], [-122.4, 37.71]], 3.0, 12.0)
+        distance_matrix = AsyncMock()
+        fixed = AsyncMock(return_value=route)
+        with patch(
+            "app.service.delivery_route_service.get_settings",
+            return_value=_settings(directions_matrix_max_stops=len(STOPS) - 1),
+        ), patch("app.service.delivery_route_service.get_road_graph", return_value=None), patch(
+            "app.service.delivery_route_service._fetch_distance_matrix", new=distance_matrix
+        ), patch("app.service.delivery_route_service._fetch_fixed_order_directions", new=fixed):
+            result = await compute_delivery_route(
+                supplier_latitude=37.60,
+                supplier_longitude=-122.40,
+                destination_points=STOPS,
+            )
+
+        self.assertEqual(result, route)
+        distance_matrix.assert_not_awaited()
+        # Ordered on straight-line miles instead: outward along the line of stops.
+        fixed.assert_awaited_once_with((37.60, -122.40), STOPS)
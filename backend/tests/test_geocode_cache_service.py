@@ -0,0 +1,83 @@
+from types import SimpleNamespace
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from app.service.geocode_cache_service import (
+    cached_geocode_address,
+    geocode_cache_counters,
+    get_cached_geocode,
+    normalize_address,
+)
+from app.service.geocoding_service import GeocodingUnavailable
+
+SETTINGS = SimpleNamespace(geocode_cache_ttl_seconds=3600.0, geocode_cache_negative_ttl_seconds=60.0)
+GEO = {
+    "latitude": 37.76,
+    "longitude": -122.42,
+    "locality": "San Francisco",
+    "admin_area_level_1": "CA",
+    "country": "US",
+    "postal_code": "94103",
+    "formatted_address": "2900 16th St, San Francisco, CA 94103, USA",
+}
+
+
+class _ExecResult:
+    def __init__(self, rows=None):
+        self._rows = rows or []
+
+    def all(self):
+        return self._rows
+
+
+class _Session:
+    def __init__(self, rows=None):
+        self._rows = rows
+
+    async def execute(self, _stmt):
+        return _ExecResult(self._rows)
+
+
+class TestGeocodeCacheService(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        geocode_cache_counters.reset()
+
+    def test_normalization_folds_case_units_and_abbreviations(self):
+        key = normalize_address("123 Main Street, Apt 4, San Francisco, California 94103-1234, United States")
+
+        self.assertEqual(key, "123 main st san francisco ca 94103 us")
+        self.assertEqual(normalize_address("123  MAIN st. #4B  san francisco, CA 94103, USA"), key)
+        self.assertEqual(normalize_address("123 Main St Suite 200, San Francisco, CA 94103, US"), key)
+        self.assertNotEqual(normalize_address("125 Main St, San Francisco, CA 94103, US"), key)
+
+    async def test_lookup_distinguishes_cached_miss_from_cache_miss(self):
+        self.assertIsNone(await get_cached_geocode(_Session(), "k"))
+        self.assertEqual(await get_cached_geocode(_Session([("k", False, *[None] * 7)]), "k"), (False, None))
+        found, geo = await get_cached_geocode(_Session([("k", True, *GEO.values())]), "k")
+
+        self.assertTrue(found)
+        self.assertEqual(geo, GEO)
+        self.assertEqual(geocode_cache_counters.snapshot()["hits"], 2)
+
+    async def test_cache_hit_skips_the_geocoder(self):
+        geocoder = patch("app.service.geocode_cache_service.geocode_address", new=AsyncMock())
+        with patch("app.service.geocode_cache_service.get_settings", return_value=SETTINGS), patch(
+            "app.service.geocode_cache_service.get_cached_geocode", new=AsyncMock(return_value=(True, GEO))
+        ), geocoder as geocode:
+            result = await cached_geocode_address(object(), "2900 16th Street, San Francisco")
+
+        self.assertEqual(result, GEO)
+        geocode.assert_not_awaited()
+
+    async def test_definitive_miss_is_cached_but_outage_is_not(self):
+        store = AsyncMock()
+        with patch("app.service.geocode_cache_service.get_settings", return_value=SETTINGS), patch(
+            "app.service.geocode_cache_service.get_cached_geocode", new=AsyncMock(return_value=None)
+        ), patch("app.service.geocode_cache_service.store_cached_geocode", new=store), patch(
+            "app.service.geocode_cache_service.geocode_address", side_effect=[None, GeocodingUnavailable("timeout")]
+        ):
+            self.assertIsNone(await cached_geocode_address(object(), "1 Nowhere Ln"))
+            self.assertIsNone(await cached_geocode_address(object(), "1 Nowhere Ln"))
+
+        store.assert_awaited_once()
+        self.assertEqual(store.await_args.args[1:], ("1 nowhere ln", None))
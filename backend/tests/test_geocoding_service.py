@@ -0,0 +1,159 @@
+import asyncio
+from contextlib import suppress
+from types import SimpleNamespace
+import time
+import unittest
+from unittest.mock import AsyncMock, patch
+
+import httpx
+
+from app.service.business_service import create_business
+from app.service.geocoding_service import GeocodingUnavailable, geocode_address
+
+GEOCODE_LATENCY_SECONDS = 0.3
+HEARTBEAT_SECONDS = 0.01
+
+
+def _settings(**overrides):
+    values = {
+        "google_maps_api_key": "test-key",
+        "geocode_request_timeout_seconds": 5.0,
+        "geocode_max_concurrency": 8,
+        "geocode_cache_ttl_seconds": 0.0,
+    }
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+OK_PAYLOAD = {
+    "status": "OK",
+    "results": [
+        {
+            "formatted_address": "2900 16th St, San Francisco, CA 94103, USA",
+            "geometry": {"location": {"lat": 37.765, "lng": -122.418}},
+            "address_components": [
+                {"long_name": "San Francisco", "types": ["locality", "political"]},
+                {"long_name": "California", "short_name": "CA", "types": ["administrative_area_level_1"]},
+                {"long_name": "United States", "types": ["country"]},
+                {"long_name": "94103", "types": ["postal_code"]},
+            ],
+        }
+    ],
+}
+
+
+class _Session:
+    def __init__(self):
+        self.added = []
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def commit(self):
+        return None
+
+    async def refresh(self, _obj):
+        return None
+
+
+class TestGeocodingService(unittest.IsolatedAsyncioTestCase):
+    async def _geocode(self, handler, address="2900 16th St", **settings):
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            with patch("app.service.geocoding_service.get_settings", return_value=_settings(**settings)), patch(
+                "app.service.geocoding_service.get_http_client", return_value=client
+            ):
+                return await geocode_address(address)
+
+    async def test_parses_first_result_from_pooled_client(self):
+        geo = await self._geocode(lambda request: httpx.Response(200, json=OK_PAYLOAD))
+
+        self.assertEqual((geo["latitude"], geo["longitude"]), (37.765, -122.418))
+        self.assertEqual((geo["locality"], geo["postal_code"]), ("San Francisco", "94103"))
+
+    async def test_no_match_is_none_but_outages_raise(self):
+        self.assertIsNone(await self._geocode(lambda request: httpx.Response(200, json={"status": "ZERO_RESULTS"})))
+        with self.assertRaises(GeocodingUnavailable):
+            await self._geocode(lambda request: httpx.Response(200, json={"status": "OVER_QUERY_LIMIT"}))
+        with self.assertRaises(GeocodingUnavailable):
+            await self._geocode(lambda request: httpx.Response(503))
+
+        def timeout(request):
+            raise httpx.ReadTimeout("slow", request=request)
+
+        with self.assertRaises(GeocodingUnavailable):
+            await self._geocode(timeout)
+
+    async def test_event_loop_stays_responsive_while_businesses_wait_on_slow_geocodes(self):
+        async def slow_handler(request):
+            await asyncio.sleep(GEOCODE_LATENCY_SECONDS)
+            return httpx.Response(200, json=OK_PAYLOAD)
+
+        gaps = []
+
+        async def heartbeat():
+            last = time.perf_counter()
+            while True:
+                await asyncio.sleep(HEARTBEAT_SECONDS)
+                now = time.perf_counter()
+                gaps.append(now - last)
+                last = now
+
+        async def create(n):
+            return await create_business(
+                _Session(),
+                name=f"Cafe {n}",
+                email=None,
+                business_type="cafe",
+                account_type="business",
+                address=f"{n} Valencia St",
+                city="San Francisco",
+                state="CA",
+                neighborhood=None,
+                zip_code="94103",
+                latitude=None,
+                longitude=None,
+            )
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(slow_handler)) as client:
+            with patch("app.service.geocoding_service.get_settings", return_value=_settings()), patch(
+                "app.service.geocode_cache_service.get_settings", return_value=_settings()
+            ), patch("app.service.geocoding_service.get_http_client", return_value=client), patch(
+                "app.service.business_service.assign_region", new=AsyncMock(return_value=SimpleNamespace(id=7))
+            ):
+                ticker = asyncio.create_task(heartbeat())
+                started = time.perf_counter()
+                businesses = await asyncio.gather(*(create(n) for n in range(3)))
+                elapsed = time.perf_counter() - started
+                ticker.cancel()
+                with suppress(asyncio.CancelledError):
+                    await ticker
+
+        self.assertEqual([business.region_id for business in businesses], [7, 7, 7])
+        self.assertEqual(businesses[0].latitude, 37.765)
+        # The three geocodes overlapped instead of running back to back.
+        self.assertLess(elapsed, 2 * GEOCODE_LATENCY_SECONDS)
+        # A blocked loop would show one gap as long as a geocode; a free one keeps ticking.
+        self.assertLess(max(gaps), GEOCODE_LATENCY_SECONDS / 2)
+        self.assertGreater(len(gaps), (elapsed / HEARTBEAT_SECONDS) / 3)
+
+    async def test_concurrent_geocodes_are_bounded(self):
+        active = 0
+        peak = 0
+
+        async def handler(request):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return httpx.Response(200, json=OK_PAYLOAD)
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            with patch(
+                "app.service.geocoding_service.get_settings", return_value=_settings(geocode_max_concurrency=2)
+            ), patch("app.service.geocoding_service.get_http_client", return_value=client), patch(
+                "app.service.geocoding_service._semaphore", new=None
+            ):
+                await asyncio.gather(*(geocode_address(f"{n} Main St") for n in range(6)))
+
+        self.assertEqual(peak, 2)
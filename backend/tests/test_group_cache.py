@@ -0,0 +1,58 @@
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from app.service.group_cache import ALL_REGIONS, GroupListingCache
+from app.service.group_service import list_active_groups
+
+
+class _ExecResult:
+    def __init__(self, rows=None):
+        self._rows = rows or []
+
+    def all(self):
+        return self._rows
+
+
+class _Session:
+    def __init__(self, executes=None):
+        self._executes = executes or []
+
+    async def execute(self, _stmt):
+        return self._executes.pop(0) if self._executes else _ExecResult()
+
+
+class TestGroupListingCache(unittest.IsolatedAsyncioTestCase):
+    async def test_invalidation_only_drops_affected_region_and_all_regions(self):
+        cache = GroupListingCache(ttl_seconds=60)
+        for region_id in (1, 2, ALL_REGIONS):
+            cache.put(region_id, "k", [{"id": f"g{region_id}"}], generation=cache.generation(region_id))
+
+        cache.invalidate_regions([1])
+
+        self.assertIsNone(cache.get(1, "k"))
+        self.assertIsNone(cache.get(ALL_REGIONS, "k"))
+        self.assertEqual(cache.get(2, "k"), [{"id": "g2"}])
+
+    async def test_put_is_skipped_when_region_changed_during_build(self):
+        cache = GroupListingCache(ttl_seconds=60)
+        generation = cache.generation(3)
+        cache.invalidate_regions([3])
+
+        cache.put(3, "k", [{"id": "stale"}], generation=generation)
+
+        self.assertIsNone(cache.get(3, "k"))
+
+    async def test_list_active_groups_reuses_cached_payload_and_overlays_joined_flag(self):
+        cache = GroupListingCache(ttl_seconds=60)
+        build = AsyncMock(return_value=[{"id": "g1"}, {"id": "g2"}])
+
+        with patch("app.service.group_service.group_listing_cache", new=cache), patch(
+            "app.service.group_service._build_group_listing", new=build
+        ):
+            first = await list_active_groups(_Session(), region_id=4)
+            second = await list_active_groups(_Session([_ExecResult(rows=[("g2",)])]), region_id=4, business_id="b1")
+
+        build.assert_awaited_once()
+        self.assertEqual([g["joined_by_business"] for g in first], [False, False])
+        self.assertEqual([g["joined_by_business"] for g in second], [False, True])
+        self.assertNotIn("joined_by_business", cache.get(4, (None, None, None, None, None, None))[0])
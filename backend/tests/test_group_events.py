@@ -0,0 +1,25 @@
+import unittest
+
+from app.service.group_events import GroupEventBroker
+
+
+class TestGroupEventBroker(unittest.IsolatedAsyncioTestCase):
+    async def test_publish_fans_out_to_matching_regions(self):
+        broker = GroupEventBroker()
+        async with broker.subscribe(1) as region_one, broker.subscribe(2) as region_two, broker.subscribe() as everything:
+            broker.publish({"group_id": "g1", "region_id": 1, "current_units": 10})
+
+            self.assertEqual((await region_one.get())["group_id"], "g1")
+            self.assertEqual((await everything.get())["group_id"], "g1")
+            self.assertTrue(region_two.empty())
+            self.assertTrue(broker.has_subscribers(2))
+
+        self.assertFalse(broker.has_subscribers(1))
+
+    async def test_slow_subscriber_drops_oldest_event(self):
+        broker = GroupEventBroker(max_queue_size=2)
+        async with broker.subscribe() as queue:
+            for units in (1, 2, 3):
+                broker.publish({"group_id": "g1", "region_id": 1, "current_units": units})
+
+            self.assertEqual([(await queue.get())["current_units"] for _ in range(2)], [2, 3])
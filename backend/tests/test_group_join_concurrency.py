@@ -0,0 +1,141 @@
+import asyncio
+from collections import defaultdict
+from types import SimpleNamespace
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from sqlalchemy.exc import IntegrityError
+
+from app.service.group_service import join_group
+
+TARGET_UNITS = 1000
+UNITS_PER_JOIN = 7
+
+
+class _Database:
+    """Committed state of one group, with a lock per group row standing in for FOR UPDATE."""
+
+    def __init__(self):
+        self.row_locks = defaultdict(asyncio.Lock)
+        self.current_units = 0
+        self.business_count = 0
+        self.commitments = {}
+
+
+class _Session:
+    """One connection: holds row locks and staged writes until commit or rollback."""
+
+    def __init__(self, db, business_id):
+        self.db = db
+        self.group = SimpleNamespace(
+            id="g1", status="active", target_units=TARGET_UNITS, supplier_product_id=None, region_id=1
+        )
+        self.business = SimpleNamespace(id=business_id, account_type="business", region_id=1)
+        self.held = []
+        self.pending = []
+        self.units_delta = 0
+        self.business_delta = 0
+
+    async def get(self, model, _key):
+        return self.group if model.__name__ == "BuyingGroup" else self.business
+
+    def add(self, obj):
+        self.pending.append(obj)
+
+    async def flush(self):
+        # Stands in for the unique index on (group_id, business_id).
+        for commitment in self.pending:
+            if (commitment.group_id, commitment.business_id) in self.db.commitments:
+                raise IntegrityError("INSERT", {}, Exception("uq_group_commitments_group_id_business_id"))
+
+    async def commit(self):
+        for commitment in self.pending:
+            self.db.commitments[(commitment.group_id, commitment.business_id)] = commitment.id
+        self.db.current_units += self.units_delta
+        self.db.business_count += self.business_delta
+        self._end()
+
+    async def rollback(self):
+        self._end()
+
+    def _end(self):
+        self.pending, self.units_delta, self.business_delta = [], 0, 0
+        while self.held:
+            self.held.pop().release()
+
+
+async def _lock_group(session, group):
+    lock = session.db.row_locks[group.id]
+    await lock.acquire()
+    session.held.append(lock)
+    await asyncio.sleep(0)
+    return session.db.current_units, session.db.business_count
+
+
+async def _read_group_unlocked(session, _group):
+    await asyncio.sleep(0)
+    return session.db.current_units, session.db.business_count
+
+
+async def _apply_rollup(session, *, group_id, units_delta, business_delta):
+    # Let other joins run between the capacity check and the commit, as a network round trip would.
+    await asyncio.sleep(0)
+    session.units_delta += units_delta
+    session.business_delta += business_delta
+
+
+async def _sync_capacity(_session, group, *, current_units, business_count):
+    return group.target_units, None, False
+
+
+class TestGroupJoinConcurrency(unittest.IsolatedAsyncioTestCase):
+    async def _join_concurrently(self, business_ids, *, lock):
+        db = _Database()
+
+        async def join(business_id):
+            session = _Session(db, business_id)
+            try:
+                await join_group(session, group_id="g1", business_id=business_id, units=UNITS_PER_JOIN)
+            except ValueError as exc:
+                return str(exc)
+            return "joined"
+
+        with patch("app.service.group_service._lock_group_for_write", new=lock), patch(
+            "app.service.group_service._sync_group_capacity_status", new=_sync_capacity
+        ), patch("app.service.group_service.apply_commitment_to_rollup", new=_apply_rollup), patch(
+            "app.service.group_service._record_group_change", new=AsyncMock(return_value=set())
+        ), patch("app.service.group_service._publish_group_progress", new=AsyncMock()), patch(
+            "app.service.group_service._maybe_confirm_group", new=AsyncMock()
+        ):
+            outcomes = await asyncio.gather(*(join(business_id) for business_id in business_ids))
+        return db, outcomes
+
+    async def test_hundreds_of_parallel_joins_never_oversubscribe_the_group(self):
+        # 300 joins of 7 units race for 1000 units; every tenth business also joins twice.
+        business_ids = [f"b{n}" for n in range(300)] + [f"b{n}" for n in range(0, 300, 10)]
+
+        db, outcomes = await self._join_concurrently(business_ids, lock=_lock_group)
+
+        joined = outcomes.count("joined")
+        self.assertEqual(joined, TARGET_UNITS // UNITS_PER_JOIN)
+        self.assertEqual((db.current_units, db.business_count), (joined * UNITS_PER_JOIN, joined))
+        self.assertEqual(len(db.commitments), joined)
+        self.assertFalse(any(lock.locked() for lock in db.row_locks.values()))
+        self.assertLessEqual(
+            set(outcomes) - {"joined"},
+            {
+                "Business has already joined this group",
+                "Group inventory capacity is filled; waiting on supplier restock",
+                "Requested units exceed remaining group capacity (0 units left)",
+                "Requested units exceed remaining group capacity (6 units left)",
+            },
+        )
+
+    async def test_the_same_joins_oversubscribe_without_the_row_lock(self):
+        business_ids = [f"b{n}" for n in range(300)]
+
+        db, outcomes = await self._join_concurrently(business_ids, lock=_read_group_unlocked)
+
+        # Sanity check on the harness: the race it guards against really happens here.
+        self.assertEqual(outcomes.count("joined"), 300)
+        self.assertGreater(db.current_units, TARGET_UNITS)
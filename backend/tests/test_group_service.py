@@ -1,14 +1,24 @@
+from datetime import UTC, datetime
 from decimal import Decimal
 from types import SimpleNamespace
 import unittest
 from unittest.mock import AsyncMock, patch
 
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
+
 from app.service.group_service import (
     _build_group_metrics,
+    _lock_group_for_write,
     _maybe_confirm_group,
     _remaining_units_for_group,
     create_group,
+    decode_group_cursor,
+    encode_group_cursor,
     join_group,
+    list_active_groups,
+    notify_group_confirmed,
+    publish_groups_progress,
     supplier_approve_group,
 )
 
@@ -47,6 +57,7 @@ class _Session:
         self._executes = executes or []
         self.added = []
         self.commit_count = 0
+        self.rollback_count = 0
 
     async def get(self, model, key):
         return self._gets.get((model.__name__, key))
@@ -57,9 +68,15 @@ class _Session:
     async def commit(self):
         self.commit_count += 1
 
+    async def rollback(self):
+        self.rollback_count += 1
+
     async def refresh(self, _obj):
         return None
 
+    async def flush(self):
+        return None
+
     async def execute(self, _stmt):
         if self._executes:
             return self._executes.pop(0)
@@ -131,6 +148,7 @@ class TestGroupService(unittest.IsolatedAsyncioTestCase):
         group = SimpleNamespace(
             id="g1",
             status="active",
+            region_id=2,
             target_units=200,
             min_businesses_required=2,
             supplier_business_id="s1",
@@ -145,19 +163,36 @@ class TestGroupService(unittest.IsolatedAsyncioTestCase):
                 ("SupplierProduct", "sp1"): supplier_product,
             },
             executes=[
+                _ExecResult(rows=[]),
                 _ExecResult(one=None),
-                _ExecResult(rows=[("a@x.com",), ("b@x.com",)]),
+                _ExecResult(rows=[("b@example.com",), ("a@example.com",), (" ",)]),
+                _ExecResult(rows=[]),
+                _ExecResult(rows=[(2,)]),
+                _ExecResult(),
             ],
         )
+        send_email = AsyncMock(return_value=True)
 
-        with patch("app.service.group_service._fetch_group_rollups", new=AsyncMock(return_value={"g1": {"current_units": 120, "business_count": 2}})), \
-             patch("app.service.group_service.send_group_confirmed_email", new=AsyncMock(return_value=True)):
+        with patch("app.service.group_service._lock_group_for_write", new=AsyncMock(return_value=(120, 2))), \
+             patch("app.service.group_service.send_group_confirmed_email", new=send_email):
             await _maybe_confirm_group(session, "g1")
 
         self.assertEqual(group.status, "confirmed")
         self.assertEqual(supplier_product.available_units, 30)
         self.assertEqual(supplier_product.status, "active")
-        self.assertEqual(len(session.added), 1)
+        order, route_job, *notify_jobs = session.added
+        self.assertIsNone(order.route_points)
+        self.assertIsNone(order.estimated_end_at)
+        self.assertEqual((route_job.kind, route_job.payload), ("plan_order_route", {"order_id": order.id}))
+        self.assertEqual(
+            [(job.kind, job.payload) for job in notify_jobs],
+            [
+                ("notify_group_confirmed", {"group_id": "g1", "email": "a@example.com"}),
+                ("notify_group_confirmed", {"group_id": "g1", "email": "b@example.com"}),
+            ],
+        )
+        send_email.assert_not_awaited()
+        self.assertEqual(session.commit_count, 1)
 
     async def test_auto_confirm_fails_when_inventory_insufficient(self):
         group = SimpleNamespace(
@@ -178,7 +213,7 @@ class TestGroupService(unittest.IsolatedAsyncioTestCase):
             executes=[],
         )
 
-        with patch("app.service.group_service._fetch_group_rollups", new=AsyncMock(return_value={"g2": {"current_units": 80, "business_count": 2}})):
+        with patch("app.service.group_service._lock_group_for_write", new=AsyncMock(return_value=(80, 2))):
             with self.assertRaises(ValueError) as ctx:
                 await _maybe_confirm_group(session, "g2")
 
@@ -204,14 +239,95 @@ class TestGroupService(unittest.IsolatedAsyncioTestCase):
             }
         )
 
-        with patch(
-            "app.service.group_service._fetch_group_rollups",
-            new=AsyncMock(return_value={"g3": {"current_units": 90, "business_count": 2}}),
-        ):
+        with patch("app.service.group_service._lock_group_for_write", new=AsyncMock(return_value=(90, 2))):
             with self.assertRaises(ValueError) as ctx:
                 await join_group(session, group_id="g3", business_id="b1", units=6)
 
         self.assertIn("remaining group capacity", str(ctx.exception))
+        self.assertEqual(session.rollback_count, 1)
+        self.assertEqual(session.added, [])
+
+    async def test_join_group_updates_rollup_in_same_transaction(self):
+        group = SimpleNamespace(
+            id="g7",
+            status="active",
+            target_units=100,
+            min_businesses_required=3,
+            supplier_product_id=None,
+            region_id=2,
+        )
+        business = SimpleNamespace(id="b1", account_type="business", region_id=2)
+        session = _Session(
+            gets={
+                ("BuyingGroup", "g7"): group,
+                ("Business", "b1"): business,
+            }
+        )
+        apply_rollup = AsyncMock()
+
+        with patch(
+            "app.service.group_service._lock_group_for_write",
+            new=AsyncMock(return_value=(40, 1)),
+        ), patch("app.service.group_service.apply_commitment_to_rollup", new=apply_rollup), patch(
+            "app.service.group_service._maybe_confirm_group", new=AsyncMock()
+        ):
+            commitment = await join_group(session, group_id="g7", business_id="b1", units=25)
+
+        apply_rollup.assert_awaited_once_with(session, group_id="g7", units_delta=25, business_delta=1)
+        self.assertEqual(commitment.units, 25)
+        self.assertEqual(session.commit_count, 1)
+
+    async def test_join_group_maps_unique_violation_to_already_joined(self):
+        group = SimpleNamespace(
+            id="g9",
+            status="active",
+            target_units=100,
+            min_businesses_required=3,
+            supplier_product_id=None,
+            region_id=2,
+        )
+        business = SimpleNamespace(id="b1", account_type="business", region_id=2)
+
+        class _DuplicateSession(_Session):
+            async def flush(self):
+                raise IntegrityError(
+                    "INSERT INTO group_commitments ...",
+                    {},
+                    Exception('duplicate key value violates unique constraint "uq_group_commitments_group_id_business_id"'),
+                )
+
+        session = _DuplicateSession(gets={("BuyingGroup", "g9"): group, ("Business", "b1"): business})
+        apply_rollup = AsyncMock()
+
+        with patch(
+            "app.service.group_service._lock_group_for_write",
+            new=AsyncMock(return_value=(10, 1)),
+        ), patch("app.service.group_service.apply_commitment_to_rollup", new=apply_rollup):
+            with self.assertRaises(ValueError) as ctx:
+                await join_group(session, group_id="g9", business_id="b1", units=5)
+
+        self.assertEqual(str(ctx.exception), "Business has already joined this group")
+        self.assertEqual(session.rollback_count, 1)
+        self.assertEqual(session.commit_count, 0)
+        apply_rollup.assert_not_awaited()
+
+    async def test_lock_group_for_write_locks_supplier_product_before_group(self):
+        group = SimpleNamespace(id="g8", supplier_product_id="sp8")
+        statements = []
+
+        class _RecordingSession(_Session):
+            async def execute(self, stmt):
+                statements.append(str(stmt.compile(dialect=postgresql.dialect())))
+                return await super().execute(stmt)
+
+        session = _RecordingSession(executes=[_ExecResult(), _ExecResult(rows=[(group, 70, 3)])])
+
+        self.assertEqual(await _lock_group_for_write(session, group), (70, 3))
+        self.assertEqual(len(statements), 2)
+        self.assertIn("FROM supplier_products", statements[0])
+        self.assertTrue(statements[0].rstrip().endswith("FOR UPDATE"))
+        self.assertIn("FROM buying_groups", statements[1])
+        self.assertTrue(statements[1].rstrip().endswith("FOR UPDATE OF buying_groups"))
 
     async def test_join_group_rejects_completed_group(self):
         group = SimpleNamespace(
@@ -229,8 +345,9 @@ class TestGroupService(unittest.IsolatedAsyncioTestCase):
             }
         )
 
-        with self.assertRaises(ValueError) as ctx:
-            await join_group(session, group_id="g4", business_id="b1", units=10)
+        with patch("app.service.group_service._lock_group_for_write", new=AsyncMock(return_value=(100, 2))):
+            with self.assertRaises(ValueError) as ctx:
+                await join_group(session, group_id="g4", business_id="b1", units=10)
 
         self.assertEqual(str(ctx.exception), "Group is no longer open for joining")
 
@@ -259,7 +376,7 @@ class TestGroupService(unittest.IsolatedAsyncioTestCase):
         )
         session = _Session(gets={("BuyingGroup", "g6"): group})
 
-        with patch("app.service.group_service._fetch_group_rollups", new=AsyncMock(return_value={"g6": {"current_units": 100, "business_count": 2}})):
+        with patch("app.service.group_service._lock_group_for_write", new=AsyncMock(return_value=(100, 2))):
             await _maybe_confirm_group(session, "g6")
 
         self.assertEqual(group.status, "completed")
@@ -284,3 +401,97 @@ class TestGroupService(unittest.IsolatedAsyncioTestCase):
             _remaining_units_for_group(status="active", current_units=200, max_capacity=500),
             300,
         )
+
+    async def test_group_cursor_round_trip(self):
+        created_at = datetime(2026, 3, 1, 12, 30, tzinfo=UTC)
+        cursor = encode_group_cursor(created_at, "g-123")
+
+        self.assertEqual(decode_group_cursor(cursor), (created_at, "g-123"))
+
+    async def test_list_active_groups_rejects_bad_cursor_and_status(self):
+        with self.assertRaises(ValueError) as ctx:
+            await list_active_groups(_Session(), cursor="not-a-cursor")
+        self.assertEqual(str(ctx.exception), "Invalid cursor")
+
+        with self.assertRaises(ValueError) as ctx:
+            await list_active_groups(_Session(), status="completed")
+        self.assertIn("status must be one of", str(ctx.exception))
+
+    async def test_notify_group_confirmed_emails_only_its_own_recipient(self):
+        session = _Session()
+        send_email = AsyncMock(return_value=True)
+
+        with patch("app.service.group_service.send_group_confirmed_email", new=send_email):
+            self.assertTrue(await notify_group_confirmed(session, "g1", "a@example.com"))
+
+        send_email.assert_awaited_once_with(["a@example.com"], "g1")
+
+    async def test_legacy_notify_job_fans_out_one_job_per_recipient(self):
+        session = _Session(executes=[_ExecResult(rows=[("b@example.com",), ("a@example.com",)])])
+        send_email = AsyncMock()
+
+        with patch("app.service.group_service.send_group_confirmed_email", new=send_email):
+            await notify_group_confirmed(session, "g1")
+
+        send_email.assert_not_awaited()
+        self.assertEqual([job.payload["email"] for job in session.added], ["a@example.com", "b@example.com"])
+        self.assertEqual(session.commit_count, 1)
+
+    async def test_join_publishes_progress_for_siblings_whose_status_flipped(self):
+        group = SimpleNamespace(
+            id="g1",
+            status="active",
+            target_units=100,
+            min_businesses_required=3,
+            supplier_product_id="sp1",
+            region_id=2,
+        )
+        business = SimpleNamespace(id="b1", account_type="business", region_id=2)
+        session = _Session(gets={("BuyingGroup", "g1"): group, ("Business", "b1"): business})
+        publish_one = AsyncMock()
+        publish_many = AsyncMock()
+
+        with patch("app.service.group_service._lock_group_for_write", new=AsyncMock(return_value=(10, 1))), patch(
+            "app.service.group_service._sync_group_capacity_status", new=AsyncMock(return_value=(100, None, False))
+        ), patch("app.service.group_service.apply_commitment_to_rollup", new=AsyncMock()), patch(
+            "app.service.group_service.reconcile_capacity_statuses", new=AsyncMock(return_value=["g1", "g2", "g3"])
+        ), patch("app.service.group_service._record_group_change", new=AsyncMock(return_value={2})), patch(
+            "app.service.group_service._publish_group_progress", new=publish_one
+        ), patch("app.service.group_service.publish_groups_progress", new=publish_many), patch(
+            "app.service.group_service._maybe_confirm_group", new=AsyncMock()
+        ):
+            await join_group(session, group_id="g1", business_id="b1", units=5)
+
+        publish_one.assert_awaited_once_with(session, group)
+        publish_many.assert_awaited_once_with(session, ["g2", "g3"])
+
+    async def test_unconfirmed_status_change_is_published(self):
+        group = SimpleNamespace(
+            id="g5",
+            status="active",
+            target_units=100,
+            min_businesses_required=5,
+            supplier_business_id=None,
+            supplier_product_id=None,
+            region_id=2,
+        )
+        session = _Session(gets={("BuyingGroup", "g5"): group})
+        publish_one = AsyncMock()
+
+        with patch("app.service.group_service._lock_group_for_write", new=AsyncMock(return_value=(100, 2))), patch(
+            "app.service.group_service._sync_group_capacity_status", new=AsyncMock(return_value=(100, None, True))
+        ), patch("app.service.group_service.bump_change_versions", new=AsyncMock()), patch(
+            "app.service.group_service._publish_group_progress", new=publish_one
+        ):
+            await _maybe_confirm_group(session, "g5")
+
+        publish_one.assert_awaited_once_with(session, group)
+        self.assertEqual(session.commit_count, 1)
+
+    async def test_publish_groups_progress_skips_the_query_without_subscribers(self):
+        session = _Session()
+        session.execute = AsyncMock()
+
+        await publish_groups_progress(session, ["g1", "g2"])
+
+        session.execute.assert_not_awaited()
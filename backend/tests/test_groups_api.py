@@ -0,0 +1,78 @@
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from fastapi import Response
+from starlette.requests import Request
+
+from app.api.groups import get_group_endpoint, list_groups_endpoint
+from app.service.change_version_service import build_etag
+
+
+def _request(if_none_match: str | None = None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode("latin-1"))] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+class TestGroupsApi(unittest.IsolatedAsyncioTestCase):
+    async def test_get_group_returns_304_before_loading_details(self):
+        etag = build_etag("group", 7, "g1", None)
+        details = AsyncMock()
+
+        with patch("app.api.groups.get_group_change_version", new=AsyncMock(return_value=7)), patch(
+            "app.api.groups.get_group_details", new=details
+        ):
+            result = await get_group_endpoint("g1", _request(etag), Response(), db=object(), zoom=None)
+
+        self.assertEqual(result.status_code, 304)
+        self.assertEqual(result.headers["etag"], etag)
+        details.assert_not_awaited()
+
+    async def test_list_groups_sets_etag_and_rebuilds_when_version_changed(self):
+        stale = build_etag("groups", 3, 2, None, None, None, None, None, None, 50)
+        response = Response()
+
+        with patch("app.api.groups.get_region_change_version", new=AsyncMock(return_value=4)), patch(
+            "app.api.groups.list_active_groups", new=AsyncMock(return_value=[])
+        ) as list_groups:
+            result = await list_groups_endpoint(
+                _request(stale),
+                response,
+                db=object(),
+                region_id=2,
+                business_id=None,
+                category=None,
+                group_status=None,
+                supplier_business_id=None,
+                min_progress_pct=None,
+                cursor=None,
+                limit=50,
+            )
+
+        self.assertEqual(result, [])
+        list_groups.assert_awaited_once()
+        self.assertEqual(response.headers["etag"], build_etag("groups", 4, 2, None, None, None, None, None, None, 50))
+
+    async def test_list_groups_stays_unpaged_without_limit_or_cursor(self):
+        groups = [{"id": f"g{n}", "created_at": None} for n in range(3)]
+        response = Response()
+
+        with patch("app.api.groups.get_region_change_version", new=AsyncMock(return_value=1)), patch(
+            "app.api.groups.list_active_groups", new=AsyncMock(return_value=groups)
+        ) as list_groups, patch("app.api.groups.GroupRead", new=lambda **group: group):
+            result = await list_groups_endpoint(
+                _request(),
+                response,
+                db=object(),
+                region_id=None,
+                business_id=None,
+                category=None,
+                group_status=None,
+                supplier_business_id=None,
+                min_progress_pct=None,
+                cursor=None,
+                limit=None,
+            )
+
+        self.assertEqual(len(result), 3)
+        self.assertIsNone(list_groups.await_args.kwargs["limit"])
+        self.assertNotIn("x-next-cursor", response.headers)
@@ -29,3 +29,9 @@ class TestHealthApi(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(ctx.exception.status_code, 503)
         self.assertEqual(ctx.exception.detail["status"], "error")
         self.assertEqual(ctx.exception.detail["db"], "disconnected")
+
+    async def test_cache_health_check_reports_counters(self):
+        with patch("app.api.health.cache_metrics_snapshot", return_value={"route_cache": {"hits": 2}}):
+            result = await health.cache_health_check()
+
+        self.assertEqual(result, {"status": "ok", "caches": {"route_cache": {"hits": 2}}})
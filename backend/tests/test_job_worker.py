@@ -0,0 +1,126 @@
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from app.service.job_queue_service import mark_job_failed, release_job, retry_delay_seconds
+from app.service.job_worker import run_job
+
+
+class _Session:
+    def __init__(self):
+        self.statements = []
+        self.commit_count = 0
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+
+    async def commit(self):
+        self.commit_count += 1
+
+
+def _session_factory(sessions):
+    @asynccontextmanager
+    async def factory():
+        session = _Session()
+        sessions.append(session)
+        yield session
+
+    return factory
+
+
+def _job(**overrides):
+    values = {"id": "j1", "kind": "plan_order_route", "payload": {"order_id": "o1"}, "attempts": 1, "max_attempts": 3}
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+class TestJobQueue(unittest.IsolatedAsyncioTestCase):
+    async def test_retry_delay_backs_off_exponentially(self):
+        with patch("app.service.job_queue_service.get_settings", return_value=SimpleNamespace(job_retry_base_seconds=30.0)):
+            self.assertEqual([retry_delay_seconds(n) for n in (1, 2, 3)], [30.0, 60.0, 120.0])
+            self.assertEqual(retry_delay_seconds(20), 3600.0)
+
+    async def test_mark_job_failed_retries_until_attempts_run_out(self):
+        session = _Session()
+
+        self.assertTrue(await mark_job_failed(session, _job(attempts=2), "boom"))
+        self.assertFalse(await mark_job_failed(session, _job(attempts=3), "boom"))
+
+        first, last = (stmt.compile().params for stmt in session.statements)
+        self.assertEqual(first["status"], "pending")
+        self.assertIn("run_after", first)
+        self.assertEqual(last["status"], "failed")
+        self.assertNotIn("run_after", last)
+
+
+    async def test_release_job_hands_a_running_job_back_without_using_an_attempt(self):
+        session = _Session()
+
+        await release_job(session, _job())
+
+        (stmt,) = session.statements
+        params = stmt.compile().params
+        self.assertEqual((params["status"], params["locked_at"], params["status_1"]), ("pending", None, "running"))
+        self.assertIn("attempts - ", str(stmt))
+        self.assertEqual(session.commit_count, 1)
+
+
+class TestJobWorker(unittest.IsolatedAsyncioTestCase):
+    async def test_run_job_dispatches_to_handler_and_marks_success(self):
+        sessions = []
+        handler = AsyncMock(return_value=True)
+        succeeded = AsyncMock()
+
+        with patch("app.service.job_worker.SessionLocal", new=_session_factory(sessions)), patch.dict(
+            "app.service.job_worker.JOB_HANDLERS", {"plan_order_route": handler}
+        ), patch("app.service.job_worker.mark_job_succeeded", new=succeeded):
+            self.assertTrue(await run_job(_job()))
+
+        handler.assert_awaited_once_with(sessions[0], {"order_id": "o1"})
+        succeeded.assert_awaited_once_with(sessions[1], "j1")
+
+    async def test_run_job_records_failure_for_retry(self):
+        failed = AsyncMock(return_value=True)
+
+        with patch("app.service.job_worker.SessionLocal", new=_session_factory([])), patch.dict(
+            "app.service.job_worker.JOB_HANDLERS", {"plan_order_route": AsyncMock(side_effect=TimeoutError("maps"))}
+        ), patch("app.service.job_worker.mark_job_failed", new=failed):
+            self.assertFalse(await run_job(_job()))
+
+        self.assertEqual(failed.await_args.args[2], "TimeoutError: maps")
+
+    async def test_run_job_fails_unknown_kind(self):
+        failed = AsyncMock(return_value=False)
+
+        with patch("app.service.job_worker.SessionLocal", new=_session_factory([])), patch(
+            "app.service.job_worker.mark_job_failed", new=failed
+        ):
+            self.assertFalse(await run_job(_job(kind="mystery")))
+
+        self.assertIn("mystery", failed.await_args.args[2])
+
+
+    async def test_cancelled_job_is_released_back_to_pending(self):
+        started = asyncio.Event()
+        released = AsyncMock()
+        failed = AsyncMock()
+
+        async def handler(_session, _payload):
+            started.set()
+            await asyncio.sleep(60)
+
+        with patch("app.service.job_worker.SessionLocal", new=_session_factory([])), patch.dict(
+            "app.service.job_worker.JOB_HANDLERS", {"plan_order_route": handler}
+        ), patch("app.service.job_worker.release_job", new=released), patch(
+            "app.service.job_worker.mark_job_failed", new=failed
+        ):
+            task = asyncio.create_task(run_job(_job()))
+            await started.wait()
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        self.assertEqual(released.await_args.args[1].id, "j1")
+        failed.assert_not_awaited()
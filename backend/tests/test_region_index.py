@@ -0,0 +1,252 @@
+from contextlib import asynccontextmanager
+import random
+from types import SimpleNamespace
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from fastapi import HTTPException
+
+from app.api.regions import locate_region
+from app.db.seed import seed_regions
+from app.service import region_index
+from app.service.city_grid import CityGridSpec
+from app.service.region_index import RegionIndex, RegionSnapshot, get_region_index, load_regions
+from app.service.region_service import assign_region
+
+
+class _ExecResult:
+    def __init__(self, scalar=None, rows=None):
+        self._scalar = scalar
+        self._rows = rows or []
+
+    def first(self):
+        return self._rows[0] if self._rows else None
+
+    def scalar_one_or_none(self):
+        return self._scalar
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self._rows
+
+
+class _Session:
+    def __init__(self, executes=None):
+        self._executes = list(executes or [])
+        self.statements = []
+        self.added = []
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        return self._executes.pop(0) if self._executes else _ExecResult()
+
+    async def commit(self):
+        return None
+
+
+async def _seeded_regions(cities=None):
+    session = _Session()
+    if cities is None:
+        await seed_regions(session)
+    else:
+        with patch("app.db.seed.load_city_grids", return_value=cities):
+            await seed_regions(session)
+    for region_id, region in enumerate(session.added, start=1):
+        region.id = region_id
+    return session.added
+
+
+def _brute_force(regions, latitude, longitude):
+    matches = [
+        region
+        for region in regions
+        if region.min_lat <= latitude <= region.max_lat and region.min_lng <= longitude <= region.max_lng
+    ]
+    return matches[-1] if matches else None
+
+
+def _sample_points(regions, count=2000, seed=7):
+    rng = random.Random(seed)
+    min_lat = min(region.min_lat for region in regions) - 0.02
+    max_lat = max(region.max_lat for region in regions) + 0.02
+    min_lng = min(region.min_lng for region in regions) - 0.02
+    max_lng = max(region.max_lng for region in regions) + 0.02
+    points = [(rng.uniform(min_lat, max_lat), rng.uniform(min_lng, max_lng)) for _ in range(count)]
+    # Cell corners and edges, where inclusive bounds and float rounding matter.
+    for region in regions:
+        points += [
+            (region.min_lat, region.min_lng),
+            (region.max_lat, region.max_lng),
+            (region.min_lat, (region.min_lng + region.max_lng) / 2),
+        ]
+    return points
+
+
+def _settings(refresh_seconds=60.0):
+    return SimpleNamespace(region_index_refresh_seconds=refresh_seconds)
+
+
+class TestRegionIndex(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        region_index.invalidate_region_index()
+
+    async def test_seeded_regions_use_grid_arithmetic_and_match_the_bounding_box_query(self):
+        regions = await _seeded_regions()
+        index = RegionIndex(regions)
+        points = _sample_points(regions)
+
+        scalar = [index.lookup(lat, lng) for lat, lng in points]
+        batch = index.lookup_many([lat for lat, _ in points], [lng for _, lng in points])
+
+        self.assertTrue(index.is_grid)
+        self.assertEqual(scalar, [_brute_force(regions, lat, lng) for lat, lng in points])
+        self.assertEqual(batch, scalar)
+        self.assertIsNone(index.lookup(float("nan"), -122.42))
+        self.assertEqual(index.lookup_many([], []), [])
+
+    async def test_each_city_is_its_own_grid(self):
+        oakland = CityGridSpec.from_bounds("OAK", "Oakland", 37.75, 37.85, -122.30, -122.15, 2.0)
+        sacramento = CityGridSpec.around("SAC", "Sacramento", 38.58, -121.49, 4.0, 1.0)
+        regions = await _seeded_regions([CityGridSpec.around("SF", "SF", 37.7749, -122.4194, 3.5, 2.0), oakland, sacramento])
+        index = RegionIndex(regions)
+        points = _sample_points(regions, count=5000)
+
+        self.assertTrue(index.is_grid)
+        self.assertEqual(index.city_codes, ["SF", "OAK", "SAC"])
+        self.assertEqual(
+            index.lookup_many([lat for lat, _ in points], [lng for _, lng in points]),
+            [_brute_force(regions, lat, lng) for lat, lng in points],
+        )
+        self.assertEqual(index.lookup(38.58, -121.49).code, "SAC-5-5")
+
+    async def test_locate_reports_the_sub_cell_and_neighbors_come_from_the_same_city(self):
+        regions = await _seeded_regions()
+        index = RegionIndex(regions)
+        block = index.by_code("SF-2-3")
+
+        cell = index.locate(block.min_lat + (block.max_lat - block.min_lat) * 0.1, block.max_lng - 1e-6, subdivisions=4)
+
+        self.assertEqual((cell.region, cell.city_code, cell.code), (block, "SF", "SF-2-3.1.4"))
+        self.assertEqual([r.code for r in index.neighbors(block)], ["SF-1-2", "SF-1-3", "SF-1-4", "SF-2-2", "SF-2-4", "SF-3-2", "SF-3-3", "SF-3-4"])
+        self.assertEqual(len(index.neighbors(index.by_code("SF-1-1"))), 3)
+        self.assertEqual(len(index.neighbors(block, radius=3)), 15)
+        self.assertIsNone(index.locate(40.0, -100.0))
+
+    async def test_irregular_regions_are_bucketed(self):
+        regions = [
+            SimpleNamespace(id=1, code="A", row_index=1, col_index=1, min_lat=37.70, max_lat=37.80, min_lng=-122.50, max_lng=-122.45),
+            SimpleNamespace(id=2, code="B", row_index=1, col_index=2, min_lat=37.70, max_lat=37.74, min_lng=-122.45, max_lng=-122.35),
+            SimpleNamespace(id=3, code="C", row_index=2, col_index=2, min_lat=37.76, max_lat=37.82, min_lng=-122.42, max_lng=-122.38),
+        ]
+        index = RegionIndex(regions)
+        points = _sample_points(regions)
+
+        self.assertFalse(index.is_grid)
+        self.assertEqual(
+            index.lookup_many([lat for lat, _ in points], [lng for _, lng in points]),
+            [_brute_force(regions, lat, lng) for lat, lng in points],
+        )
+        self.assertEqual(index.by_code("C"), regions[2])
+
+    async def test_index_is_reloaded_only_when_the_regions_version_moves(self):
+        regions = await _seeded_regions()
+        session = _Session([_ExecResult(scalar=1)])
+        load = AsyncMock(side_effect=[regions, regions[:4]])
+
+        with patch("app.service.region_index.get_settings", return_value=_settings()), patch(
+            "app.service.region_index.load_regions", new=load
+        ):
+            first = await get_region_index(session)
+            second = await get_region_index(session)
+            session._executes = [_ExecResult(scalar=1)]
+            unchanged = await get_region_index(session, max_age_seconds=0)
+            session._executes = [_ExecResult(scalar=2)]
+            reloaded = await get_region_index(session, max_age_seconds=0)
+
+        self.assertIs(second, first)
+        self.assertIs(unchanged, first)
+        self.assertEqual((len(first), len(reloaded), reloaded.version), (16, 4, 2))
+        self.assertEqual(load.await_count, 2)
+        self.assertEqual(len(session.statements), 3)
+
+    async def test_regions_are_loaded_as_snapshots_in_their_own_session(self):
+        regions = await _seeded_regions()
+        rows = [tuple(getattr(region, column) for column in RegionSnapshot.__slots__) for region in regions]
+        loader = _Session([_ExecResult(rows=rows)])
+
+        @asynccontextmanager
+        async def session_factory():
+            yield loader
+
+        with patch("app.service.region_index.SessionLocal", new=session_factory):
+            snapshots = await load_regions()
+
+        self.assertEqual(len(loader.statements), 1)
+        self.assertTrue(all(isinstance(snapshot, RegionSnapshot) for snapshot in snapshots))
+        self.assertEqual([snapshot.code for snapshot in snapshots], [region.code for region in regions])
+        self.assertEqual(RegionIndex(snapshots).lookup(37.765, -122.43).code, "SF-2-2")
+
+    async def test_seeding_escapes_like_wildcards_in_city_codes(self):
+        session = _Session()
+        city = CityGridSpec("NEW_YORK", "New York", 40.70, 40.80, -74.02, -73.92, 2, 2)
+
+        with patch("app.db.seed.load_city_grids", return_value=[city]):
+            await seed_regions(session)
+
+        check = session.statements[0].compile()
+        self.assertIn("ESCAPE", str(check))
+        self.assertIn("NEW/_YORK-", check.params.values())
+
+    async def test_seeding_bumps_the_regions_version_and_drops_the_index(self):
+        region_index._index = RegionIndex([])
+        session = _Session()
+
+        await seed_regions(session)
+
+        self.assertIn("regions", str(session.statements[-1].compile().params))
+        self.assertIsNone(region_index._index)
+
+    async def test_assign_region_falls_back_to_the_table_on_a_miss_and_to_zip_codes(self):
+        regions = await _seeded_regions()
+        added_later = SimpleNamespace(id=99, code="OAK-1-1")
+        index = RegionIndex(regions)
+        session = _Session()
+
+        with patch("app.service.region_service.get_region_index", new=AsyncMock(return_value=index)), patch(
+            "app.service.region_service.find_region_by_lat_lng", new=AsyncMock(side_effect=[None, added_later])
+        ) as query:
+            inside = await assign_region(session, 37.765, -122.43, None)
+            by_zip = await assign_region(session, 37.80, -122.27, "94103")
+            region_index._index = index
+            stale = await assign_region(session, 37.80, -122.27, None)
+
+        self.assertEqual(inside.code, "SF-2-2")
+        self.assertEqual(by_zip.code, "SF-2-3")
+        self.assertIs(stale, added_later)
+        self.assertEqual(query.await_count, 2)
+        self.assertIsNone(region_index._index)
+
+    async def test_assign_region_queries_the_table_when_the_index_is_disabled(self):
+        region = SimpleNamespace(id=5)
+        with patch("app.service.region_index.get_settings", return_value=_settings(0)), patch(
+            "app.service.region_service.find_region_by_lat_lng", new=AsyncMock(return_value=region)
+        ):
+            self.assertIs(await assign_region(_Session(), 37.77, -122.42, None), region)
+
+    async def test_locate_endpoint_returns_block_sub_cell_and_neighbors(self):
+        index = RegionIndex(await _seeded_regions())
+
+        with patch("app.api.regions.get_region_index", new=AsyncMock(return_value=index)):
+            payload = await locate_region(latitude=37.765, longitude=-122.43, radius=1, db=_Session())
+            with self.assertRaises(HTTPException) as ctx:
+                await locate_region(latitude=40.0, longitude=-100.0, radius=1, db=_Session())
+
+        self.assertEqual((payload["region"]["code"], payload["city_code"]), ("SF-2-2", "SF"))
+        self.assertRegex(payload["subcell"]["code"], r"^SF-2-2\.[1-4]\.[1-4]$")
+        self.assertEqual(len(payload["neighbors"]), 8)
+        self.assertEqual(ctx.exception.status_code, 404)
@@ -0,0 +1,186 @@
+import io
+import os
+import random
+import tempfile
+import time
+from types import SimpleNamespace
+import unittest
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+
+from app.service.delivery_route_service import compute_delivery_route
+from app.service.road_graph import RoadGraph, build_road_graph_from_osm, haversine_meters, load_road_graph
+
+# A 3x3 block of residential streets; the middle row is one-way eastbound at 25 mph.
+GRID_OSM = b"""<?xml version="1.0" encoding="UTF-8"?>
+<osm version="0.6">
+  <node id="1" lat="37.700" lon="-122.400"/><node id="2" lat="37.700" lon="-122.390"/><node id="3" lat="37.700" lon="-122.380"/>
+  <node id="4" lat="37.710" lon="-122.400"/><node id="5" lat="37.710" lon="-122.390"/><node id="6" lat="37.710" lon="-122.380"/>
+  <node id="7" lat="37.720" lon="-122.400"/><node id="8" lat="37.720" lon="-122.390"/><node id="9" lat="37.720" lon="-122.380"/>
+  <node id="99" lat="37.750" lon="-122.300"/>
+  <way id="10"><nd ref="1"/><nd ref="2"/><nd ref="3"/><tag k="highway" v="residential"/></way>
+  <way id="11"><nd ref="4"/><nd ref="5"/><nd ref="6"/><tag k="highway" v="residential"/><tag k="oneway" v="yes"/><tag k="maxspeed" v="25 mph"/></way>
+  <way id="12"><nd ref="7"/><nd ref="8"/><nd ref="9"/><tag k="highway" v="residential"/></way>
+  <way id="13"><nd ref="1"/><nd ref="4"/><nd ref="7"/><tag k="highway" v="residential"/></way>
+  <way id="14"><nd ref="2"/><nd ref="5"/><nd ref="8"/><tag k="highway" v="residential"/></way>
+  <way id="15"><nd ref="3"/><nd ref="6"/><nd ref="9"/><tag k="highway" v="residential"/></way>
+  <way id="16"><nd ref="9"/><nd ref="99"/><tag k="highway" v="footway"/></way>
+</osm>
+"""
+
+
+def _random_graph(seed: int, size: int = 12) -> RoadGraph:
+    """A jittered size x size street grid with random speeds and some one-way edges."""
+    rng = random.Random(seed)
+    lat = []
+    lng = []
+    for row in range(size):
+        for column in range(size):
+            lat.append(37.70 + row * 0.002 + rng.uniform(-0.0004, 0.0004))
+            lng.append(-122.45 + column * 0.002 + rng.uniform(-0.0004, 0.0004))
+    lat32 = np.asarray(lat, dtype=np.float32)
+    lng32 = np.asarray(lng, dtype=np.float32)
+    edges = []
+    for row in range(size):
+        for column in range(size):
+            node = row * size + column
+            for neighbour in (node + 1 if column + 1 < size else None, node + size if row + 1 < size else None):
+                if neighbour is None:
+                    continue
+                speed = rng.uniform(5.0, 20.0)
+                edges.append((node, neighbour, speed))
+                if rng.random() > 0.2:
+                    edges.append((neighbour, node, speed))
+    edges.sort()
+    tails = np.asarray([tail for tail, _, _ in edges])
+    heads = np.asarray([head for _, head, _ in edges])
+    meters = haversine_meters(lat32[tails], lng32[tails], lat32[heads], lng32[heads])
+    seconds = meters / np.asarray([speed for _, _, speed in edges])
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(tails, minlength=size * size))))
+    return RoadGraph(lat32, lng32, indptr, heads, meters, seconds)
+
+
+class TestRoadGraph(unittest.IsolatedAsyncioTestCase):
+    def test_osm_extract_keeps_drivable_ways_and_one_way_direction(self):
+        graph = build_road_graph_from_osm(io.BytesIO(GRID_OSM))
+
+        # The footway (and its lone node) is dropped; 5 two-way streets of 2 segments, 1 one-way.
+        self.assertEqual(graph.node_count, 9)
+        self.assertIsNotNone(graph.hierarchy)
+        self.assertEqual(len(graph.indices), 5 * 2 * 2 + 2)
+        west, east = graph.nearest_nodes([(37.710, -122.400), (37.710, -122.380)])
+        _, _, eastbound = graph.shortest_path(west, east)
+        _, _, westbound = graph.shortest_path(east, west)
+        self.assertLess(eastbound, westbound)
+
+    def test_points_outside_the_extract_do_not_snap(self):
+        graph = build_road_graph_from_osm(io.BytesIO(GRID_OSM))
+
+        self.assertIsNone(graph.nearest_nodes([(37.70, -122.40), (38.50, -121.50)]))
+
+    def test_bidirectional_search_matches_dijkstra(self):
+        for seed in range(3):
+            graph = _random_graph(seed)
+            rng = random.Random(seed)
+            nodes = rng.sample(range(graph.node_count), 8)
+            meters, seconds = graph.travel_matrices(nodes)
+            for i, source in enumerate(nodes):
+                for j, target in enumerate(nodes):
+                    result = graph.shortest_path(source, target)
+                    if not np.isfinite(seconds[i, j]):
+                        self.assertIsNone(result)
+                        continue
+                    path, path_meters, path_seconds = result
+                    self.assertEqual((path[0], path[-1]), (source, target))
+                    self.assertAlmostEqual(path_seconds, seconds[i, j], places=3)
+                    self.assertAlmostEqual(path_meters, meters[i, j], places=2)
+
+    def test_hierarchy_matrices_match_dijkstra(self):
+        for seed in range(3):
+            graph = _random_graph(seed)
+            graph.build_hierarchy()
+            rng = random.Random(seed)
+            nodes = rng.sample(range(graph.node_count), 8)
+            nodes.append(nodes[0])
+
+            meters, seconds = graph.travel_matrices(nodes)
+            expected_meters, expected_seconds = graph._dijkstra_matrices(nodes)
+
+            np.testing.assert_allclose(seconds, expected_seconds, rtol=1e-9)
+            np.testing.assert_allclose(meters, expected_meters, rtol=1e-9)
+
+    def test_thirty_stop_matrix_stays_within_budget(self):
+        graph = _random_graph(1, size=30)
+        graph.build_hierarchy()
+        nodes = random.Random(1).sample(range(graph.node_count), 31)
+
+        def fastest(compute):
+            timings = []
+            for _ in range(3):
+                started = time.perf_counter()
+                compute(nodes)
+                timings.append(time.perf_counter() - started)
+            return min(timings)
+
+        hierarchy_seconds = fastest(graph.travel_matrices)
+        dijkstra_seconds = fastest(graph._dijkstra_matrices)
+
+        # The gap widens with graph size: about 80x on the 90k-node benchmark grid.
+        self.assertLess(hierarchy_seconds, 0.25)
+        self.assertLess(hierarchy_seconds, dijkstra_seconds / 2)
+
+    def test_route_through_concatenates_legs(self):
+        graph = build_road_graph_from_osm(io.BytesIO(GRID_OSM))
+
+        geometry, miles, minutes = graph.route_through([(37.700, -122.400), (37.720, -122.380), (37.700, -122.380)])
+
+        self.assertAlmostEqual(geometry[0][0], -122.400, places=4)
+        self.assertAlmostEqual(geometry[-1][1], 37.700, places=4)
+        self.assertEqual(len(geometry), 7)
+        self.assertGreater(miles, 0)
+        self.assertGreater(minutes, 0)
+
+    def test_save_and_load_round_trip(self):
+        graph = _random_graph(7, size=5)
+        graph.build_hierarchy()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "graph.npz")
+            graph.save(path)
+            loaded = load_road_graph(path)
+
+        self.assertEqual(loaded.node_count, graph.node_count)
+        np.testing.assert_array_equal(loaded.indices, graph.indices)
+        self.assertEqual(loaded.shortest_path(0, 24), graph.shortest_path(0, 24))
+        np.testing.assert_array_equal(loaded.travel_matrices([0, 12, 24])[1], graph.travel_matrices([0, 12, 24])[1])
+
+    def test_graph_saved_without_hierarchy_still_builds_matrices(self):
+        graph = _random_graph(7, size=5)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "graph.npz")
+            graph.save(path)
+            loaded = load_road_graph(path)
+
+        self.assertIsNone(loaded.hierarchy)
+        self.assertEqual(loaded.travel_matrices([0, 24])[1][0, 1], graph.shortest_path(0, 24)[2])
+
+    async def test_road_graph_backend_routes_locally_without_directions(self):
+        graph = build_road_graph_from_osm(io.BytesIO(GRID_OSM))
+        fetch = AsyncMock()
+        settings = SimpleNamespace(google_maps_api_key="test-key", routing_backend="road_graph", route_optimizer_time_budget_seconds=0.1)
+        with patch("app.service.delivery_route_service.get_settings", return_value=settings), patch(
+            "app.service.delivery_route_service.get_road_graph", return_value=graph
+        ), patch("app.service.delivery_route_service._fetch_optimized_directions", new=fetch):
+            points, miles, minutes = await compute_delivery_route(
+                supplier_latitude=37.700,
+                supplier_longitude=-122.400,
+                destination_points=[(37.720, -122.380), (37.700, -122.390)],
+                session=object(),
+            )
+
+        fetch.assert_not_awaited()
+        # Nearer stop first, then on to the far corner along the street grid.
+        self.assertAlmostEqual(points[2][0], -122.390, places=4)
+        self.assertEqual(len(points), 5)
+        self.assertAlmostEqual(miles, 2.47, delta=0.05)
+        self.assertGreater(minutes, 0)
@@ -0,0 +1,42 @@
+from types import SimpleNamespace
+import unittest
+from unittest.mock import patch
+
+from app.service.route_cache_service import get_cached_route, route_cache_counters, route_cache_key
+
+
+class _ExecResult:
+    def __init__(self, row=None):
+        self._row = row
+
+    def first(self):
+        return self._row
+
+
+class _Session:
+    def __init__(self, row=None):
+        self._row = row
+
+    async def execute(self, _stmt):
+        return _ExecResult(self._row)
+
+
+class TestRouteCacheService(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        route_cache_counters.reset()
+
+    async def test_key_ignores_stop_order_and_sub_rounding_jitter(self):
+        with patch("app.service.route_cache_service.get_settings", return_value=SimpleNamespace(route_cache_coordinate_decimals=4)):
+            key = route_cache_key((37.77490, -122.41940), [(37.78, -122.41), (37.76, -122.43)])
+            same = route_cache_key((37.774904, -122.419398), [(37.76, -122.43), (37.780001, -122.41)])
+            other = route_cache_key((37.7749, -122.4194), [(37.78, -122.41)])
+
+        self.assertEqual(key, same)
+        self.assertNotEqual(key, other)
+        self.assertEqual(len(key), 64)
+
+    async def test_lookup_counts_hits_and_misses(self):
+        self.assertIsNone(await get_cached_route(_Session(), "k"))
+        self.assertEqual(await get_cached_route(_Session(("abc", 3, 12)), "k"), ("abc", 3.0, 12.0))
+
+        self.assertEqual(route_cache_counters.snapshot(), {"hits": 1, "misses": 1, "stores": 0, "evictions": 0, "hit_ratio": 0.5})
@@ -0,0 +1,44 @@
+import unittest
+
+from app.service.route_geometry import (
+    decode_polyline,
+    encode_polyline,
+    route_points_for_read,
+    simplify_points,
+    tolerance_for_zoom,
+)
+
+
+class TestRouteGeometry(unittest.TestCase):
+    def test_polyline_encoding_round_trips(self):
+        encoded = "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+        self.assertEqual(encode_polyline(decode_polyline(encoded)), encoded)
+
+    def test_simplify_drops_points_within_tolerance_and_keeps_corners(self):
+        # An L-shaped route with jitter well under the tolerance along both legs.
+        leg_east = [[-122.40 + i * 0.001, 37.70 + (0.00001 if i % 2 else 0.0)] for i in range(11)]
+        leg_north = [[-122.39, 37.70 + i * 0.001] for i in range(1, 11)]
+        points = leg_east + leg_north
+
+        simplified = simplify_points(points, tolerance=0.0001)
+
+        self.assertEqual(simplified[0], points[0])
+        self.assertEqual(simplified[-1], points[-1])
+        self.assertIn(leg_east[-1], simplified)
+        self.assertEqual(len(simplified), 3)
+
+    def test_simplify_keeps_everything_at_zero_tolerance(self):
+        points = [[0.0, 0.0], [1.0, 0.5], [2.0, 0.0]]
+        self.assertEqual(simplify_points(points, tolerance=0.0), points)
+
+    def test_tolerance_halves_per_zoom_level(self):
+        self.assertAlmostEqual(tolerance_for_zoom(0), 360.0 / 256)
+        self.assertAlmostEqual(tolerance_for_zoom(13) * 2, tolerance_for_zoom(12))
+        self.assertEqual(tolerance_for_zoom(99), tolerance_for_zoom(22))
+
+    def test_read_prefers_polyline_and_falls_back_to_legacy_points(self):
+        legacy = [[-122.4, 37.7], [-122.3, 37.8]]
+
+        self.assertEqual(route_points_for_read(encode_polyline([[-122.5, 37.6]]), legacy), [[-122.5, 37.6]])
+        self.assertEqual(route_points_for_read(None, legacy), legacy)
+        self.assertIsNone(route_points_for_read(None, None, zoom=12))
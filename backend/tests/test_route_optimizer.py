@@ -0,0 +1,93 @@
+from itertools import permutations
+import math
+import random
+import unittest
+
+import numpy as np
+
+from app.service.route_optimizer import (
+    haversine_matrix,
+    nearest_neighbor_tour,
+    optimize_stop_order,
+    tour_length,
+    two_opt,
+)
+
+
+def _scalar_haversine(lat1, lng1, lat2, lng2):
+    lat1r, lng1r, lat2r, lng2r = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2r - lat1r) / 2) ** 2 + math.cos(lat1r) * math.cos(lat2r) * math.sin((lng2r - lng1r) / 2) ** 2
+    return 2 * 3958.8 * math.asin(math.sqrt(a))
+
+
+def _random_stops(count, seed):
+    rng = random.Random(seed)
+    return [(37.70 + rng.random() * 0.1, -122.50 + rng.random() * 0.1) for _ in range(count)]
+
+
+ORIGIN = (37.75, -122.45)
+
+
+class TestRouteOptimizer(unittest.TestCase):
+    def test_matrix_matches_scalar_haversine(self):
+        points = [ORIGIN, *_random_stops(6, seed=1)]
+        matrix = haversine_matrix(np.array(points))
+
+        for i, p in enumerate(points):
+            for j, q in enumerate(points):
+                self.assertAlmostEqual(matrix[i, j], _scalar_haversine(*p, *q), places=9)
+
+    def test_small_instances_land_near_the_optimum(self):
+        for seed in range(5):
+            stops = _random_stops(7, seed=seed)
+            matrix = haversine_matrix(np.array([ORIGIN, *stops]))
+            optimum = min(tour_length([0, *(i + 1 for i in perm)], matrix) for perm in permutations(range(7)))
+
+            order, miles = optimize_stop_order(ORIGIN, stops, time_budget_seconds=1.0)
+
+            self.assertEqual(sorted(order), list(range(7)))
+            self.assertGreaterEqual(miles, optimum - 1e-9)
+            # Local search can stop in a local optimum, but not far from the true one.
+            self.assertLessEqual(miles, optimum * 1.05)
+
+    def test_improves_on_nearest_neighbour_and_reports_its_length(self):
+        stops = _random_stops(80, seed=11)
+        matrix = haversine_matrix(np.array([ORIGIN, *stops]))
+
+        order, miles = optimize_stop_order(ORIGIN, stops, time_budget_seconds=2.0)
+
+        self.assertEqual(sorted(order), list(range(80)))
+        self.assertAlmostEqual(tour_length([0, *(i + 1 for i in order)], matrix), miles, places=9)
+        self.assertLess(miles, tour_length(nearest_neighbor_tour(matrix), matrix))
+
+    def test_zero_budget_returns_nearest_neighbour_tour(self):
+        stops = _random_stops(30, seed=3)
+        matrix = haversine_matrix(np.array([ORIGIN, *stops]))
+
+        order, _ = optimize_stop_order(ORIGIN, stops, time_budget_seconds=0.0)
+
+        self.assertEqual([0, *(i + 1 for i in order)], nearest_neighbor_tour(matrix))
+
+    def test_empty_stop_list(self):
+        self.assertEqual(optimize_stop_order(ORIGIN, [], time_budget_seconds=1.0), ([], 0.0))
+
+    def test_two_opt_accounts_for_asymmetric_segment_costs(self):
+        rng = np.random.default_rng(7)
+        for _ in range(20):
+            matrix = rng.uniform(1.0, 10.0, size=(7, 7))
+            np.fill_diagonal(matrix, 0.0)
+            tour = nearest_neighbor_tour(matrix)
+
+            improved = two_opt(tour, matrix, deadline=float("inf"))
+
+            self.assertLessEqual(tour_length(improved, matrix), tour_length(tour, matrix) + 1e-9)
+
+    def test_asymmetric_road_matrix_lands_on_the_optimum(self):
+        rng = np.random.default_rng(11)
+        matrix = rng.uniform(1.0, 10.0, size=(6, 6))
+        np.fill_diagonal(matrix, 0.0)
+        best = min(tour_length([0, *order], matrix) for order in permutations(range(1, 6)))
+
+        _, miles = optimize_stop_order(ORIGIN, _random_stops(5, seed=0), time_budget_seconds=1.0, matrix=matrix)
+
+        self.assertLessEqual(miles, best * 1.1)
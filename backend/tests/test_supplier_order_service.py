@@ -0,0 +1,126 @@
+from datetime import UTC, datetime
+from types import SimpleNamespace
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from app.service.route_geometry import encode_polyline
+from app.service.supplier_order_service import complete_due_orders, list_supplier_confirmed_orders, plan_order_route
+
+
+class _ExecResult:
+    def __init__(self, rows=None):
+        self._rows = rows or []
+
+    def all(self):
+        return self._rows
+
+
+class _Session:
+    def __init__(self, executes, gets=None):
+        self._executes = executes
+        self._gets = gets or {}
+        self.statements = []
+        self.commit_count = 0
+        self.rollback_count = 0
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        return self._executes.pop(0) if self._executes else _ExecResult()
+
+    async def commit(self):
+        self.commit_count += 1
+
+    async def rollback(self):
+        self.rollback_count += 1
+
+    async def get(self, model, key):
+        return self._gets.get((model.__name__, key))
+
+
+def _listed_order():
+    return SimpleNamespace(
+        id="o3",
+        supplier_business_id="s1",
+        supplier_product_id=None,
+        group_id="g3",
+        total_units=40,
+        business_count=2,
+        status="confirmed",
+        scheduled_start_at=None,
+        estimated_end_at=None,
+        route_total_miles=3.0,
+        route_total_minutes=20.0,
+        route_points=None,
+        delivery_route_id="r1",
+        created_at=datetime(2026, 3, 1, tzinfo=UTC),
+    )
+
+
+class TestSupplierOrderService(unittest.IsolatedAsyncioTestCase):
+    async def test_complete_due_orders_completes_orders_and_groups(self):
+        session = _Session([_ExecResult(rows=[("g2",), ("g1",)]), _ExecResult(rows=[(3,)])])
+
+        group_ids = await complete_due_orders(session)
+
+        self.assertEqual(group_ids, ["g1", "g2"])
+        # order update, group update, change-version bump
+        self.assertEqual(len(session.statements), 3)
+        self.assertEqual(session.commit_count, 1)
+
+    async def test_complete_due_orders_noop_when_nothing_due(self):
+        session = _Session([_ExecResult(rows=[])])
+
+        group_ids = await complete_due_orders(session)
+
+        self.assertEqual(group_ids, [])
+        self.assertEqual(len(session.statements), 1)
+        self.assertEqual(session.commit_count, 0)
+
+    async def test_plan_order_route_replans_the_suppliers_slot(self):
+        start = datetime(2026, 3, 2, 16, 0, tzinfo=UTC)
+        order = SimpleNamespace(id="o1", status="confirmed", supplier_business_id="s1", scheduled_start_at=start)
+        session = _Session([], gets={("SupplierConfirmedOrder", "o1"): order})
+        plan_day = AsyncMock(return_value=2)
+
+        with patch("app.service.supplier_order_service.plan_supplier_delivery_day", new=plan_day):
+            planned = await plan_order_route(session, "o1")
+
+        self.assertTrue(planned)
+        plan_day.assert_awaited_once_with(session, supplier_business_id="s1", scheduled_start_at=start)
+
+    async def test_plan_order_route_skips_orders_no_longer_confirmed(self):
+        order = SimpleNamespace(id="o2", status="completed", supplier_business_id="s2", scheduled_start_at=None)
+        session = _Session([], gets={("SupplierConfirmedOrder", "o2"): order})
+        plan_day = AsyncMock()
+
+        with patch("app.service.supplier_order_service.plan_supplier_delivery_day", new=plan_day):
+            self.assertFalse(await plan_order_route(session, "o2"))
+
+        plan_day.assert_not_awaited()
+
+    async def test_list_orders_omits_route_geometry_by_default(self):
+        session = _Session([_ExecResult(rows=[(_listed_order(), None, None, None)])])
+
+        (row,) = await list_supplier_confirmed_orders(session, supplier_business_id="s1")
+
+        self.assertIsNone(row["route_points"])
+        self.assertNotIn("delivery_routes", str(session.statements[0]))
+
+    async def test_list_orders_includes_simplified_route_when_requested(self):
+        line = [[-122.40 + i * 0.001, 37.70] for i in range(50)]
+        polyline = encode_polyline(line)
+        session = _Session(
+            [
+                _ExecResult(rows=[(_listed_order(), None, None, None, polyline)]),
+                _ExecResult(rows=[(_listed_order(), None, None, None, polyline)]),
+            ]
+        )
+
+        (full,) = await list_supplier_confirmed_orders(session, include_route=True)
+        (simplified,) = await list_supplier_confirmed_orders(session, include_route=True, route_zoom=10)
+
+        self.assertIn("delivery_routes", str(session.statements[0]))
+        self.assertEqual(len(full["route_points"]), 50)
+        self.assertEqual(len(simplified["route_points"]), 2)
+        self.assertEqual(simplified["route_points"][0], full["route_points"][0])
+        self.assertEqual(simplified["route_points"][-1], full["route_points"][-1])
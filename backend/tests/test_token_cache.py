@@ -0,0 +1,100 @@
+import asyncio
+import time
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from fastapi import HTTPException
+
+from app.core.auth import get_current_user
+from app.core.token_cache import TokenCache
+
+
+def _rejected(exc):
+    return isinstance(exc, HTTPException) and exc.status_code == 401
+
+
+class TestTokenCache(unittest.IsolatedAsyncioTestCase):
+    async def test_entries_are_bounded_least_recently_used_first(self):
+        cache = TokenCache(max_entries=2, ttl_seconds=60, negative_ttl_seconds=0)
+        for token in ("a", "b"):
+            await cache.get_or_load(token, AsyncMock(return_value=token))
+        await cache.get_or_load("a", AsyncMock())  # "b" is now the oldest
+        await cache.get_or_load("c", AsyncMock(return_value="c"))
+
+        reload_b = AsyncMock(return_value="b2")
+        self.assertEqual(await cache.get_or_load("b", reload_b), "b2")
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.counters.snapshot()["evictions"], 2)
+        self.assertEqual((cache.counters.hits, cache.counters.misses), (1, 4))
+
+    async def test_concurrent_lookups_of_a_new_token_share_one_validation(self):
+        cache = TokenCache(max_entries=10, ttl_seconds=60, negative_ttl_seconds=0)
+        release = asyncio.Event()
+        calls = 0
+
+        async def validate():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return {"id": "user-1"}
+
+        waiters = [asyncio.create_task(cache.get_or_load("tok", validate)) for _ in range(20)]
+        await asyncio.sleep(0)
+        waiters[0].cancel()  # one caller going away does not cancel the shared validation
+        release.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+
+        self.assertEqual(calls, 1)
+        self.assertIsInstance(results[0], asyncio.CancelledError)
+        self.assertTrue(all(result == {"id": "user-1"} for result in results[1:]))
+        self.assertEqual((cache.counters.misses, cache.counters.hits), (1, 19))
+
+    async def test_rejections_are_cached_briefly_and_outages_are_not(self):
+        cache = TokenCache(max_entries=10, ttl_seconds=60, negative_ttl_seconds=30)
+        rejected = AsyncMock(side_effect=HTTPException(status_code=401, detail="bad"))
+        outage = AsyncMock(side_effect=HTTPException(status_code=503, detail="down"))
+
+        for _ in range(3):
+            with self.assertRaises(HTTPException) as ctx:
+                await cache.get_or_load("forged", rejected, is_rejection=_rejected)
+            self.assertEqual(ctx.exception.status_code, 401)
+            with self.assertRaises(HTTPException):
+                await cache.get_or_load("valid", outage, is_rejection=_rejected)
+
+        self.assertEqual((rejected.await_count, outage.await_count), (1, 3))
+
+    async def test_entries_expire_at_the_ttl_or_the_token_expiry_and_are_purged(self):
+        cache = TokenCache(max_entries=10, ttl_seconds=60, negative_ttl_seconds=0)
+        await cache.get_or_load("long", AsyncMock(return_value=1))
+        await cache.get_or_load("short", AsyncMock(return_value=2), token_expires_at=time.time() + 5)
+        await cache.get_or_load("expired", AsyncMock(return_value=3), token_expires_at=time.time() - 5)
+        self.assertEqual(len(cache), 2)
+
+        with patch("app.core.token_cache.time.monotonic", return_value=time.monotonic() + 10):
+            self.assertEqual(cache.purge_expired(), 1)
+            self.assertEqual(await cache.get_or_load("long", AsyncMock()), 1)
+        with patch("app.core.token_cache.time.monotonic", return_value=time.monotonic() + 120):
+            reload = AsyncMock(return_value=4)
+            self.assertEqual(await cache.get_or_load("long", reload), 4)
+
+        self.assertEqual(cache.counters.evictions, 2)
+
+    async def test_tokens_are_not_kept_in_memory(self):
+        cache = TokenCache(max_entries=10, ttl_seconds=60, negative_ttl_seconds=0)
+
+        await cache.get_or_load("secret-token", AsyncMock(return_value=1))
+
+        self.assertNotIn("secret-token", cache._entries)
+
+    async def test_get_current_user_validates_each_token_once(self):
+        cache = TokenCache(max_entries=10, ttl_seconds=60, negative_ttl_seconds=30)
+        validate = AsyncMock(return_value={"id": "user-9", "role": "authenticated"})
+        credentials = type("Credentials", (), {"credentials": "opaque"})()
+
+        with patch("app.core.auth.get_token_cache", return_value=cache), patch(
+            "app.core.auth._validate_token", new=validate
+        ):
+            users = await asyncio.gather(*(get_current_user(credentials, object()) for _ in range(5)))
+
+        validate.assert_awaited_once()
+        self.assertEqual({user.user_id for user in users}, {"user-9"})
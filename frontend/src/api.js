@@ -36,6 +36,11 @@ export function fetchGroups(regionId, businessId) {
   return request(`/groups?${query.toString()}`);
 }
 
+export function fetchSupplierApprovalGroups(supplierBusinessId) {
+  const query = new URLSearchParams({ supplier_business_id: supplierBusinessId, status: 'capacity_reached' });
+  return request(`/groups?${query.toString()}`);
+}
+
 export function fetchRegions() {
   return request('/regions');
 }
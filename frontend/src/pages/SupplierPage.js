@@ -1,6 +1,6 @@
 import { useEffect, useState } from 'react';
 
-import { createSupplierProduct, fetchGroups, fetchSupplierOrders, fetchSupplierProducts, supplierApproveGroup } from '../api';
+import { createSupplierProduct, fetchSupplierApprovalGroups, fetchSupplierOrders, fetchSupplierProducts, supplierApproveGroup } from '../api';
 import Navbar from '../components/Navbar';
 
 const PRODUCT_NAME_OPTIONS = [
@@ -44,7 +44,7 @@ export default function SupplierPage({ auth }) {
     if (!supplierId) return;
     setLoading(true);
     try {
-      const [p, o, groups] = await Promise.all([fetchSupplierProducts(supplierId), fetchSupplierOrders(supplierId), fetchGroups()]);
+      const [p, o, groups] = await Promise.all([fetchSupplierProducts(supplierId), fetchSupplierOrders(supplierId), fetchSupplierApprovalGroups(supplierId)]);
       setProducts(p);
       setOrders(o);
       const candidates = groups.filter(